@@ -365,11 +365,30 @@ NEGATIVE: list[Fixture] = [
 ]
 
 
+def render_all() -> dict[Path, str]:
+    """Every fixture file, as {path relative to CONFORMANCE_DIR: content}."""
+    files: dict[Path, str] = {}
+    for fx in POSITIVE + NEGATIVE:
+        files.update(_render_fixture(fx))
+    return files
+
+
+def extra_files(expected_files: dict[Path, str]) -> list[Path]:
+    """Files on disk that no fixture would write (leftovers from removed fixtures)."""
+    extra: list[Path] = []
+    for kind in ("positive", "negative"):
+        base = CONFORMANCE_DIR / kind
+        if not base.is_dir():
+            continue
+        for path in sorted(base.rglob("*")):
+            if path.is_file() and path.relative_to(CONFORMANCE_DIR) not in expected_files:
+                extra.append(path.relative_to(CONFORMANCE_DIR))
+    return extra
+
+
 def _check() -> int:
     """Compare the committed fixtures against a fresh render; exit 1 on drift."""
-    expected_files: dict[Path, str] = {}
-    for fx in POSITIVE + NEGATIVE:
-        expected_files.update(_render_fixture(fx))
+    expected_files = render_all()
 
     problems: list[str] = []
     for rel, content in sorted(expected_files.items()):
@@ -378,15 +397,7 @@ def _check() -> int:
             problems.append(f"missing: {rel}")
         elif path.read_text(encoding="utf-8") != content:
             problems.append(f"stale: {rel}")
-
-    # Files on disk that no fixture would write (leftovers from removed fixtures).
-    for kind in ("positive", "negative"):
-        base = CONFORMANCE_DIR / kind
-        if not base.is_dir():
-            continue
-        for path in sorted(base.rglob("*")):
-            if path.is_file() and path.relative_to(CONFORMANCE_DIR) not in expected_files:
-                problems.append(f"extra: {path.relative_to(CONFORMANCE_DIR)}")
+    problems.extend(f"extra: {rel}" for rel in extra_files(expected_files))
 
     if problems:
         print("conformance fixtures drift from _generate.py:", file=sys.stderr)
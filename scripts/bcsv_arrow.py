@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""Convert bcsv tables to Parquet / Arrow IPC and back, streaming in row groups.
+
+bcsv metadata already declares what a columnar file needs, so the mapping is direct:
+
+  bcsv datatype   Arrow type
+  string          string
+  integer         int64
+  number          float64
+  boolean         bool
+  date            date32
+  datetime        timestamp[us]; tz=UTC when the values carry UTC offsets (normalized
+                  to UTC), naive otherwise; a column mixing the two is rejected
+  time            time64[us] (a time with a UTC offset is rejected)
+  categorical     dictionary<int32, string> over the declared levels, in declared order
+  ordered         the same with ordered=True, so level order is the sort order
+
+Each field carries the column's `description`, `unit` and `label` as field metadata, and
+the schema carries the whole bcsv metadata document under the `bcsv` key, so converting
+back restores it (NA codes, levels, constraints, dialect). A Parquet/Arrow file without
+that key gets its columns inferred from the Arrow types.
+
+`to_arrow` reads the CSV once, `row_group_rows` records at a time, through the coercion
+engine validate_bcsv uses (bcsv_coerce.py); each batch becomes one Parquet row group /
+IPC record batch, so memory is bounded by the batch, and the declared `file_hash` is
+verified on the way. A cell Arrow cannot represent (COERCION_FAILED, LEVEL_NOT_DECLARED)
+stops the conversion, naming its row and column, or becomes null with `invalid="null"`.
+The other constraints (range, length, required, primary key) are validate_bcsv's job.
+
+`to_bcsv` streams the batches back into a CSV in the metadata's dialect and hashes the
+bytes as they are written (bcsv_integrity.HashingWriter), so the metadata written next to
+it carries the new file's `file_hash`. Values come back in canonical form: nulls as the
+column's first `null` string (so "BDL" and "" both return as ""), booleans as
+true/false, numbers in shortest round-trip form; the CSV is equivalent, not
+byte-identical, to the one converted.
+
+pyarrow is optional (`pip install pyarrow`) and only this script imports it. The format
+follows the file suffix: .parquet/.pq is Parquet, .arrow/.feather/.ipc the Arrow IPC file
+format (uncompressed, so it can be memory-mapped).
+
+Usage:
+    python scripts/bcsv_arrow.py to-arrow bcsv/examples/student_data.json students.parquet
+    python scripts/bcsv_arrow.py to-arrow metadata.json table.arrow --row-group-rows 100000
+    python scripts/bcsv_arrow.py to-bcsv students.parquet out/student_data.json
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+from dataclasses import replace
+from datetime import timezone
+from itertools import islice
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bcsv_coerce import (  # noqa: E402
+    CATEGORICAL, ColumnSpec, coerce_cell, coerce_column, level_text, violation_message,
+)
+from bcsv_integrity import HashingReader, HashingWriter  # noqa: E402
+from validate_bcsv import DEFAULT_CHUNK_SIZE, resolve_dialect  # noqa: E402
+
+BCSV_CONTEXT = "https://behaverse.org/schemas/bcsv/context.jsonld"
+DEFAULT_ROW_GROUP_ROWS = 1 << 16
+
+PARQUET_SUFFIXES = frozenset({".parquet", ".pq"})
+IPC_SUFFIXES = frozenset({".arrow", ".feather", ".ipc"})
+
+METADATA_KEY = b"bcsv"  # schema metadata: the bcsv document, minus url/file_hash
+FIELD_METADATA_KEYS = ("description", "unit", "label")
+
+# Codes that leave a cell with no Arrow value; `invalid` decides what happens to it.
+UNREPRESENTABLE = ("COERCION_FAILED", "LEVEL_NOT_DECLARED")
+INVALID = ("error", "null")
+
+
+class ConversionError(ValueError):
+    """The table can't be converted; the message says where and why."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ConversionError("pyarrow is not installed (pip install pyarrow); it is "
+                              "optional and only needed for Parquet/Arrow conversion") from None
+    return pyarrow
+
+
+def _format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in IPC_SUFFIXES:
+        return "ipc"
+    raise ConversionError(f"{path}: unknown format (use one of "
+                          f"{', '.join(sorted(PARQUET_SUFFIXES | IPC_SUFFIXES))})")
+
+
+def _tmp(path: Path) -> Path:
+    return path.with_name(path.name + ".tmp")
+
+
+# --- bcsv -> Arrow -------------------------------------------------------------------
+
+class _Column:
+    """One physical column's conversion state: its spec, Arrow field and level lookup."""
+
+    def __init__(self, col: Dict[str, Any]):
+        self.decl = col
+        # Only what decides representability; the other constraints are not checked.
+        self.spec = replace(ColumnSpec.from_column(col), required=False, minimum=None,
+                            maximum=None, min_length=None, max_length=None)
+        self.levels: List[str] = []
+        if self.spec.datatype in CATEGORICAL:
+            if self.spec.levels is None:
+                raise ConversionError(f"column {col['name']!r}: {self.spec.datatype} "
+                                      f"column declares no `levels`")
+            self.levels = [level_text(lv) for lv in col["levels"]]
+        self.index = {text: i for i, text in enumerate(self.levels)}
+        self.numeric_index = {float(lv): i for i, lv in enumerate(col.get("levels") or [])
+                              if isinstance(lv, (int, float)) and not isinstance(lv, bool)}
+        self.nulled = 0
+        # datetime: whether values carry offsets, fixed by the first non-null one (row).
+        self.aware: Optional[bool] = None
+        self.aware_row: Optional[int] = None
+
+    def field(self, pa, utc: bool):
+        datatype = self.spec.datatype
+        if datatype in CATEGORICAL:
+            arrow_type = pa.dictionary(pa.int32(), pa.string(), ordered=datatype == "ordered")
+        elif datatype == "datetime":
+            arrow_type = pa.timestamp("us", tz="UTC" if utc else None)
+        else:
+            arrow_type = {"string": pa.string(), "integer": pa.int64(), "number": pa.float64(),
+                          "boolean": pa.bool_(), "date": pa.date32(),
+                          "time": pa.time64("us")}[datatype]
+        metadata = {k: self.decl[k] for k in FIELD_METADATA_KEYS
+                    if isinstance(self.decl.get(k), str)}
+        return pa.field(self.spec.name, arrow_type, metadata=metadata or None)
+
+    def values(self, cells, first_row: int, invalid: str) -> List[Any]:
+        """Typed values of one batch's cells (None for NA / nulled invalid cells)."""
+        spec = self.spec
+        result = coerce_column(spec, cells)
+        for code in UNREPRESENTABLE:
+            if code not in result.masks:
+                continue
+            if invalid == "null":
+                self.nulled += result.masks[code].count(1)
+                continue
+            bad = result.positions(code)
+            more = f" (+{len(bad) - 1} more in this batch)" if len(bad) > 1 else ""
+            raise ConversionError(f"row {first_row + bad[0]}, column {spec.name!r}: "
+                                  f"{violation_message(spec, code, cells[bad[0]])}{more}")
+        values = result.values
+        if spec.datatype in CATEGORICAL:
+            indices = list(map(self.index.get, values))
+            if self.numeric_index:  # "1.0" is the declared level 1
+                for j, (v, k) in enumerate(zip(values, indices)):
+                    if k is None and v is not None:
+                        indices[j] = self.numeric_index.get(coerce_cell("number", v))
+            return indices
+        if spec.datatype == "time" and any(map(attrgetter("tzinfo"), filter(None, values))):
+            j = next(j for j, v in enumerate(values) if v is not None and v.tzinfo is not None)
+            raise ConversionError(f"row {first_row + j}, column {spec.name!r}: "
+                                  f"time {cells[j]!r} has a UTC offset, which Arrow's "
+                                  f"time64 can't hold")
+        if spec.datatype == "datetime":
+            self._check_offsets(values, cells, first_row)
+        return values
+
+    def _check_offsets(self, values: List[Any], cells, first_row: int) -> None:
+        """Reject a datetime column that mixes naive and UTC-offset values."""
+        for j, v in enumerate(values):
+            if v is None:
+                continue
+            aware = v.tzinfo is not None
+            if self.aware is None:
+                self.aware, self.aware_row = aware, first_row + j
+            elif aware != self.aware:
+                since = (f"row {self.aware_row} is {'offset' if self.aware else 'naive'}"
+                         if self.aware_row is not None else
+                         "the first row group had no values, so it was written naive")
+                raise ConversionError(f"row {first_row + j}, column {self.spec.name!r}: "
+                                      f"datetime {cells[j]!r} is "
+                                      f"{'offset' if aware else 'naive'} but {since}; a "
+                                      f"column can't mix naive and UTC-offset datetimes")
+
+    def array(self, pa, field, values: List[Any]):
+        try:
+            if self.spec.datatype in CATEGORICAL:
+                return pa.DictionaryArray.from_arrays(
+                    pa.array(values, pa.int32()), pa.array(self.levels, pa.string()),
+                    ordered=field.type.ordered)
+            return pa.array(values, field.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as e:
+            raise ConversionError(f"column {self.spec.name!r}: {e}") from None
+
+
+def _open_writer(pa, path: Path, fmt: str, schema, compression: Optional[str]):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(str(path), schema, compression=compression or "none")
+        return writer, lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+    writer = pa.ipc.new_file(str(path), schema)
+    return writer, writer.write_batch
+
+
+def to_arrow(metadata_path, output_path, data_path=None, *,
+             row_group_rows: int = DEFAULT_ROW_GROUP_ROWS, compression: Optional[str] = "zstd",
+             invalid: str = "error", verify_hash: bool = True,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """Convert a bcsv table to Parquet / Arrow IPC (by `output_path`'s suffix).
+
+    Returns {"rows", "row_groups", "nulled"}, `nulled` counting the unrepresentable
+    cells `invalid="null"` turned into nulls. The output is written atomically.
+    """
+    if invalid not in INVALID:
+        raise ValueError(f"invalid must be one of {INVALID}, got {invalid!r}")
+    pa = _pyarrow()
+    metadata_path, output_path = Path(metadata_path), Path(output_path)
+    fmt = _format(output_path)
+    meta = json.loads(metadata_path.read_text(encoding="utf-8"))
+    try:
+        declared = [c for c in meta["table_schema"]["columns"] if not c.get("virtual")]
+    except (KeyError, TypeError, AttributeError):
+        raise ConversionError(f"{metadata_path}: no table_schema.columns") from None
+    columns = [_Column(c) for c in declared]
+    names = [c.spec.name for c in columns]
+    delimiter, encoding, _ = resolve_dialect(meta)
+    if data_path is None:
+        if not isinstance(meta.get("url"), str):
+            raise ConversionError(f"{metadata_path}: no `url` and no data path was given")
+        data_path = metadata_path.parent / meta["url"]
+    data_path = Path(data_path)
+    declared_hash = meta.get("file_hash") if verify_hash else None
+    table_meta = {k: v for k, v in meta.items() if k not in ("url", "file_hash")}
+
+    tmp = _tmp(output_path)
+    writer = write = schema = None
+    stats = {"rows": 0, "row_groups": 0}
+    try:
+        with open(data_path, "rb") as raw:
+            hashing = HashingReader(raw, hash=declared_hash is not None)
+            text = io.TextIOWrapper(io.BufferedReader(hashing, buffer_size=chunk_size),
+                                    encoding=encoding, newline="")
+            reader = csv.reader(text, delimiter=delimiter)
+            header = next(reader, [])
+            missing = [n for n in names if n not in header]
+            extra = [n for n in header if n not in names]
+            if missing or extra:
+                raise ConversionError(f"{data_path}: header doesn't match the metadata "
+                                      f"(missing {missing}, undeclared {extra})")
+            at = [header.index(n) for n in names]
+            width = len(header)
+            while batch := list(islice(reader, row_group_rows)):
+                if min(map(len, batch)) < width:
+                    batch = [r + [""] * (width - len(r)) if len(r) < width else r for r in batch]
+                cells = list(zip(*batch))
+                values = [c.values(cells[i], stats["rows"] + 1, invalid)
+                          for c, i in zip(columns, at)]
+                if schema is None:
+                    schema = _schema(pa, columns, table_meta)
+                    writer, write = _open_writer(pa, tmp, fmt, schema, compression)
+                write(pa.RecordBatch.from_arrays(
+                    [c.array(pa, f, vs) for c, f, vs in zip(columns, schema, values)],
+                    schema=schema))
+                stats["rows"] += len(batch)
+                stats["row_groups"] += 1
+            if declared_hash is not None:
+                digest = hashing.hexdigest(chunk_size)
+                if declared_hash.lower() != digest:
+                    raise ConversionError(f"{data_path}: file_hash {declared_hash} does not "
+                                          f"match sha256(data) {digest}")
+        if writer is None:  # no records: still write the schema
+            schema = _schema(pa, columns, table_meta)
+            writer, _ = _open_writer(pa, tmp, fmt, schema, compression)
+        writer.close()
+        writer = None
+        tmp.replace(output_path)
+    except UnicodeDecodeError as e:
+        raise ConversionError(f"{data_path}: not {encoding}: {e}") from None
+    finally:
+        if writer is not None:
+            writer.close()
+        if tmp.exists():
+            tmp.unlink()
+    stats["nulled"] = sum(c.nulled for c in columns)
+    return stats
+
+
+def _schema(pa, columns: List[_Column], table_meta: Dict[str, Any]):
+    """Arrow schema; a datetime column is UTC when its values carry offsets.
+
+    A datetime column with no values yet is written naive, from then on rejecting
+    offsets (see `_Column._check_offsets`).
+    """
+    fields = []
+    for column in columns:
+        if column.spec.datatype == "datetime" and column.aware is None:
+            column.aware = False
+        fields.append(column.field(pa, bool(column.aware)))
+    return pa.schema(fields, metadata={METADATA_KEY: json.dumps(table_meta, ensure_ascii=False)})
+
+
+# --- Arrow -> bcsv -------------------------------------------------------------------
+
+_BOOLEAN_TEXT = {True: "true", False: "false"}
+
+
+def _number_text(v: float) -> str:
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "INF" if v > 0 else "-INF"
+    if v.is_integer() and abs(v) < 1e16:
+        return str(int(v))
+    return repr(v)
+
+
+def _datetime_text(v) -> str:
+    if v.tzinfo is None:
+        return v.isoformat()
+    return v.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _formatter(pa, arrow_type) -> Callable[[Any], str]:
+    types = pa.types
+    if types.is_dictionary(arrow_type):
+        return _formatter(pa, arrow_type.value_type)
+    if types.is_boolean(arrow_type):
+        return _BOOLEAN_TEXT.__getitem__
+    if types.is_floating(arrow_type):
+        return _number_text
+    if types.is_timestamp(arrow_type):
+        return _datetime_text
+    if types.is_date(arrow_type) or types.is_time(arrow_type):
+        return lambda v: v.isoformat()
+    return str
+
+
+def _infer_column(pa, field) -> Dict[str, Any]:
+    """A bcsv column declaration for an Arrow field the embedded metadata doesn't cover."""
+    arrow_type, types = field.type, pa.types
+    if types.is_dictionary(arrow_type):
+        datatype = "ordered" if arrow_type.ordered else "categorical"
+    elif types.is_boolean(arrow_type):
+        datatype = "boolean"
+    elif types.is_integer(arrow_type):
+        datatype = "integer"
+    elif types.is_floating(arrow_type) or types.is_decimal(arrow_type):
+        datatype = "number"
+    elif types.is_date(arrow_type):
+        datatype = "date"
+    elif types.is_timestamp(arrow_type):
+        datatype = "datetime"
+    elif types.is_time(arrow_type):
+        datatype = "time"
+    elif types.is_string(arrow_type) or types.is_large_string(arrow_type):
+        datatype = "string"
+    else:
+        raise ConversionError(f"column {field.name!r}: Arrow type {arrow_type} has no "
+                              f"bcsv datatype")
+    col: Dict[str, Any] = {"name": field.name, "datatype": datatype}
+    if datatype in CATEGORICAL:
+        col["levels"] = []  # filled from the dictionaries while streaming
+    for key in FIELD_METADATA_KEYS:
+        value = (field.metadata or {}).get(key.encode())
+        if value is not None:
+            col[key] = value.decode()
+    return col
+
+
+def _python_values(pa, array) -> List[Any]:
+    """array.to_pylist(), with nanosecond temporals truncated to what Python holds."""
+    arrow_type = array.type
+    if pa.types.is_timestamp(arrow_type) and arrow_type.unit == "ns":
+        array = array.cast(pa.timestamp("us", tz=arrow_type.tz), safe=False)
+    elif pa.types.is_time64(arrow_type) and arrow_type.unit == "ns":
+        array = array.cast(pa.time64("us"), safe=False)
+    return array.to_pylist()
+
+
+def _open_batches(pa, path: Path, batch_rows: int):
+    """(schema, iterator of record batches, closer) for a Parquet or Arrow IPC file."""
+    if _format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(str(path))
+        return parquet.schema_arrow, parquet.iter_batches(batch_size=batch_rows), parquet.close
+    source = pa.memory_map(str(path))
+    reader = pa.ipc.open_file(source)
+    batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    return reader.schema, batches, source.close
+
+
+def to_bcsv(input_path, metadata_path, csv_path=None, *,
+            batch_rows: int = DEFAULT_ROW_GROUP_ROWS,
+            chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Dict[str, Any], int]:
+    """Convert Parquet / Arrow IPC back to a bcsv CSV plus metadata (with `file_hash`).
+
+    `csv_path` defaults to `metadata_path` with a .csv suffix; the metadata's `url` is
+    the CSV's path relative to it. Both are written atomically. Returns the metadata
+    and the number of records.
+    """
+    pa = _pyarrow()
+    input_path, metadata_path = Path(input_path), Path(metadata_path)
+    csv_path = Path(csv_path) if csv_path is not None else metadata_path.with_suffix(".csv")
+    schema, batches, close = _open_batches(pa, input_path, batch_rows)
+    try:
+        embedded = json.loads(schema.metadata[METADATA_KEY]) \
+            if schema.metadata and METADATA_KEY in schema.metadata else {}
+        declared = {c["name"]: c for c in embedded.get("table_schema", {}).get("columns", [])
+                    if isinstance(c, dict) and "name" in c}
+        columns = [declared.get(f.name) or _infer_column(pa, f) for f in schema]
+        inferred_levels = [c["levels"] if c.get("levels") == [] and c["name"] not in declared
+                           else None for c in columns]
+        formatters: List[Tuple[Callable[[Any], str], str]] = []
+        for field, col in zip(schema, columns):
+            nulls = col.get("null", "")
+            formatters.append((_formatter(pa, field.type),
+                               nulls if isinstance(nulls, str) else (nulls or [""])[0]))
+        delimiter, encoding, _ = resolve_dialect(embedded)
+        encoding = "utf-8" if encoding == "utf-8-sig" else encoding  # don't write a BOM
+
+        tmp = _tmp(csv_path)
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        rows = 0
+        try:
+            with open(tmp, "wb") as raw:
+                hashing = HashingWriter(raw)
+                text = io.TextIOWrapper(io.BufferedWriter(hashing, buffer_size=chunk_size),
+                                        encoding=encoding, newline="")
+                writer = csv.writer(text, delimiter=delimiter, lineterminator="\n")
+                writer.writerow([f.name for f in schema])
+                for batch in batches:
+                    cells = []
+                    for i, (format_value, null) in enumerate(formatters):
+                        array = batch.column(i)
+                        levels = inferred_levels[i]
+                        if levels is not None:
+                            levels.extend(v for v in array.dictionary.to_pylist()
+                                          if v is not None and v not in levels)
+                        cells.append([null if v is None else format_value(v)
+                                      for v in _python_values(pa, array)])
+                    writer.writerows(zip(*cells))
+                    rows += batch.num_rows
+                text.close()  # flushes into `hashing`; `raw` is closed by the with block
+            tmp.replace(csv_path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+    finally:
+        close()
+
+    meta = {"@context": BCSV_CONTEXT, "@type": "csvw:Table",
+            "description": f"Converted from {input_path.name}"} if not embedded else {
+        k: v for k, v in embedded.items() if k != "table_schema"}
+    meta["url"] = Path(os.path.relpath(csv_path, metadata_path.parent)).as_posix()
+    meta["file_hash"] = hashing.hexdigest()
+    meta["table_schema"] = {**embedded.get("table_schema", {}),
+                            "columns": columns + [c for c in declared.values()
+                                                  if c.get("virtual")]}
+    tmp = _tmp(metadata_path)
+    tmp.write_text(json.dumps(meta, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(metadata_path)
+    return meta, rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    out = sub.add_parser("to-arrow", help="bcsv -> Parquet / Arrow IPC")
+    out.add_argument("metadata", type=Path, help="bcsv metadata JSON")
+    out.add_argument("output", type=Path, help="output .parquet/.pq or .arrow/.feather/.ipc")
+    out.add_argument("--data", type=Path, help="CSV to read instead of the metadata's url")
+    out.add_argument("--row-group-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS, metavar="N",
+                     help=f"records per row group (default: {DEFAULT_ROW_GROUP_ROWS})")
+    out.add_argument("--compression", default="zstd",
+                     help="Parquet codec: zstd (default), snappy, gzip, lz4, none")
+    out.add_argument("--invalid", choices=INVALID, default="error",
+                     help="unrepresentable cells: fail (default) or write null")
+    out.add_argument("--no-verify-hash", action="store_true",
+                     help="don't check the CSV against the declared file_hash")
+    back = sub.add_parser("to-bcsv", help="Parquet / Arrow IPC -> bcsv")
+    back.add_argument("input", type=Path, help="input .parquet/.pq or .arrow/.feather/.ipc")
+    back.add_argument("metadata", type=Path, help="bcsv metadata JSON to write")
+    back.add_argument("--csv", type=Path, help="CSV to write (default: next to the metadata)")
+    back.add_argument("--batch-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS, metavar="N",
+                      help=f"records per read (default: {DEFAULT_ROW_GROUP_ROWS})")
+    args = ap.parse_args()
+
+    try:
+        if args.command == "to-arrow":
+            stats = to_arrow(args.metadata, args.output, args.data,
+                             row_group_rows=args.row_group_rows,
+                             compression=None if args.compression == "none" else args.compression,
+                             invalid=args.invalid, verify_hash=not args.no_verify_hash)
+            nulled = f", {stats['nulled']} invalid cell(s) nulled" if stats["nulled"] else ""
+            print(f"✓ {args.output}: {stats['rows']} row(s) in {stats['row_groups']} "
+                  f"row group(s){nulled}")
+        else:
+            meta, rows = to_bcsv(args.input, args.metadata, args.csv, batch_rows=args.batch_rows)
+            print(f"✓ {args.metadata} + {meta['url']}: {rows} row(s), "
+                  f"file_hash {meta['file_hash']}")
+    except (ConversionError, OSError, json.JSONDecodeError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
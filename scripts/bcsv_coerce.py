@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Batched, column-at-a-time coercion and constraint checks for bcsv datatypes.
+
+`coerce_column(spec, cells)` takes one column's cells for a chunk of rows and returns
+the typed values (None for NA and for cells that fail coercion) plus one mask per
+violated code:
+
+  COERCION_FAILED     cell is not a lexical form of the column's datatype
+  RANGE_VIOLATION     integer/number outside [minimum, maximum]
+  LENGTH_VIOLATION    string length outside [min_length, max_length]
+  LEVEL_NOT_DECLARED  categorical/ordered cell not among `levels`
+  REQUIRED_VIOLATION  NA (`null` / `na_strings`) in a `required` column
+
+A mask is a `bytearray` with one 0/1 byte per cell; a code with no violations in the
+chunk has no mask.
+
+No check loops over cells in Python. Each one is a whole-chunk C-level operation,
+the way an array library would do it, with a cheap all-clear test tried first:
+
+  check     all-clear test                       mask when it fails
+  NA        na.isdisjoint(cells)                 map(na.__contains__, cells)
+  lexical   one regex fullmatch over the         map(regex.fullmatch, cells)
+            chunk's non-NA cells joined by "\\n"
+  typed     map(int | float | fromisoformat | dict lookup, cells)
+  range     min() / max() of the typed values    map(partial(operator.gt, minimum), ...)
+  length    min() / max() of map(len, cells)     (the same, over the lengths)
+  levels    levels.issuperset(cells)             map(levels.__contains__, cells)
+
+Masks combine with map(operator.or_ / not_) into bytearrays. The exceptions are a
+chunk containing an impossible-but-well-formed value (2026-02-30), whose conversion is
+redone cell by cell, and spreading masks back over NA cells. `coerce_rowwise` is the
+plain cell-by-cell reference the engine must agree with.
+
+With pyarrow installed (optional, as for bcsv_arrow.py), the lexical types take a
+faster path first. The all-clear test is one RE2 match (Arrow's regex kernel) over
+the joined chunk instead of Python's `re`. For date/datetime/time it uses the EXACT
+patterns, which also rule out impossible values (month 13, 2026-02-30, 24:00:00), so
+a clear chunk needs no conversion to be known valid. Integers and numbers are
+converted by one Arrow cast, and their bounds are checked by min_max. A chunk the
+fast path can't clear, or can't cast (an integer beyond 64 bits, a `+` sign), goes
+down the stdlib path above, which has the final word on every mask. Typed values
+are Python lists either way. Set FAST_PATH = False to force the stdlib engine.
+
+Lexical forms follow XSD as CSVW uses it (ASCII digits only), plus R's `TRUE`/`FALSE`
+and pandas' `True`/`False` for booleans. `format` patterns are not interpreted.
+"""
+from __future__ import annotations
+
+import operator
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from functools import partial
+from itertools import compress, repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # optional: only the fast path below
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - exercised where pyarrow isn't installed
+    pa = pc = None
+
+CATEGORICAL = frozenset({"categorical", "ordered"})
+NUMERIC = frozenset({"integer", "number"})
+TEMPORAL = frozenset({"date", "datetime", "time"})  # lexically valid != valid (2026-02-30)
+DEFAULT_NULL = [""]  # CSVW: an empty cell is null unless `null` says otherwise
+
+_TZ = r"(?:Z|[+-][0-9]{2}:[0-9]{2})?"
+_TIME = r"[0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]+)?"
+_DATE = r"[0-9]{4}-[0-9]{2}-[0-9]{2}"
+
+# datatype -> XSD lexical form. No alternative matches "\n", which is what lets a whole
+# chunk be checked by one regex over the "\n"-joined cells.
+LEXICAL: Dict[str, str] = {
+    "integer": r"[+-]?[0-9]+",
+    "number": r"[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|NaN|-?INF",
+    "boolean": r"true|false|1|0|TRUE|FALSE|True|False",
+    "date": _DATE + _TZ,
+    "datetime": _DATE + "T" + _TIME + _TZ,
+    "time": _TIME + _TZ,
+}
+_BOOLEANS = {"true": True, "false": False, "1": True, "0": False,
+             "TRUE": True, "FALSE": False, "True": True, "False": False}
+
+# datatype -> converter for a lexically valid cell; raises ValueError when the shape is
+# right but the value is not (month 13, 25:00:00). All are C-level callables.
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "integer": int,
+    "number": float,
+    "boolean": _BOOLEANS.__getitem__,
+    "date": date.fromisoformat,
+    "datetime": datetime.fromisoformat,
+    "time": time.fromisoformat,
+}
+
+_CELL_RES = {dt: re.compile(pattern) for dt, pattern in LEXICAL.items()}
+_CHUNK_RES = {dt: re.compile(f"(?:{p})(?:\n(?:{p}))*") for dt, p in LEXICAL.items()}
+
+# datatype -> a pattern matching only cells that coerce (a subset of LEXICAL: the
+# temporal ones spell out the calendar, leap years included, and the clock; Python
+# also takes an offset of +05:60, which is left to the stdlib path).
+_YEAR = r"(?:[1-9][0-9]{3}|0[1-9][0-9]{2}|00[1-9][0-9]|000[1-9])"  # no year 0
+_MONTH_DAY = (r"(?:(?:0[13578]|1[02])-(?:0[1-9]|[12][0-9]|3[01])"
+              r"|(?:0[469]|11)-(?:0[1-9]|[12][0-9]|30)|02-(?:0[1-9]|1[0-9]|2[0-8]))")
+_LEAP_DAY = (r"(?:[0-9]{2}(?:0[48]|[2468][048]|[13579][26])"
+             r"|(?:0[48]|[2468][048]|[13579][26])00)-02-29")
+_EXACT_DATE = f"(?:{_YEAR}-{_MONTH_DAY}|{_LEAP_DAY})"
+_EXACT_TIME = r"(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9](?:\.[0-9]+)?"
+_EXACT_TZ = r"(?:Z|[+-](?:[01][0-9]|2[0-3]):[0-5][0-9])?"
+EXACT: Dict[str, str] = {
+    "integer": LEXICAL["integer"],
+    "number": LEXICAL["number"],
+    "boolean": LEXICAL["boolean"],
+    "date": _EXACT_DATE + _EXACT_TZ,
+    "datetime": _EXACT_DATE + "T" + _EXACT_TIME + _EXACT_TZ,
+    "time": _EXACT_TIME + _EXACT_TZ,
+}
+_ARROW_CHUNK = {dt: f"^(?:{p})(?:\n(?:{p}))*$" for dt, p in EXACT.items()}
+_ARROW_TYPES = {"integer": "int64", "number": "float64"}
+FAST_PATH = pa is not None
+
+
+def coerce_cell(datatype: str, cell: str) -> Any:
+    """Typed value of one non-NA cell, or None if it is not a valid `datatype` value."""
+    if not _CELL_RES[datatype].fullmatch(cell):
+        return None
+    if datatype == "date":
+        cell = cell[:10]  # date.fromisoformat takes no offset
+    try:
+        return CONVERTERS[datatype](cell)
+    except ValueError:
+        return None
+
+
+def level_text(level: Any) -> str:
+    """How a declared level appears in the CSV: strings verbatim, numbers as written."""
+    if isinstance(level, float) and level.is_integer():
+        return str(int(level))
+    return str(level)
+
+
+@dataclass
+class ColumnSpec:
+    """Everything the checks need from one column declaration, resolved once."""
+
+    name: str
+    datatype: str = "string"
+    na: frozenset = frozenset(DEFAULT_NULL)
+    required: bool = False
+    levels: Optional[frozenset] = None
+    numeric_levels: frozenset = frozenset()
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+
+    @classmethod
+    def from_column(cls, col: Dict[str, Any], check_constraints: bool = True) -> "ColumnSpec":
+        """Spec for a metadata column; without `check_constraints` only coercion runs."""
+        datatype = col.get("datatype", "string")
+        if datatype not in LEXICAL and datatype not in CATEGORICAL:
+            datatype = "string"  # deferred CSVW built-ins are read as strings in v0
+        nulls = col.get("null", DEFAULT_NULL)
+        spec = cls(name=col["name"], datatype=datatype,
+                   na=frozenset([nulls] if isinstance(nulls, str) else nulls)
+                   | frozenset(col.get("na_strings") or []))
+        if not check_constraints:
+            return spec
+        spec.required = bool(col.get("required"))
+        if datatype in CATEGORICAL and isinstance(col.get("levels"), list):
+            spec.levels = frozenset(level_text(lv) for lv in col["levels"])
+            spec.numeric_levels = frozenset(
+                float(lv) for lv in col["levels"]
+                if isinstance(lv, (int, float)) and not isinstance(lv, bool))
+        if datatype in NUMERIC:
+            spec.minimum, spec.maximum = col.get("minimum"), col.get("maximum")
+        if datatype == "string":
+            spec.min_length, spec.max_length = col.get("min_length"), col.get("max_length")
+        return spec
+
+    @property
+    def bounded(self) -> bool:
+        return self.minimum is not None or self.maximum is not None
+
+    @property
+    def length_bounded(self) -> bool:
+        return self.min_length is not None or self.max_length is not None
+
+    @property
+    def codes(self) -> frozenset:
+        """The codes `coerce_column` can report for this column."""
+        return frozenset(code for code, possible in (
+            ("COERCION_FAILED", self.datatype in LEXICAL),
+            ("REQUIRED_VIOLATION", self.required),
+            ("RANGE_VIOLATION", self.bounded),
+            ("LENGTH_VIOLATION", self.length_bounded),
+            ("LEVEL_NOT_DECLARED", self.levels is not None),
+        ) if possible)
+
+
+@dataclass
+class ColumnResult:
+    values: Optional[List[Any]]
+    masks: Dict[str, bytearray] = field(default_factory=dict)
+
+    def positions(self, code: str) -> List[int]:
+        """Indices (within the chunk) of the cells that violate `code`."""
+        mask = self.masks.get(code)
+        if mask is None:
+            return []
+        out, i = [], mask.find(1)
+        while i != -1:
+            out.append(i)
+            i = mask.find(1, i + 1)
+        return out
+
+
+def violation_message(spec: ColumnSpec, code: str, cell: str) -> str:
+    """Human-readable detail for one masked cell (not part of the conformance contract)."""
+    if code == "REQUIRED_VIOLATION":
+        return f"missing value ({cell!r}) in required column"
+    if code == "COERCION_FAILED":
+        return f"{cell!r} is not a valid {spec.datatype}"
+    if code == "RANGE_VIOLATION":
+        return f"{cell} outside [{spec.minimum}, {spec.maximum}]"
+    if code == "LEVEL_NOT_DECLARED":
+        return f"{cell!r} is not a declared level"
+    n = len(cell)
+    if spec.min_length is not None and n < spec.min_length:
+        return f"length {n} < min_length {spec.min_length}"
+    return f"length {n} > max_length {spec.max_length}"
+
+
+def _mark(masks: Dict[str, bytearray], code: str, i: int, n: int) -> None:
+    mask = masks.get(code)
+    if mask is None:
+        mask = masks[code] = bytearray(n)
+    mask[i] = 1
+
+
+def coerce_rowwise(spec: ColumnSpec, cells: Sequence[str]) -> ColumnResult:
+    """Cell-by-cell reference implementation of `coerce_column` (and its slow path)."""
+    n = len(cells)
+    values: List[Any] = [None] * n
+    masks: Dict[str, bytearray] = {}
+    datatype, na = spec.datatype, spec.na
+    coerces = datatype in LEXICAL
+    for i, cell in enumerate(cells):
+        if cell in na:
+            if spec.required:
+                _mark(masks, "REQUIRED_VIOLATION", i, n)
+            continue
+        if coerces:
+            typed = coerce_cell(datatype, cell)
+            if typed is None:
+                _mark(masks, "COERCION_FAILED", i, n)
+                continue
+            values[i] = typed
+            # NaN compares false both ways, so it never violates a bound.
+            if (spec.minimum is not None and typed < spec.minimum) or \
+                    (spec.maximum is not None and typed > spec.maximum):
+                _mark(masks, "RANGE_VIOLATION", i, n)
+            continue
+        values[i] = cell
+        if spec.levels is not None and cell not in spec.levels:
+            number = coerce_cell("number", cell) if spec.numeric_levels else None
+            if number is None or number not in spec.numeric_levels:
+                _mark(masks, "LEVEL_NOT_DECLARED", i, n)
+        elif spec.length_bounded:
+            length = len(cell)
+            if (spec.min_length is not None and length < spec.min_length) or \
+                    (spec.max_length is not None and length > spec.max_length):
+                _mark(masks, "LENGTH_VIOLATION", i, n)
+    return ColumnResult(values, masks)
+
+
+def _not(flags: Iterable[Any]) -> bytearray:
+    """0/1 mask of the falsy items (C-level, like every mask op below)."""
+    return bytearray(map(operator.not_, flags))
+
+
+def _any(mask: Optional[bytearray]) -> bool:
+    return mask is not None and mask.find(1) != -1
+
+
+def _or(a: Optional[bytearray], b: Optional[bytearray]) -> Optional[bytearray]:
+    if a is None or b is None:
+        return a if b is None else b
+    return bytearray(map(operator.or_, a, b))
+
+
+def _bounds_mask(values: Sequence[Any], low: Any, high: Any) -> Optional[bytearray]:
+    """1 where a value is < low or > high (either bound may be None); None if none are.
+
+    `values` must not contain None. NaN compares false both ways, so it never violates.
+    """
+    if not values:
+        return None
+    if (low is None or min(values) >= low) and (high is None or max(values) <= high):
+        return None  # min()/max() is enough when nothing is out of bounds ...
+    below = bytearray(map(partial(operator.gt, low), values)) if low is not None else None
+    above = bytearray(map(partial(operator.lt, high), values)) if high is not None else None
+    return _or(below, above)  # ... and otherwise the mask is two comparisons per value
+
+
+def _lexical_mask(datatype: str, cells: Sequence[str]) -> Optional[bytearray]:
+    """1 where a cell is not a lexical form of `datatype`; None if all are."""
+    if not cells:
+        return None
+    joined = "\n".join(cells)
+    # A cell containing "\n" would read as two cells, so count them too.
+    if joined.count("\n") == len(cells) - 1 and _CHUNK_RES[datatype].fullmatch(joined):
+        return None
+    return _not(map(_CELL_RES[datatype].fullmatch, cells))
+
+
+def _convert(datatype: str, cells: Sequence[str],
+             bad: Optional[bytearray]) -> Tuple[List[Any], Optional[bytearray]]:
+    """Typed values (None where invalid) and the updated COERCION_FAILED mask.
+
+    Only the lexically valid cells are converted, in one map(); a chunk with a
+    right-shaped but impossible value (2026-02-30) somewhere is converted cell by cell.
+    """
+    index = None if bad is None else list(compress(range(len(cells)), _not(bad)))
+    valid = cells if index is None else [cells[i] for i in index]
+    try:
+        converted = list(map(CONVERTERS[datatype], valid))
+    except ValueError:
+        converted = [coerce_cell(datatype, c) for c in valid]
+        failed = _not(map(operator.is_not, converted, repeat(None)))
+        if _any(failed):
+            if index is None:
+                return converted, failed
+            bad = bad[:]
+            for i, flag in zip(index, failed):
+                bad[i] = flag
+    if index is None:
+        return converted, None
+    typed: List[Any] = [None] * len(cells)
+    for i, v in zip(index, converted):
+        typed[i] = v
+    return typed, bad
+
+
+def _arrow_mask(flags) -> bytearray:
+    """An Arrow boolean array as a 0/1 bytearray mask (null counts as 0)."""
+    flags = pc.cast(pc.fill_null(flags, False), pa.uint8())
+    return bytearray(memoryview(flags.buffers()[1])[flags.offset:flags.offset + len(flags)])
+
+
+def _fast_lexical(datatype: str, cells: Sequence[str],
+                  convert: bool) -> Optional[Tuple[Any, None]]:
+    """(typed values, no COERCION_FAILED mask) if every cell coerces, by the Arrow
+    fast path; None to leave the chunk to the stdlib path.
+
+    Typed values are an Arrow array for integer/number (so bounds are checked in
+    Arrow), a list for the other types, and None when `convert` is false and
+    validity alone was asked for.
+    """
+    if not cells:
+        return [], None
+    joined = "\n".join(cells)
+    if joined.count("\n") != len(cells) - 1:
+        return None  # a cell with a newline in it; the stdlib path sorts it out
+    chunk = pa.array([joined], pa.large_string())
+    if not pc.match_substring_regex(chunk, _ARROW_CHUNK[datatype])[0].as_py():
+        return None
+    if not convert:
+        return None, None
+    if datatype in _ARROW_TYPES:
+        try:
+            return pc.cast(pc.split_pattern(chunk, "\n").flatten(),
+                           _ARROW_TYPES[datatype]), None
+        except pa.ArrowInvalid:
+            return None  # beyond int64, or a form Arrow doesn't parse (+5)
+    typed, bad = _convert(datatype, cells, None)
+    return (typed, None) if bad is None else None
+
+
+def _arrow_bounds_mask(values, low: Any, high: Any) -> Optional[bytearray]:
+    """`_bounds_mask` for an Arrow array: min_max first, comparisons if that fails."""
+    extremes = pc.min_max(values).as_py()
+    lowest, highest = extremes["min"], extremes["max"]
+    if lowest is None or ((low is None or lowest >= low) and (high is None or highest <= high)):
+        return None  # (all-NaN compares false and lands below, where NaN never violates)
+    try:
+        below = pc.less(values, low) if low is not None else None
+        above = pc.greater(values, high) if high is not None else None
+    except (pa.ArrowException, TypeError, OverflowError):  # beyond 2**53 or int64: exactly
+        return _bounds_mask(values.to_pylist(), low, high)
+    flags = below if above is None else above if below is None else pc.or_(below, above)
+    mask = _arrow_mask(flags)
+    return mask if _any(mask) else None
+
+
+def _scatter(mask: bytearray, index: List[int], n: int) -> bytearray:
+    """Expand a mask over the non-NA cells to one over all `n` cells."""
+    full = bytearray(n)
+    i = mask.find(1)
+    while i != -1:
+        full[index[i]] = 1
+        i = mask.find(1, i + 1)
+    return full
+
+
+def coerce_column(spec: ColumnSpec, cells: Sequence[str], values: bool = True) -> ColumnResult:
+    """Coerce and check one column chunk; see the module docstring for the strategy.
+
+    With `values=False` only the masks are computed (`result.values` is None), which
+    spares the conversion wherever the lexical check alone decides validity
+    (integer/number/boolean without bounds).
+    """
+    n = len(cells)
+    na, datatype = spec.na, spec.datatype
+    masks: Dict[str, bytearray] = {}
+    if na.isdisjoint(cells):
+        present, index = cells, None
+    else:
+        is_na = bytearray(map(na.__contains__, cells))
+        if spec.required:
+            masks["REQUIRED_VIOLATION"] = is_na
+        keep = _not(is_na)
+        present, index = list(compress(cells, keep)), list(compress(range(n), keep))
+
+    found: Dict[str, Optional[bytearray]] = {}
+    typed: Optional[List[Any]] = None
+    if datatype in LEXICAL:
+        fast = (_fast_lexical(datatype, present, values or spec.bounded)
+                if FAST_PATH else None)
+        if fast is not None:
+            typed, bad = fast
+            if spec.bounded:
+                found["RANGE_VIOLATION"] = _arrow_bounds_mask(typed, spec.minimum,
+                                                              spec.maximum)
+            if typed is not None and not isinstance(typed, list):
+                typed = typed.to_pylist() if values else None
+        else:
+            bad = _lexical_mask(datatype, present)
+            if values or spec.bounded or datatype in TEMPORAL:
+                typed, bad = _convert(datatype, present, bad)
+        found["COERCION_FAILED"] = bad
+        if spec.bounded and fast is None:
+            if bad is None:
+                found["RANGE_VIOLATION"] = _bounds_mask(typed, spec.minimum, spec.maximum)
+            else:  # bounds only apply to the cells that coerced
+                ok = [v for v in typed if v is not None]
+                ok_mask = _bounds_mask(ok, spec.minimum, spec.maximum)
+                if ok_mask is not None:
+                    found["RANGE_VIOLATION"] = _scatter(
+                        ok_mask, list(compress(range(len(typed)), _not(bad))), len(typed))
+    else:
+        typed = present
+        if spec.levels is not None and not spec.levels.issuperset(present):
+            undeclared = _not(map(spec.levels.__contains__, present))
+            if spec.numeric_levels:  # "1.0" matches a declared level 1
+                i = undeclared.find(1)
+                while i != -1:
+                    if coerce_cell("number", present[i]) in spec.numeric_levels:
+                        undeclared[i] = 0
+                    i = undeclared.find(1, i + 1)
+            found["LEVEL_NOT_DECLARED"] = undeclared
+        if spec.length_bounded:
+            found["LENGTH_VIOLATION"] = _bounds_mask(list(map(len, present)),
+                                                     spec.min_length, spec.max_length)
+
+    for code, mask in found.items():
+        if _any(mask):
+            masks[code] = mask if index is None else _scatter(mask, index, n)
+
+    if not values:
+        return ColumnResult(None, masks)
+    if index is None:
+        return ColumnResult(typed if isinstance(typed, list) else list(typed), masks)
+    out: List[Any] = [None] * n
+    for i, v in zip(index, typed):
+        out[i] = v
+    return ColumnResult(out, masks)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""SHA-256 `file_hash` computation for bcsv data files, in bounded memory.
+
+Three ways to get a file's digest, cheapest first:
+
+  DigestCache      a digest already verified for this exact file state — keyed by
+                   (resolved path, size, mtime_ns) — is returned without reading it;
+  HashingReader    a raw reader that hashes bytes as they stream past, so a parser
+                   reading the file (validate_bcsv.py's CSV reader) yields the digest
+                   from the same single read;
+  file_sha256      a standalone pass, over a memory map (no copy into Python; the GIL
+                   is released while hashing) or in fixed-size chunks where mmap isn't
+                   available; never `read_bytes()` of the whole file.
+
+`HashingWriter` is the write-side counterpart: whatever writes a CSV through it (e.g.
+bcsv_arrow.py converting back from Parquet) gets the new file's `file_hash` for free.
+
+The cache persists as JSON (`--digest-cache` / `DigestCache(path)`); it is local and
+always safe to delete. Like git's index it refuses to trust a "racily clean" entry:
+a file modified within `RACY_SECONDS` of being hashed is not cached, since a second
+write in the same mtime tick with the same size would go unnoticed.
+
+Usage:
+    python scripts/bcsv_integrity.py data.csv ...             # sha256sum-style output
+    python scripts/bcsv_integrity.py --cache .bcsv-cache/digests.json data/*.csv
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DIGEST_CACHE = ROOT / ".bcsv-cache" / "digests.json"
+
+CHUNK_SIZE = 1 << 20
+RACY_SECONDS = 2.0
+
+# Bump to drop every persisted entry when the entry layout changes.
+CACHE_FORMAT = 1
+
+
+def file_sha256(path, cache: Optional["DigestCache"] = None, use_mmap: bool = True,
+                chunk_size: int = CHUNK_SIZE) -> str:
+    """Lowercase hex SHA-256 of a file, via the cache when it has this file state."""
+    path = Path(path)
+    stamp = None
+    if cache is not None:
+        cached = cache.lookup(path)
+        if cached is not None:
+            return cached
+        stamp = cache.stamp(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+            except (OSError, ValueError):  # not mappable (pipe, special file): stream it
+                f.seek(0)
+                h = _chunked(f, chunk_size)
+        else:
+            h = _chunked(f, chunk_size)
+    digest = h.hexdigest()
+    if cache is not None:
+        cache.store(path, digest, stamp)
+    return digest
+
+
+def _chunked(f, chunk_size: int):
+    h = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while n := f.readinto(buffer):
+        h.update(view[:n])
+    return h
+
+
+class HashingReader(io.RawIOBase):
+    """Raw reader that feeds every byte it reads into SHA-256 on the way through.
+
+    Wrap it in `io.BufferedReader` / `io.TextIOWrapper` and hand that to a parser;
+    call `hexdigest()` once the parser is done. With `hash=False` it is a plain
+    pass-through (the digest is already known, e.g. from a DigestCache).
+    """
+
+    def __init__(self, raw, hash: bool = True):
+        self._raw = raw
+        self.sha256 = hashlib.sha256() if hash else None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._raw.readinto(buffer)
+        if n and self.sha256 is not None:
+            self.sha256.update(memoryview(buffer)[:n])
+        return n
+
+    def hexdigest(self, chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+        """Digest of the whole file: hashes whatever the parser left unread first."""
+        if self.sha256 is None:
+            return None
+        while chunk := self._raw.read(chunk_size):
+            self.sha256.update(chunk)
+        return self.sha256.hexdigest()
+
+
+class HashingWriter(io.RawIOBase):
+    """Raw writer that hashes every byte it writes: the digest of a file as produced."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        n = self._raw.write(data)
+        self.sha256.update(memoryview(data)[:n])
+        return n
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+def _stamp(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return str(path.resolve()), st.st_size, st.st_mtime_ns
+
+
+class DigestCache:
+    """Verified digests keyed by (resolved path, size, mtime_ns); thread-safe.
+
+    In-memory only unless `path` is given, in which case it is loaded lazily and
+    written back by `save()`.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List]] = None
+        self._new: Dict[str, List] = {}
+        self._dirty = False
+
+    def _load(self) -> Dict[str, List]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None and self.path.exists():
+                try:
+                    doc = json.loads(self.path.read_text())
+                except (OSError, json.JSONDecodeError):
+                    doc = {}  # a torn/corrupt cache is just empty
+                if doc.get("format") == CACHE_FORMAT:
+                    self._entries = doc.get("entries", {})
+        return self._entries
+
+    def lookup(self, path: Path) -> Optional[str]:
+        """The cached digest if `path` is unchanged since it was hashed, else None."""
+        try:
+            key, size, mtime_ns = _stamp(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and entry[0] == size and entry[1] == mtime_ns:
+            return entry[2]
+        return None
+
+    def stamp(self, path: Path) -> Optional[Tuple[str, int, int]]:
+        """`path`'s state, to take *before* hashing it and hand to `store`."""
+        try:
+            return _stamp(path)
+        except OSError:
+            return None
+
+    def store(self, path: Path, digest: str, stamp: Optional[Tuple[str, int, int]]) -> None:
+        """Record `digest` for the file state `stamp` taken before hashing, unless the
+        file has changed since (a write mid-hash) or is racily new."""
+        if stamp is None or self.stamp(path) != stamp:
+            return
+        key, size, mtime_ns = stamp
+        if time.time() - mtime_ns / 1e9 < RACY_SECONDS:
+            return
+        with self._lock:
+            self._load()[key] = self._new[key] = [size, mtime_ns, digest]
+            self._dirty = True
+
+    def new_entries(self) -> Dict[str, List]:
+        """Entries stored since this cache was created (to ship back from a worker)."""
+        with self._lock:
+            return dict(self._new)
+
+    def merge(self, entries: Dict[str, List]) -> None:
+        """Adopt entries another process's cache stored (see `new_entries`)."""
+        if not entries:
+            return
+        with self._lock:
+            self._load().update(entries)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back (atomically) if it has a path and changed."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"format": CACHE_FORMAT, "entries": self._entries}))
+            tmp.replace(self.path)
+            self._dirty = False
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="+", type=Path)
+    ap.add_argument("--cache", type=Path, metavar="DIGESTS.json",
+                    help="reuse/record digests in this cache file")
+    ap.add_argument("--no-mmap", action="store_true", help="read in chunks instead of mmap")
+    args = ap.parse_args()
+
+    cache = DigestCache(args.cache) if args.cache else None
+    status = 0
+    for path in args.files:
+        try:
+            print(f"{file_sha256(path, cache, use_mmap=not args.no_mmap)}  {path}")
+        except OSError as e:
+            print(f"✗ {path}: {e.strerror}", file=sys.stderr)
+            status = 1
+    if cache is not None:
+        cache.save()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
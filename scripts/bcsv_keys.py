@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Duplicate primary-key detection for bcsv tables, in bounded memory.
+
+`DuplicateKeyDetector` takes the key cells of a table a batch at a time (one column,
+or several for a composite `table_schema.primary_key`) and reports how many records
+repeat an earlier key, plus the first few offending rows and the rows they duplicate.
+That is what PRIMARY_KEY_VIOLATION needs (see bcsv/conformance/_generate.py).
+
+Keys are never kept as strings. Each is reduced to a 97-bit digest: Python's 64-bit
+hash of the key, next to a CRC-32 of its text, which are two unrelated functions. The
+chance of two different keys colliding (a false duplicate) is about n²/2^97, or
+10^-13 for 10^8 rows. Digests go into a dict of digest -> first row, computed a
+batch at a time by C-level map()s like bcsv_coerce.py does. Each entry costs about
+`ENTRY_BYTES` whatever the key's width.
+
+When the dict holds `memory_bytes` worth of entries, it is written to a temporary
+file as a run sorted by digest, and a new dict starts. `finish()` k-way merges the
+runs (merging in passes when there are more runs than the memory budget has read
+buffers for), so records with equal digests meet. The earliest row of a digest is
+the one the later rows duplicate. Memory is therefore set by `memory_bytes`, not by
+the table; disk use is about `RECORD_BYTES` per distinct key per run.
+
+Python's string hash is salted per process, so digests mean nothing outside the
+detector that made them, and runs are deleted when it finishes.
+"""
+from __future__ import annotations
+
+import heapq
+import operator
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_MEMORY = 64 << 20
+ENTRY_BYTES = 128  # measured: int digest + int row + dict slot, plus the spill's sort
+MAX_EXAMPLES = 5
+
+KEY_BYTES = 13  # a 97-bit digest, offset to be non-negative so byte order is int order
+ROW_BYTES = 8
+RECORD_BYTES = KEY_BYTES + ROW_BYTES
+RUN_BUFFER = 1 << 16  # read buffer per run while merging
+_OFFSET = 1 << 96  # digests lie in [-2**96, 2**96)
+_JOIN = "\x1f"  # composite keys' text for the CRC; the hash sees the tuple itself
+
+
+@dataclass
+class DuplicateKeys:
+    count: int = 0
+    # (row, row it duplicates), lowest rows first, at most `max_examples`
+    examples: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def _digests(key_columns: Sequence[Sequence[str]]) -> List[int]:
+    if len(key_columns) == 1:
+        keys = texts = key_columns[0]
+    else:
+        keys = list(zip(*key_columns))
+        texts = list(map(_JOIN.join, keys))
+    crcs = map(zlib.crc32, map(str.encode, texts))
+    return list(map(operator.xor, map(hash, keys), map(operator.lshift, crcs, repeat(64))))
+
+
+def _key_bytes(digest: int) -> bytes:
+    return (digest + _OFFSET).to_bytes(KEY_BYTES, "big")
+
+
+def _read_run(path: Path) -> Iterator[bytes]:
+    block_size = RUN_BUFFER - RUN_BUFFER % RECORD_BYTES
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            for i in range(0, len(block), RECORD_BYTES):
+                yield block[i:i + RECORD_BYTES]
+
+
+class DuplicateKeyDetector:
+    """Counts repeated keys over a stream of key batches; see the module docstring.
+
+    `add()` each batch in row order, then `finish()` once. `spill_dir` is where runs
+    go (default: the system temp directory).
+    """
+
+    def __init__(self, memory_bytes: int = DEFAULT_MEMORY, spill_dir: Optional[Path] = None,
+                 max_examples: int = MAX_EXAMPLES):
+        self.capacity = max(1, memory_bytes // ENTRY_BYTES)
+        self.fan_in = max(2, memory_bytes // RUN_BUFFER)
+        self.spill_dir = spill_dir
+        self.max_examples = max_examples
+        self._seen: Dict[int, int] = {}
+        self._count = 0
+        self._examples: List[Tuple[int, int, int]] = []  # (row, first row in its run, digest)
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._runs: List[Path] = []
+        self._run_names = 0
+
+    def add(self, key_columns: Sequence[Sequence[str]], first_row: int) -> None:
+        """One batch: the key columns' cells for rows `first_row`, `first_row + 1`, ..."""
+        digests = _digests(key_columns)
+        rows = range(first_row, first_row + len(digests))
+        firsts = list(map(self._seen.setdefault, digests, rows))
+        repeated = bytearray(map(operator.ne, firsts, rows))
+        found = repeated.count(1)
+        if found:
+            self._count += found
+            i = repeated.find(1)
+            while i != -1 and len(self._examples) < self.max_examples:
+                self._examples.append((rows[i], firsts[i], digests[i]))
+                i = repeated.find(1, i + 1)
+        if len(self._seen) >= self.capacity:
+            self._spill()
+
+    def _run_path(self) -> Path:
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="bcsv-pk-", dir=self.spill_dir)
+        self._run_names += 1
+        return Path(self._tmp.name) / f"run-{self._run_names:06d}"
+
+    def _spill(self) -> None:
+        seen, self._seen = self._seen, {}
+        path = self._run_path()
+        with open(path, "wb") as f:
+            f.writelines(_key_bytes(d) + seen[d].to_bytes(ROW_BYTES, "big")
+                         for d in sorted(seen))
+        self._runs.append(path)
+
+    def _reduce_runs(self) -> None:
+        """Merge runs in passes until one merge can read them all at once."""
+        while len(self._runs) > self.fan_in:
+            batch, self._runs = self._runs[:self.fan_in], self._runs[self.fan_in:]
+            path = self._run_path()
+            with open(path, "wb") as f:
+                f.writelines(heapq.merge(*map(_read_run, batch)))
+            for run in batch:
+                run.unlink()
+            self._runs.append(path)
+
+    def finish(self) -> DuplicateKeys:
+        """The duplicates; releases the spilled runs."""
+        try:
+            if not self._runs:  # everything fit: the in-memory firsts are the real ones
+                return DuplicateKeys(self._count, [(r, f) for r, f, _ in self._examples])
+            if self._seen:
+                self._spill()
+            self._reduce_runs()
+            return self._merge()
+        finally:
+            self.close()
+
+    def _merge(self) -> DuplicateKeys:
+        count = self._count
+        lowest: List[Tuple[int, int]] = []  # max-heap of (-row, first) over the merge's repeats
+        # An example found in memory may duplicate a row in an earlier run.
+        watched = {_key_bytes(d): d for _, _, d in self._examples}
+        global_first: Dict[int, int] = {}
+        previous, first = None, 0
+        for record in heapq.merge(*map(_read_run, self._runs)):
+            key, row = record[:KEY_BYTES], int.from_bytes(record[KEY_BYTES:], "big")
+            if key != previous:
+                previous, first = key, row
+                if key in watched:
+                    global_first[watched[key]] = row
+                continue
+            count += 1
+            if len(lowest) < self.max_examples:
+                heapq.heappush(lowest, (-row, first))
+            elif row < -lowest[0][0]:
+                heapq.heapreplace(lowest, (-row, first))
+        examples = [(-r, f) for r, f in lowest]
+        examples += [(r, global_first.get(d, f)) for r, f, d in self._examples]
+        return DuplicateKeys(count, sorted(examples)[:self.max_examples])
+
+    def close(self) -> None:
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+        self._runs = []
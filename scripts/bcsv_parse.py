@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Parallel CSV parsing: split a file at record boundaries, parse the pieces on a pool.
+
+csv.reader is a single-threaded state machine, so one reader parses one record at a
+time on one core however big the file. This module splits the data part of the
+file into byte ranges that each start and end on a record boundary, and parses the
+ranges independently, each in a worker, in the declared encoding:
+
+  read_header     the header record and the byte offset where the data starts
+  record_end      the next record boundary at or after an offset, given a known one
+  split_records   byte ranges of about `chunk_bytes` each, ending at record boundaries
+  read_records    the records of one range, decoded incrementally in `buffer_size`
+                  reads (bounded memory, like validate_bcsv's single reader)
+  map_chunks      fn(records of a range, *args) for every range on a process (or
+                  thread) pool, yielded in file order with a bounded number in flight
+
+Finding a boundary is quote-aware. A newline ends a record only outside a quoted
+field, and under RFC 4180 quoting (the csv module's default: `"` quotes, doubled
+inside a field) a position is outside quotes exactly when an even number of quote
+characters lie between it and the start of the range. So the splitter reads the file
+once, counting quote bytes with bytes.count (C speed, far faster than parsing), and
+cuts at the first newline after each target offset with even parity. A quote
+character inside an unquoted field (`5" tall`), which csv reads literally, throws the
+count off; such files should be parsed serially (`jobs=1`).
+
+Cutting at b"\\n" and counting b'"' needs both bytes to mean only themselves, which
+holds for UTF-8, the ISO-8859 / Windows code pages and the other single- and
+multi-byte encodings whose trail bytes avoid ASCII controls and `"`, but not for
+UTF-16/32 or stateful ones (ISO-2022, UTF-7). `splittable(codec)` says which; the
+others must be read serially.
+
+bcsv's dialect handling is the caller's: resolve `dialect` with
+validate_bcsv.resolve_dialect, which also lists what v0 doesn't honor (reported as
+DIALECT_UNSUPPORTED), and pass the delimiter and codec here. validate_bcsv's
+`jobs` option is built on this module.
+
+Usage:
+    python scripts/bcsv_parse.py data.csv                 # records and chunk counts
+    python scripts/bcsv_parse.py data.csv --jobs 8 --delimiter ';' --encoding latin-1
+"""
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_CHUNK_BYTES = 8 << 20  # bytes of CSV per parallel task
+SCAN_BLOCK = 1 << 20  # bytes per read while looking for boundaries
+POOLS = ("process", "thread")
+
+_STATEFUL = ("iso2022", "utf-7", "hz")
+
+
+def splittable(codec: str) -> bool:
+    """Whether byte ranges cut at b"\\n" decode independently in `codec`."""
+    name = codecs.lookup(_plain(codec)).name
+    if name.startswith(_STATEFUL):
+        return False
+    return '\n"'.encode(name) == b'\n"'
+
+
+def _plain(codec: str) -> str:
+    """The codec for a range that doesn't start the file (a BOM only comes first)."""
+    return "utf-8" if codecs.lookup(codec).name == "utf-8-sig" else codec
+
+
+def _record_end(f, start: int, target: int, size: int, quote: bytes) -> int:
+    """Offset just past the first record-ending newline at or after `target`.
+
+    `start` must be a record start; parity is counted from there. EOF if no
+    newline qualifies.
+    """
+    f.seek(start)
+    parity, pos = 0, start
+    while pos < target:
+        block = f.read(min(SCAN_BLOCK, target - pos))
+        if not block:
+            return size
+        parity ^= block.count(quote) & 1
+        pos += len(block)
+    while pos < size:
+        block = f.read(SCAN_BLOCK)
+        if not block:
+            break
+        i = block.find(b"\n")
+        while i != -1:
+            if (parity ^ block.count(quote, 0, i)) & 1 == 0:
+                return pos + i + 1
+            i = block.find(b"\n", i + 1)
+        parity ^= block.count(quote) & 1
+        pos += len(block)
+    return size
+
+
+def record_end(f, start: int, target: int, quotechar: str = '"') -> int:
+    """Offset just past the first record-ending newline at or after `target` in the
+    binary file `f`, counting quote parity from `start`, a known record start (EOF if
+    none qualifies). Offsets are absolute; `f` is left somewhere after the result."""
+    return _record_end(f, start, target, os.fstat(f.fileno()).st_size, quotechar.encode("ascii"))
+
+
+def read_header(path, delimiter: str = ",", codec: str = "utf-8-sig",
+                quotechar: str = '"') -> Tuple[List[str], int]:
+    """(header record, byte offset of the first data record); ([], size) if empty."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = _record_end(f, 0, 0, size, quotechar.encode("ascii"))
+        f.seek(0)
+        text = f.read(end).decode(codec, errors="replace")
+    header = next(csv.reader(io.StringIO(text, newline=""), delimiter=delimiter,
+                             quotechar=quotechar), [])
+    return header, end
+
+
+def split_records(path, start: int = 0, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                  quotechar: str = '"') -> List[Tuple[int, int]]:
+    """[(begin, end)] byte ranges covering `path` from `start` (a record start) to EOF."""
+    quote = quotechar.encode("ascii")
+    ranges: List[Tuple[int, int]] = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        begin = start
+        while begin < size:
+            end = _record_end(f, begin, begin + max(1, chunk_bytes), size, quote)
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw reader over bytes [start, end) of a file."""
+
+    def __init__(self, f, start: int, end: int):
+        self._f = f
+        self._left = end - start
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._left <= 0:
+            return 0
+        view = memoryview(buffer)[:min(len(buffer), self._left)]
+        n = self._f.readinto(view)
+        self._left -= n
+        return n
+
+
+def read_records(path, start: int, end: int, delimiter: str = ",", codec: str = "utf-8-sig",
+                 buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+                 quotechar: str = '"') -> Iterator[List[str]]:
+    """The records in bytes [start, end), decoded incrementally."""
+    with open(path, "rb") as f:
+        text = io.TextIOWrapper(io.BufferedReader(_RangeReader(f, start, end), buffer_size),
+                                encoding=codec if start == 0 else _plain(codec),
+                                errors="replace", newline="")
+        yield from csv.reader(text, delimiter=delimiter, quotechar=quotechar)
+
+
+def map_chunks(fn: Callable[..., Any], path, ranges: Sequence[Tuple[int, int]],
+               args: Tuple = (), *, delimiter: str = ",", codec: str = "utf-8-sig",
+               jobs: Optional[int] = None, pool: str = "process",
+               executor: Optional[Executor] = None,
+               buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> Iterator[Any]:
+    """fn(records, *args) for each range, in range order, computed `jobs` at a time.
+
+    `fn` runs in the worker, so return something smaller than the records where you
+    can (counts, issues); it and `args` must pickle for a process pool. At most
+    2 * jobs results are pending at once. Pass `executor` to reuse a pool (e.g. one
+    whose initializer set up state `fn` needs).
+    """
+    if pool not in POOLS:
+        raise ValueError(f"pool must be one of {POOLS}, got {pool!r}")
+    jobs = jobs or os.cpu_count() or 1
+    own = executor is None
+    if own:
+        executor = (ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor)(jobs)
+    try:
+        pending: deque = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(_run_chunk, fn, path, start, end, args,
+                                           delimiter, codec, buffer_size))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        if own:
+            executor.shutdown(cancel_futures=True)
+
+
+def _run_chunk(fn, path, start: int, end: int, args: Tuple, delimiter: str, codec: str,
+               buffer_size: int) -> Any:
+    return fn(read_records(path, start, end, delimiter, codec, buffer_size), *args)
+
+
+def _count(records) -> int:
+    return sum(1 for _ in records)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("csv", type=Path)
+    ap.add_argument("--delimiter", default=",", help="field separator (default: ',')")
+    ap.add_argument("--encoding", default="utf-8-sig", help="character encoding (default: utf-8)")
+    ap.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                    help="workers; 0 = one per CPU (default: 0)")
+    ap.add_argument("--pool", choices=POOLS, default="process", help="worker kind")
+    ap.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES, metavar="BYTES",
+                    help=f"bytes per task (default: {DEFAULT_CHUNK_BYTES})")
+    args = ap.parse_args()
+
+    if not splittable(args.encoding):
+        print(f"✗ {args.encoding} can't be split at byte offsets; read it serially",
+              file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    header, data_start = read_header(args.csv, args.delimiter, args.encoding)
+    ranges = split_records(args.csv, data_start, args.chunk_bytes)
+    records = sum(map_chunks(_count, args.csv, ranges, delimiter=args.delimiter,
+                             codec=args.encoding, jobs=args.jobs or None, pool=args.pool))
+    print(f"✓ {args.csv}: {len(header)} columns, {records} records in {len(ranges)} "
+          f"chunk(s) ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Infer a bcsv metadata document from a CSV, in one streaming pass.
+
+The CSV is read once, `batch_rows` records at a time, with the raw bytes feeding
+SHA-256 on the way in (bcsv_integrity.HashingReader), so the document comes out with
+its `file_hash`. Per column, only a fixed-size profile is kept:
+
+  datatype   the candidates integer, number, boolean, datetime, date, time, each
+             dropped at the first chunk bcsv_coerce.py (the engine validate_bcsv
+             uses) rejects; the first survivor wins, else string
+  minimum /  of the typed values, for integer and number columns (NaN is ignored; an
+  maximum    INF leaves that side undeclared)
+  lengths    min_length / max_length of the values, for string columns
+  NA codes   which of `na_tokens` ("NA", "NULL", ...) occur; they are declared as
+             `na_strings` and count as missing everywhere else in the profile
+  levels     the distinct values, kept exactly while there are at most `max_levels`;
+             past that they are handed to a k-minimum-values sketch, which estimates
+             the distinct count (for the summary) in constant memory
+
+A column that ends as string, with at most `max_levels` distinct values each seen at
+least `LEVEL_MIN_REPEAT` times on average, becomes `categorical` with those values
+as sorted `levels` (declare `ordered` by hand where the order means something).
+
+Every declared bound, length, level and NA code is taken from the data, so the CSV
+validates against the document it was profiled into (validate_bcsv.py). The result
+is a starting point: descriptions, units and a primary key are left to the author.
+
+Usage:
+    python scripts/bcsv_profile.py data.csv                       # metadata JSON to stdout
+    python scripts/bcsv_profile.py data.csv -o data.json --description "Trial table"
+    python scripts/bcsv_profile.py export.csv -o export.json --delimiter ';' --max-levels 50
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import io
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import filterfalse, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bcsv_coerce import NUMERIC, ColumnSpec, coerce_column  # noqa: E402
+from bcsv_integrity import HashingReader  # noqa: E402
+from validate_bcsv import DEFAULT_BATCH_ROWS, DEFAULT_CHUNK_SIZE  # noqa: E402
+
+BCSV_CONTEXT = "https://behaverse.org/schemas/bcsv/context.jsonld"
+
+# Tried in this order; the first that parses every value wins (so 0/1 is integer).
+CANDIDATES = ("integer", "number", "boolean", "datetime", "date", "time")
+NA_TOKENS = ("NA", "N/A", "n/a", "NULL", "null", "None")  # "" is always null (CSVW)
+MAX_LEVELS = 32
+LEVEL_MIN_REPEAT = 2
+SKETCH_SIZE = 256  # k of the k-minimum-values sketch: about 1/sqrt(k) = 6% error
+
+_HASH_SPACE = 1 << 64
+
+
+class ProfileError(ValueError):
+    """The CSV can't be profiled (undecodable, no header)."""
+
+
+class DistinctSketch:
+    """k-minimum-values estimate of a column's distinct count, in O(k) memory.
+
+    Keeps the k smallest distinct 64-bit hashes seen; if the k-th smallest is at
+    fraction u of the hash space, about (k - 1) / u distinct values produced them.
+    """
+
+    def __init__(self, k: int = SKETCH_SIZE):
+        self.k = k
+        self._smallest: List[int] = []  # max-heap, negated
+        self._members: Set[int] = set()
+
+    def update(self, values: Iterable[str]) -> None:
+        hashes = set(map((_HASH_SPACE - 1).__and__, map(hash, values)))
+        if len(self._smallest) == self.k:
+            hashes = set(filter((-self._smallest[0]).__gt__, hashes))
+        for h in hashes - self._members:
+            if len(self._smallest) < self.k:
+                heapq.heappush(self._smallest, -h)
+            elif h < -self._smallest[0]:
+                self._members.discard(-heapq.heapreplace(self._smallest, -h))
+            else:
+                continue
+            self._members.add(h)
+
+    @property
+    def exact(self) -> bool:
+        """Fewer than k distinct values so far: the estimate is the count."""
+        return len(self._smallest) < self.k
+
+    def estimate(self) -> int:
+        if self.exact:
+            return len(self._smallest)
+        return round((self.k - 1) * _HASH_SPACE / (-self._smallest[0] + 1))
+
+
+@dataclass
+class ColumnProfile:
+    """What one pass learns about a column; `declaration()` turns it into bcsv."""
+
+    name: str
+    na: frozenset
+    max_levels: int = MAX_LEVELS
+    candidates: List[str] = field(default_factory=lambda: list(CANDIDATES))
+    present: int = 0
+    na_seen: Counter = field(default_factory=Counter)
+    minimum: Dict[str, Any] = field(default_factory=dict)  # per numeric candidate
+    maximum: Dict[str, Any] = field(default_factory=dict)
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    distinct: Optional[Set[str]] = field(default_factory=set)  # None: past max_levels
+    sketch: DistinctSketch = field(default_factory=DistinctSketch)
+
+    def add(self, cells: Sequence[str]) -> None:
+        """One chunk of the column's cells."""
+        if not self.na.isdisjoint(cells):
+            self.na_seen.update(filter(self.na.__contains__, cells))
+            cells = list(filterfalse(self.na.__contains__, cells))
+        if not cells:
+            return
+        self.present += len(cells)
+        for datatype in list(self.candidates):
+            if datatype == "number" and "integer" in self.candidates:
+                continue  # every integer is a number: the integer bounds stand in for now
+            spec = ColumnSpec(self.name, datatype, na=frozenset())
+            result = coerce_column(spec, cells, values=datatype in NUMERIC)
+            if "COERCION_FAILED" in result.masks:
+                self.candidates.remove(datatype)
+                if datatype == "integer" and datatype in self.minimum:
+                    self.minimum["number"] = self.minimum["integer"]
+                    self.maximum["number"] = self.maximum["integer"]
+            elif datatype in NUMERIC:
+                typed = result.values if datatype == "integer" else \
+                    list(filterfalse(math.isnan, result.values))
+                if typed:
+                    lo, hi = min(typed), max(typed)
+                    self.minimum[datatype] = min(lo, self.minimum.get(datatype, lo))
+                    self.maximum[datatype] = max(hi, self.maximum.get(datatype, hi))
+        lengths = list(map(len, cells))
+        lo, hi = min(lengths), max(lengths)
+        self.min_length = lo if self.min_length is None else min(lo, self.min_length)
+        self.max_length = hi if self.max_length is None else max(hi, self.max_length)
+        if self.distinct is None:
+            self.sketch.update(cells)
+        else:
+            self.distinct.update(cells)
+            if len(self.distinct) > self.max_levels:  # from here on, only estimate
+                self.sketch.update(self.distinct)
+                self.distinct = None
+
+    @property
+    def datatype(self) -> str:
+        if self.present and self.candidates:
+            return self.candidates[0]
+        if self.distinct and len(self.distinct) * LEVEL_MIN_REPEAT <= self.present:
+            return "categorical"
+        return "string"
+
+    @property
+    def distinct_count(self) -> Tuple[int, bool]:
+        """(distinct values, whether that is exact rather than estimated)."""
+        if self.distinct is not None:
+            return len(self.distinct), True
+        return self.sketch.estimate(), self.sketch.exact
+
+    def declaration(self) -> Dict[str, Any]:
+        datatype = self.datatype
+        col: Dict[str, Any] = {"name": self.name, "datatype": datatype}
+        tokens = sorted(t for t in self.na_seen if t != "")
+        if tokens:
+            col["na_strings"] = tokens
+        if datatype in NUMERIC and datatype in self.minimum:
+            for key, bound in (("minimum", self.minimum), ("maximum", self.maximum)):
+                if not isinstance(bound[datatype], float) or math.isfinite(bound[datatype]):
+                    col[key] = bound[datatype]  # an INF value leaves that side open
+        elif datatype == "string" and self.present:
+            col["min_length"], col["max_length"] = self.min_length, self.max_length
+        elif datatype == "categorical":
+            col["levels"] = sorted(self.distinct)
+        return col
+
+
+@dataclass
+class TableProfile:
+    columns: List[ColumnProfile]
+    rows: int
+    file_hash: str
+    delimiter: str = ","
+    encoding: str = "utf-8"
+
+
+def profile_csv(csv_path, *, delimiter: str = ",", encoding: str = "utf-8",
+                na_tokens: Sequence[str] = NA_TOKENS, max_levels: int = MAX_LEVELS,
+                batch_rows: int = DEFAULT_BATCH_ROWS,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> TableProfile:
+    """Profile every column of a CSV in one pass, hashing it on the way."""
+    na = frozenset([""]) | frozenset(na_tokens)
+    codec = "utf-8-sig" if encoding.lower().replace("_", "-") in ("utf-8", "utf8") else encoding
+    with open(csv_path, "rb") as raw:
+        hashing = HashingReader(raw)
+        text = io.TextIOWrapper(io.BufferedReader(hashing, buffer_size=chunk_size),
+                                encoding=codec, newline="")
+        reader = csv.reader(text, delimiter=delimiter)
+        try:
+            header = next(reader, None)
+            if not header:
+                raise ProfileError(f"{csv_path}: no header row")
+            columns = [ColumnProfile(name, na, max_levels) for name in header]
+            width, rows = len(header), 0
+            while batch := list(islice(reader, batch_rows)):
+                if min(map(len, batch)) < width:  # short records: missing cells read as empty
+                    batch = [r + [""] * (width - len(r)) if len(r) < width else r
+                             for r in batch]
+                for column, cells in zip(columns, zip(*batch)):
+                    column.add(cells)
+                rows += len(batch)
+        except UnicodeDecodeError as e:
+            raise ProfileError(f"{csv_path}: not {encoding} ({e.reason} at byte {e.start} "
+                               f"of a read); pass the file's encoding") from None
+        digest = hashing.hexdigest(chunk_size)
+    return TableProfile(columns, rows, digest, delimiter, encoding)
+
+
+def _name(stem: str) -> str:
+    return re.sub(r"[^a-z0-9_-]+", "-", stem.lower()).strip("-") or "table"
+
+
+def metadata_for(profile: TableProfile, csv_path, metadata_path=None,
+                 description: Optional[str] = None) -> Dict[str, Any]:
+    """The bcsv document for a profiled CSV; `url` is relative to `metadata_path`'s
+    directory (or just the file name when there is no metadata path)."""
+    csv_path = Path(csv_path)
+    url = csv_path.name if metadata_path is None else \
+        Path(os.path.relpath(csv_path, Path(metadata_path).parent)).as_posix()
+    meta: Dict[str, Any] = {
+        "@context": BCSV_CONTEXT,
+        "@type": "csvw:Table",
+        "name": _name(csv_path.stem),
+        "description": description or f"Profiled from {csv_path.name} "
+                                      f"({profile.rows} records)",
+        "url": url,
+        "file_hash": profile.file_hash,
+    }
+    dialect = {}
+    if profile.delimiter != ",":
+        dialect["delimiter"] = profile.delimiter
+    if profile.encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+        dialect["encoding"] = profile.encoding
+    if dialect:
+        meta["dialect"] = dialect
+    meta["table_schema"] = {"columns": [c.declaration() for c in profile.columns]}
+    return meta
+
+
+def _print_summary(profile: TableProfile, out) -> None:
+    print(f"{profile.rows} records, {len(profile.columns)} columns", file=out)
+    for c in profile.columns:
+        count, exact = c.distinct_count
+        missing = sum(c.na_seen.values())
+        print(f"  {c.name}: {c.datatype}, {'' if exact else '≈'}{count} distinct"
+              + (f", {missing} missing" if missing else ""), file=out)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("csv", type=Path, help="CSV to profile")
+    ap.add_argument("-o", "--output", type=Path, metavar="METADATA.json",
+                    help="write the metadata here (default: print it)")
+    ap.add_argument("--description", help="the document's description")
+    ap.add_argument("--delimiter", default=",", help="field separator (default: ',')")
+    ap.add_argument("--encoding", default="utf-8", help="character encoding (default: utf-8)")
+    ap.add_argument("--max-levels", type=int, default=MAX_LEVELS, metavar="N",
+                    help=f"most distinct values a categorical column may have "
+                         f"(default: {MAX_LEVELS}; 0: never infer categorical)")
+    ap.add_argument("--na", action="append", metavar="TOKEN",
+                    help="a missing-value code to recognize (repeatable; default: "
+                         f"{', '.join(NA_TOKENS)}); the empty cell always is one")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, metavar="BYTES",
+                    help=f"bytes per read of the CSV (default: {DEFAULT_CHUNK_SIZE})")
+    args = ap.parse_args()
+
+    if len(args.delimiter) != 1:
+        ap.error("--delimiter must be one character")
+    try:
+        profile = profile_csv(args.csv, delimiter=args.delimiter, encoding=args.encoding,
+                              na_tokens=NA_TOKENS if args.na is None else args.na,
+                              max_levels=args.max_levels, chunk_size=args.chunk_size)
+    except (OSError, LookupError, ProfileError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    meta = metadata_for(profile, args.csv, args.output, args.description)
+    text = json.dumps(meta, indent=2, ensure_ascii=False) + "\n"
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        tmp = args.output.with_name(args.output.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(args.output)
+    _print_summary(profile, sys.stderr if args.output is None else sys.stdout)
+    if args.output is not None:
+        print(f"✓ wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
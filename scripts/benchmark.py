@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite for the generators and validators, with regression baselines.
+
+Times each stage of the pipeline on the real schemas and on synthetic, scaled-up
+LinkML sources written to a temp dir (nothing is fetched; `linkml:types` resolves from
+the installed linkml-runtime):
+
+  trial-<T>x<A>     a trial-like multi-table schema: T tables × A annotated attributes
+                    (default 50 × 500), enum-ranged slots included;
+  event-verbs-<V>   the real event schema with VerbEnum (and the `vocabularies`
+                    annotation) grown to V verbs (default 5000).
+
+Stages per schema (those that apply):
+
+  schemaview          SchemaView construction
+  gen-json-schema     LinkML JSON Schema generator (in-process, generate.py's options)
+  postprocess-schema  linkml_postprocess.postprocess_schema
+  gen-jsonld-context  LinkML JSON-LD context generator
+  postprocess-context linkml_postprocess.postprocess_context
+  field-definitions   emit_field_definitions.build
+  enum-consistency    validate_schemas.check_linkml_enum_consistency
+
+plus the repo-wide validators (`validate:examples`, `validate:bcsv-conformance`,
+`validate:bcsv-validator`). Each
+stage runs `--repeat` times on a fresh SchemaView (built untimed, except for the
+`schemaview` stage itself) and the minimum is kept.
+
+Results are compared against a stored baseline (`--baseline`, default
+`.benchmarks/baseline.json`, git-ignored — timings are machine-specific); a stage slower
+than baseline × (1 + `--threshold`) is flagged and the run exits 1. `--save-baseline`
+records the current run instead. A full-scale run takes minutes (LinkML's own SchemaView
+and JSON Schema generator dominate on the 25k-attribute trial); `--scale 0.1` gives a
+quick pass.
+
+Usage:
+    python scripts/benchmark.py                    # run + compare against the baseline
+    python scripts/benchmark.py --save-baseline    # record a new baseline
+    python scripts/benchmark.py --scale 0.1        # 10× smaller synthetic schemas (quick)
+    python scripts/benchmark.py --only trial --report bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml  # type: ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import generate  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / ".benchmarks" / "baseline.json"
+
+# Stage timings below this are dominated by noise; never flag them as regressions.
+_MIN_SECONDS = 0.005
+
+
+# --- synthetic schemas -------------------------------------------------------
+
+def synthetic_trial(tables: int, attributes: int) -> Dict[str, Any]:
+    """A trial-shaped LinkML schema: a tree_root container + `tables` annotated tables."""
+    enum_values = {f"value_{i}": {"description": f"Synthetic level {i}."} for i in range(8)}
+    classes: Dict[str, Any] = {
+        "TrialData": {
+            "description": "Root container mapping each table to an array of its rows.",
+            "tree_root": True,
+            "attributes": {
+                f"Table{t}": {"multivalued": True, "range": f"Table{t}",
+                              "inlined_as_list": True,
+                              "description": f"Rows of the Table{t} table."}
+                for t in range(tables)
+            },
+        },
+    }
+    for t in range(tables):
+        attrs: Dict[str, Any] = {}
+        for a in range(attributes):
+            attr: Dict[str, Any] = {
+                "description": f"Synthetic field {a} of table {t}.",
+                "annotations": {
+                    "categories": {"value": [f"Category{a % 7}"]},
+                    "bdm_type": {"value": "string"},
+                },
+            }
+            if a == 0:
+                attr["required"] = True
+                attr["annotations"]["bdm_type"] = {"value": "PRIMARY KEY"}
+            elif a % 10 == 0:
+                attr["range"] = "SyntheticEnum"
+            elif a % 10 == 1:
+                attr["range"] = "integer"
+            elif a % 10 == 2:
+                attr["annotations"]["notes"] = {"value": [f"Note on field {a}."]}
+                attr["annotations"]["range_description"] = {"value": "free text"}
+            attrs[f"t{t}_field_{a}"] = attr
+        classes[f"Table{t}"] = {
+            "title": f"Table {t}",
+            "description": f"Synthetic table {t}.",
+            "annotations": {"notes": {"value": [f"Synthetic table {t} notes."]}},
+            "attributes": attrs,
+        }
+    return {
+        "id": "https://behaverse.org/schemas/benchmark-trial",
+        "name": "trial",
+        "title": "Synthetic Trial Schema",
+        "description": "Synthetic multi-table schema for benchmarking.",
+        "version": "0.0",
+        "prefixes": {"trial": "https://behaverse.org/schemas/benchmark-trial#",
+                     "linkml": "https://w3id.org/linkml/"},
+        "default_prefix": "trial",
+        "default_range": "string",
+        "imports": ["linkml:types"],
+        "enums": {"SyntheticEnum": {"permissible_values": enum_values}},
+        "classes": classes,
+    }
+
+
+def synthetic_event(verbs: int) -> Dict[str, Any]:
+    """The real event schema with VerbEnum and the `vocabularies` annotation grown to `verbs`."""
+    doc = yaml.safe_load((ROOT / "event" / generate.LINKML_SRC).read_text())
+    pvs = doc["enums"]["VerbEnum"]["permissible_values"]
+    vocab = doc["annotations"]["vocabularies"]["value"]["verbs"]
+    for i in range(len(pvs), verbs):
+        name = f"bdm:synthetic_verb_{i}"
+        pvs[name] = None
+        vocab.append({"name": name, "object_types": ["bdm:RuntimeInstance"],
+                      "layer": "synthetic", "description": f"Synthetic verb {i}."})
+    return doc
+
+
+# --- stages ------------------------------------------------------------------
+
+def _fresh_view(src: Path):
+    from linkml_runtime import SchemaView
+
+    return SchemaView(str(src))
+
+
+Stage = Tuple[Optional[Callable[[], Any]], Callable[..., Any]]  # (untimed setup, timed fn)
+
+
+def schema_stages(src: Path, cfg: Dict[str, Any]) -> Dict[str, Stage]:
+    """{stage: (setup, fn)} for one LinkML source.
+
+    `setup` (untimed) builds a fresh SchemaView so memoized per-view state never leaks
+    between repeats; `fn` receives it. Generator output is re-copied for every repeat
+    since the post-processors mutate it in place.
+    """
+    from emit_field_definitions import build as build_field_definitions
+    from linkml_postprocess import postprocess_context, postprocess_schema
+    from validate_schemas import check_linkml_enum_consistency
+
+    view = functools.partial(_fresh_view, src)
+    raw_schema = json.dumps(generate._gen_json_schema(src))
+    stages: Dict[str, Stage] = {
+        "schemaview": (None, view),
+        "gen-json-schema": (None, lambda: generate._gen_json_schema(src)),
+        "postprocess-schema": (lambda: (json.loads(raw_schema), view()),
+                               lambda args: postprocess_schema(*args)),
+    }
+    if cfg["emits_context"]:
+        raw_context = json.dumps(generate._gen_jsonld_context(src))
+        stages["gen-jsonld-context"] = (None, lambda: generate._gen_jsonld_context(src))
+        stages["postprocess-context"] = (lambda: (json.loads(raw_context), view()),
+                                         lambda args: postprocess_context(*args))
+    if cfg["emits_field_definitions"]:
+        stages["field-definitions"] = (view, lambda sv: build_field_definitions(src.parent, sv))
+    stages["enum-consistency"] = (None, lambda: check_linkml_enum_consistency([], [src]))
+    return stages
+
+
+def _quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a validator so its per-file ✓ lines don't flood the benchmark output."""
+    def run() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def validator_stages() -> Dict[str, Stage]:
+    from validate_schemas import check_bcsv_conformance, check_bcsv_validator, validate_examples
+
+    return {
+        "examples": (None, _quiet(lambda: validate_examples([]))),
+        "bcsv-conformance": (None, _quiet(lambda: check_bcsv_conformance([]))),
+        "bcsv-validator": (None, _quiet(lambda: check_bcsv_validator([]))),
+    }
+
+
+def _time(stage: Stage, repeat: int) -> float:
+    """Best-of-`repeat` wall time of the stage's fn (its setup is not timed)."""
+    setup, fn = stage
+    best = float("inf")
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(cases: List[str], scale: float, repeat: int) -> Dict[str, float]:
+    """Time every stage of every case -> {"<case>/<stage>": seconds}."""
+    tables = max(1, round(50 * scale))
+    attributes = max(1, round(500 * scale))
+    verbs = max(1, round(5000 * scale))
+    by_name = {cfg["name"]: cfg for cfg in generate.SCHEMAS}
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="schemas-bench-") as tmp:
+        sources: Dict[str, tuple[Path, Dict[str, Any]]] = {}
+        for cfg in generate.SCHEMAS:
+            src = ROOT / cfg["name"] / generate.LINKML_SRC
+            if src.exists():
+                sources[cfg["name"]] = (src, cfg)
+        for label, doc, cfg in [
+            (f"trial-{tables}x{attributes}", synthetic_trial(tables, attributes), by_name["trial"]),
+            (f"event-verbs-{verbs}", synthetic_event(verbs), by_name["event"]),
+        ]:
+            # The field-definitions emitter dispatches on the directory name.
+            sdir = Path(tmp) / label / cfg["name"]
+            sdir.mkdir(parents=True)
+            (sdir / generate.LINKML_SRC).write_text(yaml.safe_dump(doc, sort_keys=False))
+            sources[label] = (sdir / generate.LINKML_SRC, cfg)
+
+        for label, (src, cfg) in sources.items():
+            if cases and not any(label.startswith(c) for c in cases):
+                continue
+            print(f"{label}:", flush=True)
+            for stage, spec in schema_stages(src, cfg).items():
+                results[f"{label}/{stage}"] = seconds = _time(spec, repeat)
+                print(f"  {stage:<22}{seconds * 1000:>10.1f} ms", flush=True)
+    if not cases or any("validate".startswith(c) or c.startswith("validate") for c in cases):
+        print("validate:")
+        for stage, spec in validator_stages().items():
+            results[f"validate/{stage}"] = seconds = _time(spec, repeat)
+            print(f"  {stage:<22}{seconds * 1000:>10.1f} ms")
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[str]:
+    """Stages slower than baseline × (1 + threshold), as printable lines."""
+    regressions = []
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if base is None or max(seconds, base) < _MIN_SECONDS:
+            continue
+        if seconds > base * (1 + threshold):
+            regressions.append(f"{key}: {seconds * 1000:.1f} ms vs baseline {base * 1000:.1f} ms "
+                               f"(+{(seconds / base - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                    help="run only cases whose name starts with PREFIX (repeatable; e.g. "
+                         "trial, event-verbs, catalog, validate)")
+    ap.add_argument("--scale", type=float, default=1.0,
+                    help="multiplier on the synthetic sizes (default 1.0 = 50×500 tables, 5000 verbs)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per stage; the minimum is kept")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                    help="baseline file to compare against / save to")
+    ap.add_argument("--save-baseline", action="store_true",
+                    help="record this run as the baseline instead of comparing")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="flag stages slower than baseline by more than this fraction (default 0.25)")
+    ap.add_argument("--report", type=Path, metavar="REPORT.json",
+                    help="also write this run's results as JSON")
+    args = ap.parse_args()
+
+    results = run(args.only, args.scale, args.repeat)
+    doc = {"python": platform.python_version(), "machine": platform.machine(),
+           "scale": args.scale, "repeat": args.repeat, "results": results}
+    if args.report:
+        args.report.write_text(json.dumps(doc, indent=2) + "\n")
+
+    if args.save_baseline:
+        # Merge, so an --only run refreshes just its own stages.
+        previous: Dict[str, Any] = {}
+        if args.baseline.exists():
+            previous = json.loads(args.baseline.read_text()).get("results", {})
+        doc["results"] = {**previous, **results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(doc, indent=2) + "\n")
+        print(f"\nbaseline saved: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline} — run with --save-baseline to record one")
+        return 0
+    baseline: Optional[Dict[str, Any]] = json.loads(args.baseline.read_text())
+    if baseline.get("scale") != args.scale:
+        print(f"\nwarning: baseline was recorded at --scale {baseline.get('scale')}, "
+              f"this run used {args.scale}; synthetic cases will not match")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n✗ {len(regressions)} stage(s) regressed beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\n✓ no stage regressed beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Content-addressed build cache for scripts/generate.py.
+
+Each schema's rendered artifacts (schema.json / context.jsonld / field-definitions.json,
+as the exact text that would be written) are stored under a key that digests everything
+the render depends on:
+
+  - the LinkML source and, recursively, every local file it `imports`,
+  - the generator scripts (generate.py, linkml_postprocess.py, emit_field_definitions.py,
+    schema_index.py, and this module),
+  - the installed linkml / linkml-runtime versions (which also pin `linkml:types` and
+    the other `linkml:` imports),
+  - the schema's artifact config entry from generate.py's `SCHEMAS`.
+
+When the key matches, generate.py compares/writes the cached text directly and never
+imports LinkML, so a no-op `--check` costs one YAML parse and a few hashes per schema.
+
+Entries live in `<cache_dir>/<schema>/<key>.json`; storing a new entry prunes the
+schema's older ones. The cache is purely local (git-ignored) and always safe to delete.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import yaml  # type: ignore
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parent
+DEFAULT_CACHE_DIR = ROOT / ".generate-cache"
+
+# Bump to invalidate every existing entry when the entry layout changes.
+CACHE_FORMAT = "1"
+
+GENERATOR_SCRIPTS = [
+    SCRIPTS_DIR / "generate.py",
+    SCRIPTS_DIR / "linkml_postprocess.py",
+    SCRIPTS_DIR / "emit_field_definitions.py",
+    SCRIPTS_DIR / "schema_index.py",
+    SCRIPTS_DIR / "build_cache.py",
+]
+
+_TOOLCHAIN = ("linkml", "linkml-runtime")
+
+# libyaml's loader when available: the pure-Python one dominates a fully cached run.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _toolchain_versions() -> Dict[str, str]:
+    out = {}
+    for dist in _TOOLCHAIN:
+        try:
+            out[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            out[dist] = "absent"
+    return out
+
+
+def source_closure(src: Path) -> Iterator[Path]:
+    """Yield `src` and every local file it (transitively) imports, each once.
+
+    CURIE imports (`linkml:types`) resolve into the installed linkml-runtime and are
+    covered by the toolchain versions, so only bare/relative names are followed.
+    """
+    seen: set[Path] = set()
+    stack = [src.resolve()]
+    while stack:
+        path = stack.pop()
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+        yield path
+        doc = yaml.load(path.read_text(), Loader=_YamlLoader) or {}
+        for imp in doc.get("imports") or []:
+            if ":" in str(imp):
+                continue
+            target = path.parent / str(imp)
+            stack.append(target if target.suffix else target.with_suffix(".yaml"))
+
+
+def source_key(src: Path, cfg: Dict[str, Any]) -> str:
+    """Digest of every input that determines `src`'s rendered artifacts."""
+    h = hashlib.sha256()
+    h.update(f"format={CACHE_FORMAT}\n".encode())
+    h.update(json.dumps(cfg, sort_keys=True).encode() + b"\n")
+    h.update(json.dumps(_toolchain_versions(), sort_keys=True).encode() + b"\n")
+    for path in [*sorted(source_closure(src)), *GENERATOR_SCRIPTS]:
+        h.update(str(path.relative_to(ROOT)).encode() + b"\n")
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Load/store rendered artifacts ({filename: text}) per (schema, key)."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _entry(self, name: str, key: str) -> Path:
+        return self.cache_dir / name / f"{key}.json"
+
+    def load(self, name: str, key: str) -> Optional[Dict[str, str]]:
+        path = self._entry(name, key)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None  # a torn/corrupt entry is just a miss
+        if entry.get("key") != key:
+            return None
+        return entry["artifacts"]
+
+    def store(self, name: str, key: str, artifacts: Dict[str, str]) -> None:
+        path = self._entry(name, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob("*.json"):
+            if stale != path:
+                stale.unlink()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"schema": name, "key": key, "artifacts": artifacts},
+                                  ensure_ascii=False))
+        tmp.replace(path)
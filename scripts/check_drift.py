@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Single-process drift guard for every generated artifact in the repo.
+
+Runs each generator's render-and-compare check in this one interpreter, concurrently,
+instead of one interpreter per generator:
+
+  linkml       scripts/generate.py — schema.json / context.jsonld / field-definitions.json
+               for every schema.linkml.yaml (through the build cache; see build_cache.py)
+  vocabulary   vocabulary/scripts/generate.py — vocabulary/terms.jsonld
+  conformance  bcsv/conformance/_generate.py — the bcsv conformance fixtures
+
+Each generator only *renders* ({path: text}); comparison against the tree goes through
+one shared, memoized `FileCache`, so no file is read (or YAML source parsed) twice.
+Nothing is written except the optional JSON report, which lists the stale, missing and
+extra files per generator:
+
+  {"ok": false,
+   "generators": {"linkml": {"checked": 12, "stale": ["trial/schema.json"],
+                             "missing": [], "extra": [], "seconds": 3.1}, ...}}
+
+The per-generator `--check` entry points still work on their own; this is the one CI
+runs and gates on.
+
+Usage:
+    python scripts/check_drift.py                          # exit 1 on any drift
+    python scripts/check_drift.py --report drift.json      # + machine-readable report
+    python scripts/check_drift.py --jobs 0 --no-cache      # linkml: per-CPU pool, no cache
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml  # type: ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from build_cache import BuildCache  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class FileCache:
+    """Memoized, thread-safe reads (text, parsed YAML) shared by every check in the run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._text: Dict[Path, Optional[str]] = {}
+        self._yaml: Dict[Path, Any] = {}
+
+    def text(self, path: Path) -> Optional[str]:
+        """File content, or None if the file does not exist."""
+        with self._lock:
+            if path not in self._text:
+                self._text[path] = path.read_text(encoding="utf-8") if path.exists() else None
+            return self._text[path]
+
+    def yaml(self, path: Path) -> Any:
+        with self._lock:
+            if path not in self._yaml:
+                self._yaml[path] = yaml.safe_load(path.read_text(encoding="utf-8"))
+            return self._yaml[path]
+
+
+def _load_script(name: str, path: Path) -> ModuleType:
+    """Import a generator script by path (several are called `generate.py`)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # dataclasses resolve their module through sys.modules
+    spec.loader.exec_module(module)
+    return module
+
+
+def _linkml(files: FileCache, jobs: int, use_cache: bool) -> Dict[str, Any]:
+    import generate
+
+    cache = BuildCache() if use_cache else None
+    expected = {
+        ROOT / cfg["name"] / fname: text
+        for cfg, artifacts, _ in generate.build_artifacts(cache, jobs=jobs)
+        for fname, text in artifacts.items()
+    }
+    return {"expected": expected, "extra": []}
+
+
+def _vocabulary(files: FileCache, jobs: int, use_cache: bool) -> Dict[str, Any]:
+    vocab = _load_script("vocabulary_generate", ROOT / "vocabulary" / "scripts" / "generate.py")
+    src = files.yaml(vocab.VOCAB_DIR / "terms.yaml")
+    return {"expected": {vocab.VOCAB_DIR / "terms.jsonld": vocab.render(src)}, "extra": []}
+
+
+def _conformance(files: FileCache, jobs: int, use_cache: bool) -> Dict[str, Any]:
+    conf = _load_script("bcsv_conformance_generate", ROOT / "bcsv" / "conformance" / "_generate.py")
+    rendered = conf.render_all()
+    return {
+        "expected": {conf.CONFORMANCE_DIR / rel: text for rel, text in rendered.items()},
+        "extra": [conf.CONFORMANCE_DIR / rel for rel in conf.extra_files(rendered)],
+    }
+
+
+# name -> renderer(files, jobs, use_cache) -> {"expected": {path: text}, "extra": [path]}
+GENERATORS: Dict[str, Callable[[FileCache, int, bool], Dict[str, Any]]] = {
+    "linkml": _linkml,
+    "vocabulary": _vocabulary,
+    "conformance": _conformance,
+}
+
+
+def _rel(path: Path) -> str:
+    return str(path.relative_to(ROOT))
+
+
+def check_generator(name: str, files: FileCache, jobs: int = 1,
+                    use_cache: bool = True) -> Dict[str, Any]:
+    """Render one generator's artifacts and compare them against the tree."""
+    started = time.perf_counter()
+    try:
+        rendered = GENERATORS[name](files, jobs, use_cache)
+    except Exception as e:  # noqa: BLE001 — a crashing generator is drift, not a traceback
+        return {"error": f"{type(e).__name__}: {e}", "checked": 0, "stale": [],
+                "missing": [], "extra": [],
+                "seconds": round(time.perf_counter() - started, 3)}
+    stale: List[str] = []
+    missing: List[str] = []
+    for path, text in sorted(rendered["expected"].items()):
+        current = files.text(path)
+        if current is None:
+            missing.append(_rel(path))
+        elif current != text:
+            stale.append(_rel(path))
+    return {
+        "checked": len(rendered["expected"]),
+        "stale": stale,
+        "missing": missing,
+        "extra": sorted(_rel(p) for p in rendered["extra"]),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_checks(names: List[str], jobs: int = 1, use_cache: bool = True) -> Dict[str, Any]:
+    """Run the named checks concurrently over one shared FileCache; report in `names` order."""
+    files = FileCache()
+    with ThreadPoolExecutor(max_workers=len(names) or 1) as pool:
+        futures = {name: pool.submit(check_generator, name, files, jobs, use_cache)
+                   for name in names}
+        results = {name: futures[name].result() for name in names}
+    ok = all(not (r.get("error") or r["stale"] or r["missing"] or r["extra"])
+             for r in results.values())
+    return {"ok": ok, "generators": results}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--report", type=Path, metavar="REPORT.json",
+                    help="also write the drift report as JSON")
+    ap.add_argument("--only", action="append", choices=list(GENERATORS), metavar="NAME",
+                    help=f"run only this check (repeatable; one of: {', '.join(GENERATORS)})")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="linkml: render on N worker processes; 0 = one per CPU (default: 1)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="linkml: neither read nor write the build cache")
+    args = ap.parse_args()
+
+    report = run_checks(args.only or list(GENERATORS), jobs=args.jobs or os.cpu_count() or 1,
+                        use_cache=not args.no_cache)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n")
+
+    for name, r in report["generators"].items():
+        problems = [(kind, p) for kind in ("stale", "missing", "extra") for p in r[kind]]
+        if r.get("error"):
+            print(f"✗ {name}: generator failed: {r['error']}")
+        elif problems:
+            print(f"✗ {name}: {len(problems)} file(s) drift ({r['seconds']:.2f}s)")
+        else:
+            print(f"✓ {name}: {r['checked']} file(s) up to date ({r['seconds']:.2f}s)")
+        for kind, p in problems:
+            print(f"    {kind}: {p}")
+
+    if not report["ok"]:
+        print("\ndrift detected: regenerate with scripts/generate.py, "
+              "vocabulary/scripts/generate.py and/or bcsv/conformance/_generate.py")
+        return 1
+    print("\nup to date: every generated artifact matches its source")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
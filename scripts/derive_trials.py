@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""Derive trial tables (Response, Stimulus, Input) from event streams, in one pass.
+
+The trial schema's tables are "derived from raw events"; this is that derivation for
+the three tables the canonical event vocabulary determines. Events are grouped into
+trials by their `bdm:session_id` / `bdm:trial_index` context extensions. A trial's
+events are held only until its `bdm:trial_ended` arrives; then its rows are written
+and the events dropped. Memory is bounded by the trials open at one time, not by the
+stream's length, so a multi-million-event session is a single pass. Events outside a
+trial (no trial index: session lifecycle, navigation, recordings) are skipped, and a
+trial that never ends is counted as unfinished and not written.
+
+Per trial:
+
+  Response   one row. Every `bdm:<column>` extension of its trial_started and
+             trial_ended events (context, then result; trial_ended wins) fills that
+             column. Then, unless an extension gave them: response_id
+             (`<session>/<trial>`), session_uuid (the bdm:session_id), trial_index,
+             trial_start_datetime (first event), response_datetime (last input),
+             agent_id (first bdm:Agent actor), stimulus_count, input_count and
+             transformation_name.
+  Stimulus   one row per `bdm:presented` bdm:Stimulus. onset is seconds from the trial
+             start; duration runs until the next stimulus or the trial's end;
+             object_id and description come from the event's object.
+  Input      one row per bdm:Agent action (clicked, key_pressed, typed, selected,
+             deselected, adjusted, drag_and_dropped). A key press's duration runs
+             until the bdm:key_released of the same key. option_id / stimulus_id
+             link inputs on an option or a presented stimulus.
+
+Stimulus and Input rows also take the `bdm:<column>` extensions of their own event.
+Their ids are `<response_id>/s<n>` and `<response_id>/i<n>`.
+
+The output is one bcsv table per trial table: `<dir>/<table>.csv`, plus
+`<dir>/<table>.json` metadata. That metadata has the table's columns, in the order of
+trial/schema.linkml.yaml, their datatypes (enums as categorical levels) and
+descriptions, and the CSV's file_hash, so validate_bcsv.py checks the output.
+Columns the events don't carry stay empty, so `required` isn't declared.
+`--format parquet` converts each table with bcsv_arrow.py (optional pyarrow).
+
+Input is NDJSON (`.ndjson`, `.ndjson.gz`: one Event per line) or JSON (an Event or an
+EventBatch, read incrementally by event_batch.py). The events aren't schema-validated
+here; validate_schemas.py does that.
+With `--jobs N`, sessions are spread over N worker processes by a hash of the session
+id, read from each line's `context` as TrialDeriver reads it (lines still go to the
+workers raw, which is far cheaper than sending parsed events). Each worker derives its
+sessions' trials into part files, which are concatenated at the end. Rows are then
+grouped by worker rather than in stream order; within a session the order holds.
+
+Usage:
+    python scripts/derive_trials.py event/examples/cognitive_event_stream.json -o trials/
+    python scripts/derive_trials.py dumps/*.ndjson.gz -o trials/ --jobs 8 --format parquet
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Full
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml  # type: ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bcsv_integrity import HashingWriter  # noqa: E402
+from event_batch import BatchReader  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+TRIAL_SCHEMA = ROOT / "trial" / "schema.linkml.yaml"
+BCSV_CONTEXT = "https://behaverse.org/schemas/bcsv/context.jsonld"
+TABLES = ("Response", "Stimulus", "Input")
+FORMATS = ("csv", "parquet")
+TRANSFORMATION_NAME = "derive_trials"
+
+INPUT_VERBS = frozenset({
+    "bdm:clicked", "bdm:key_pressed", "bdm:typed", "bdm:selected", "bdm:deselected",
+    "bdm:adjusted", "bdm:drag_and_dropped",
+})
+# LinkML range -> bcsv datatype; enums become categorical, anything else string.
+DATATYPES = {"string": "string", "integer": "integer", "float": "number", "double": "number",
+             "decimal": "number", "boolean": "boolean", "datetime": "datetime", "date": "date",
+             "time": "time"}
+
+BLOCK_EVENTS = 2000  # events per message to a worker
+QUEUE_BLOCKS = 4  # messages buffered per worker
+POLL_SECONDS = 1.0  # how often a blocked parent checks that its workers are alive
+
+
+class DeriveError(RuntimeError):
+    """The derivation couldn't finish (a worker process died)."""
+
+
+@dataclass
+class TableSpec:
+    name: str
+    description: str
+    columns: List[Dict[str, Any]]  # bcsv column declarations, in schema order
+
+    @property
+    def names(self) -> List[str]:
+        return [c["name"] for c in self.columns]
+
+
+def load_tables(path: Path = TRIAL_SCHEMA, tables: Iterable[str] = TABLES) -> Dict[str, TableSpec]:
+    """The trial tables' bcsv column declarations, from the LinkML source."""
+    schema = yaml.safe_load(path.read_text(encoding="utf-8"))
+    enums = schema.get("enums") or {}
+    default = schema.get("default_range", "string")
+    specs = {}
+    for name in tables:
+        cls = schema["classes"][name]
+        columns = []
+        for column, slot in (cls.get("attributes") or {}).items():
+            slot = slot or {}
+            rng = slot.get("range") or default
+            col: Dict[str, Any] = {"name": column}
+            if rng in enums:
+                col["datatype"] = "categorical"
+                col["levels"] = list(enums[rng].get("permissible_values") or {})
+            else:
+                col["datatype"] = DATATYPES.get(rng, "string")
+            if slot.get("description"):
+                col["description"] = slot["description"]
+            columns.append(col)
+        specs[name] = TableSpec(name, cls.get("description", ""), columns)
+    return specs
+
+
+def _extensions(event: Dict[str, Any], part: str) -> Dict[str, Any]:
+    return ((event.get(part) or {}).get("extensions")) or {}
+
+
+def _fields(event: Dict[str, Any], row: Dict[str, Any]) -> None:
+    """Copy the event's `bdm:<name>` extensions (context, then result) into `row`."""
+    for part in ("context", "result"):
+        for key, value in _extensions(event, part).items():
+            if key.startswith("bdm:"):
+                row[key[4:]] = value
+
+
+def _when(event: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(event["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _seconds(start: Optional[datetime], at: Optional[datetime]) -> Optional[float]:
+    if start is None or at is None:
+        return None
+    return round((at - start).total_seconds(), 6)
+
+
+def derive_trial(session: str, trial: str,
+                 events: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """{table: rows} for one trial's events (in stream order, ending with trial_ended)."""
+    start, end = _when(events[0]), _when(events[-1])
+    response: Dict[str, Any] = {}
+    for event in events:
+        if event.get("verb") in ("bdm:trial_started", "bdm:trial_ended"):
+            _fields(event, response)
+    response_id = response.setdefault("response_id", f"{session}/{trial}")
+
+    stimuli: List[Dict[str, Any]] = []
+    stimulus_ids: Dict[Any, str] = {}  # object id -> latest Stimulus row's id
+    inputs: List[Dict[str, Any]] = []
+    pressed: Dict[Tuple[Any, Any], Dict[str, Any]] = {}  # (object id, key) -> open press
+    agent = last_input = None
+    for event in events:
+        verb, obj = event.get("verb"), event.get("object") or {}
+        actor = event.get("actor") or {}
+        at = _when(event)
+        if actor.get("objectType") == "bdm:Agent" and agent is None:
+            agent = actor.get("id")
+        if verb == "bdm:presented" and obj.get("objectType") == "bdm:Stimulus":
+            if stimuli:
+                stimuli[-1]["duration"] = _seconds(stimuli[-1].pop("_at"), at)
+            row = {"stimulus_id": f"{response_id}/s{len(stimuli) + 1}", "trial_index": trial,
+                   "response_id": response_id, "object_id": obj.get("id"),
+                   "index_in_trial": len(stimuli) + 1, "onset": _seconds(start, at),
+                   "description": obj.get("name") or obj.get("id"), "_at": at}
+            _fields(event, row)
+            stimulus_ids[obj.get("id")] = row["stimulus_id"]
+            stimuli.append(row)
+        elif verb == "bdm:key_released":
+            press = pressed.pop((obj.get("id"), _extensions(event, "result").get("bdm:key")), None)
+            if press is not None:
+                press["duration"] = _seconds(press.pop("_at"), at)
+        elif verb in INPUT_VERBS and actor.get("objectType") == "bdm:Agent":
+            kind = obj.get("objectType")
+            row = {"input_id": f"{response_id}/i{len(inputs) + 1}", "response_id": response_id,
+                   "onset": _seconds(start, at), "object_type": kind,
+                   "object_name": obj.get("name") or obj.get("id")}
+            if kind == "bdm:Option":
+                row["option_id"] = obj.get("id")
+            elif kind == "bdm:Stimulus":
+                row["stimulus_id"] = stimulus_ids.get(obj.get("id"))
+            _fields(event, row)
+            if verb == "bdm:key_pressed":
+                row["_at"] = at
+                pressed[(obj.get("id"), _extensions(event, "result").get("bdm:key"))] = row
+            inputs.append(row)
+            last_input = event.get("timestamp")
+    if stimuli:
+        stimuli[-1]["duration"] = _seconds(stimuli[-1].pop("_at"), end)
+    for row in pressed.values():
+        row.pop("_at")  # never released within the trial: duration unknown
+
+    for key, value in (("session_uuid", session), ("trial_index", trial),
+                       ("trial_start_datetime", events[0].get("timestamp")),
+                       ("response_datetime", last_input), ("agent_id", agent),
+                       ("stimulus_count", len(stimuli)), ("input_count", len(inputs)),
+                       ("transformation_name", TRANSFORMATION_NAME)):
+        if value is not None:
+            response.setdefault(key, value)
+    return {"Response": [response], "Stimulus": stimuli, "Input": inputs}
+
+
+class TrialDeriver:
+    """Groups an event stream into trials and hands each finished trial's rows on."""
+
+    def __init__(self, writers: Dict[str, "_TableWriter"]):
+        self.writers = writers
+        self.open: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.stats: Counter = Counter()
+
+    def add(self, item) -> None:
+        """Take one event: a dict, or a raw NDJSON line (bytes)."""
+        self.stats["events"] += 1
+        if isinstance(item, (bytes, str)):
+            if not item.strip():
+                self.stats["events"] -= 1
+                return
+            try:
+                item = json.loads(item)
+            except ValueError:
+                self.stats["not_json"] += 1
+                return
+        context = _extensions(item, "context") if isinstance(item, dict) else {}
+        session, trial = context.get("bdm:session_id"), context.get("bdm:trial_index")
+        if session is None or trial is None:
+            self.stats["outside_trials"] += 1
+            return
+        key = (str(session), str(trial))
+        self.open.setdefault(key, []).append(item)
+        if item.get("verb") == "bdm:trial_ended":
+            for table, rows in derive_trial(*key, self.open.pop(key)).items():
+                self.writers[table].write(rows)
+            self.stats["trials"] += 1
+
+    def close(self) -> Counter:
+        self.stats["unfinished"] += len(self.open)
+        self.open.clear()
+        for table, writer in self.writers.items():
+            self.stats[f"rows.{table}"] += writer.close()
+        return self.stats
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value) if not isinstance(value, float) else repr(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class _TableWriter:
+    """Rows (dicts) to a CSV in the table's column order; unknown keys are dropped."""
+
+    def __init__(self, path: Path, columns: List[str], header: bool = True):
+        self.path, self.columns, self.rows = path, columns, 0
+        self._position = {c: i for i, c in enumerate(columns)}
+        self._raw = open(path, "wb")
+        self._hashing = HashingWriter(self._raw)
+        self._text = io.TextIOWrapper(io.BufferedWriter(self._hashing), encoding="utf-8",
+                                      newline="")
+        self._csv = csv.writer(self._text, lineterminator="\n")
+        if header:
+            self._csv.writerow(columns)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # A row fills few of a wide table's columns; format only those.
+        position, width = self._position, len(self.columns)
+        for row in rows:
+            cells = [""] * width
+            for key, value in row.items():
+                i = position.get(key)
+                if i is not None:
+                    cells[i] = _cell(value)
+            self._csv.writerow(cells)
+        self.rows += len(rows)
+
+    def copy(self, part: Path) -> None:
+        self._text.flush()
+        with open(part, "rb") as f:
+            shutil.copyfileobj(f, self._text.buffer)
+
+    def close(self) -> int:
+        self._text.close()  # flushes through the hashing writer
+        self._raw.close()
+        return self.rows
+
+    def hexdigest(self) -> str:
+        return self._hashing.hexdigest()
+
+
+def iter_events(path: Path) -> Iterator[Any]:
+    """Raw lines of an NDJSON stream, or the events of a JSON Event / EventBatch."""
+    name = path.name
+    if name.endswith((".ndjson", ".ndjson.gz", ".jsonl", ".jsonl.gz")):
+        with (gzip.open(path, "rb") if name.endswith(".gz") else open(path, "rb")) as f:
+            yield from f
+        return
+    yield from BatchReader(path)  # streamed, so a multi-GB batch isn't loaded whole
+
+
+def _session_of(item) -> bytes:
+    """The session an event belongs to, as TrialDeriver keys it (`str` of the decoded
+    value, UTF-8), whether the event is a dict or a raw line, so both shard alike."""
+    if isinstance(item, dict):
+        session = _extensions(item, "context").get("bdm:session_id")
+        return str(session).encode("utf-8") if session is not None else b""
+    try:
+        event = json.loads(item)
+    except ValueError:
+        return b""
+    return _session_of(event) if isinstance(event, dict) else b""
+
+
+def _part(out_dir: Path, table: str, worker: int) -> Path:
+    return out_dir / f".{table}.part{worker}.csv"
+
+
+def _work(queue, results, out_dir: Path, worker: int, specs: Dict[str, TableSpec]) -> None:
+    deriver = TrialDeriver({t: _TableWriter(_part(out_dir, t, worker), s.names, header=False)
+                            for t, s in specs.items()})
+    while (block := queue.get()) is not None:
+        for item in block:
+            deriver.add(item)
+    results.put(dict(deriver.close()))
+
+
+def _metadata(spec: TableSpec, csv_path: Path, digest: str) -> Dict[str, Any]:
+    return {
+        "@context": BCSV_CONTEXT,
+        "@type": "csvw:Table",
+        "name": spec.name.lower(),
+        "description": f"{spec.description} Derived from events by "
+                       f"scripts/derive_trials.py.",
+        "url": csv_path.name,
+        "file_hash": digest,
+        "table_schema": {"columns": spec.columns},
+    }
+
+
+def derive_trials(inputs: List[Path], out_dir: Path, *, jobs: int = 1, fmt: str = "csv",
+                  schema_path: Path = TRIAL_SCHEMA) -> Counter:
+    """Derive the trial tables from `inputs` into `out_dir`; returns the run's counts."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    specs = load_tables(schema_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    writers = {t: _TableWriter(out_dir / f"{t}.csv.tmp", s.names) for t, s in specs.items()}
+
+    try:
+        if jobs <= 1:
+            deriver = TrialDeriver(writers)
+            for path in inputs:
+                for item in iter_events(path):
+                    deriver.add(item)
+            stats = deriver.close()
+        else:
+            stats = _derive_parallel(inputs, out_dir, jobs, specs, writers)
+    except BaseException:
+        for table, writer in writers.items():
+            writer.close()
+            (out_dir / f"{table}.csv.tmp").unlink(missing_ok=True)
+        raise
+
+    for table, spec in specs.items():
+        tmp, csv_path = out_dir / f"{table}.csv.tmp", out_dir / f"{table}.csv"
+        os.replace(tmp, csv_path)
+        meta_path = out_dir / f"{table}.json"
+        meta_path.write_text(json.dumps(_metadata(spec, csv_path, writers[table].hexdigest()),
+                                        indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        if fmt == "parquet":
+            from bcsv_arrow import to_arrow
+
+            to_arrow(meta_path, out_dir / f"{table}.parquet")
+            csv_path.unlink()
+            meta_path.unlink()
+    return stats
+
+
+def _check_workers(workers) -> None:
+    for i, w in enumerate(workers):
+        if w.exitcode not in (None, 0):
+            raise DeriveError(f"worker {i} died (exit code {w.exitcode}); no tables written")
+
+
+def _put(queue, block, workers) -> None:
+    """queue.put that gives up, instead of blocking for ever, once a worker has died."""
+    while True:
+        try:
+            return queue.put(block, timeout=POLL_SECONDS)
+        except Full:
+            _check_workers(workers)
+
+
+def _get(results, workers) -> Dict[str, int]:
+    while True:
+        try:
+            return results.get(timeout=POLL_SECONDS)
+        except Empty:
+            _check_workers(workers)
+
+
+def _derive_parallel(inputs: List[Path], out_dir: Path, jobs: int,
+                     specs: Dict[str, TableSpec], writers: Dict[str, _TableWriter]) -> Counter:
+    ctx = multiprocessing.get_context()
+    queues = [ctx.Queue(QUEUE_BLOCKS) for _ in range(jobs)]
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_work, args=(queues[i], results, out_dir, i, specs))
+               for i in range(jobs)]
+    for w in workers:
+        w.start()
+    stats: Counter = Counter()
+    try:
+        blocks: List[List[Any]] = [[] for _ in range(jobs)]
+        for path in inputs:
+            for item in iter_events(path):
+                i = zlib.crc32(_session_of(item)) % jobs
+                blocks[i].append(item)
+                if len(blocks[i]) >= BLOCK_EVENTS:
+                    _put(queues[i], blocks[i], workers)
+                    blocks[i] = []
+        for queue, block in zip(queues, blocks):
+            if block:
+                _put(queue, block, workers)
+            _put(queue, None, workers)
+        for _ in workers:
+            stats.update(_get(results, workers))
+        for w in workers:
+            w.join()
+        for table, writer in writers.items():
+            for i in range(jobs):
+                writer.copy(_part(out_dir, table, i))
+            writer.close()
+    except BaseException:
+        for queue in queues:  # a dead worker's unread blocks mustn't hold up our exit
+            queue.cancel_join_thread()
+        raise
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+            w.join()
+        for table in specs:
+            for i in range(jobs):
+                _part(out_dir, table, i).unlink(missing_ok=True)
+    return stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", type=Path,
+                    help="NDJSON (.ndjson[.gz]) streams or Event/EventBatch JSON files")
+    ap.add_argument("-o", "--output", type=Path, required=True, metavar="DIR",
+                    help="directory for the trial tables")
+    ap.add_argument("--format", choices=FORMATS, default="csv",
+                    help="bcsv (CSV + metadata) or Parquet (needs pyarrow) (default: csv)")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="worker processes, sessions spread over them; 0 = one per CPU "
+                         "(default: 1)")
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+    try:
+        stats = derive_trials(args.inputs, args.output, jobs=args.jobs or os.cpu_count() or 1,
+                              fmt=args.format)
+    except DeriveError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    rows = ", ".join(f"{stats[f'rows.{t}']} {t}" for t in TABLES)
+    print(f"✓ {stats['events']} event(s) → {stats['trials']} trial(s): {rows} row(s) in "
+          f"{args.output} ({seconds:.2f}s)")
+    for key, label in (("outside_trials", "outside any trial (skipped)"),
+                       ("unfinished", "trial(s) without bdm:trial_ended (not written)"),
+                       ("not_json", "line(s) that aren't JSON (skipped)")):
+        if stats[key]:
+            print(f"  {stats[key]} {label}")
+    return 1 if stats["not_json"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
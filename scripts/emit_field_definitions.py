@@ -38,6 +38,9 @@ from pathlib import Path
 
 from linkml_runtime import SchemaView
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from schema_index import schema_index  # noqa: E402
+
 ROOT = Path(__file__).resolve().parent.parent
 
 # Sentinel distinguishing "annotation key absent" from "annotation value is null".
@@ -90,9 +93,9 @@ def _field(slot) -> dict:
 
 def build_trial(sv: SchemaView, meta: dict) -> dict:
     """Multi-table model: each non-root class -> a table; its attributes -> fields."""
+    index = schema_index(sv)
     tables = []
-    for cname in sv.all_classes():
-        c = sv.get_class(cname)
+    for cname, c in index.classes.items():
         if c.tree_root or c.abstract:
             continue
         table: dict = {"name": c.name}
@@ -100,7 +103,7 @@ def build_trial(sv: SchemaView, meta: dict) -> dict:
             table["label"] = c.title
         if c.description:
             table["description"] = c.description
-        tnotes = _ann(c, "notes")
+        tnotes = index.class_annotations(cname).get("notes", _MISSING)
         if tnotes is not _MISSING:
             table["notes"] = tnotes
         table["fields"] = [_field(a) for a in (c.attributes or {}).values()]
@@ -131,7 +134,8 @@ def build_event(sv: SchemaView, meta: dict) -> dict:
     The render artifact's fields come specifically from the `Event` envelope class —
     NOT the abstract `EventDocument` tree_root and NOT `EventBatch`.
     """
-    envelope = sv.get_class("Event")
+    index = schema_index(sv)
+    envelope = index.classes.get("Event")
     if envelope is None:
         raise SystemExit("event: no `Event` class found")
     fields = [_field(a) for a in (envelope.attributes or {}).values()]
@@ -142,14 +146,16 @@ def build_event(sv: SchemaView, meta: dict) -> dict:
         "description": meta["description"],
         "fields": fields,
     }
-    vocab = _ann(sv.schema, "vocabularies")
+    vocab = index.schema_annotations.get("vocabularies", _MISSING)
     if vocab is not _MISSING:
         out["vocabularies"] = _plain(vocab)
     return out
 
 
-def build(sdir: Path) -> dict:
-    sv = SchemaView(str(sdir / "schema.linkml.yaml"))
+def build(sdir: Path, sv: SchemaView | None = None) -> dict:
+    """Build the render artifact for `sdir`; reuses `sv` when the caller already parsed it."""
+    if sv is None:
+        sv = SchemaView(str(sdir / "schema.linkml.yaml"))
     meta = {
         "schema": sv.schema.name,
         "version": sv.schema.version,
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Stream EventBatch documents: read and write them one Event at a time.
+
+An `EventBatch` (event/schema.linkml.yaml) is one JSON object, `{"batch_id": ...,
+"events": [...]}`, and collection exports run to gigabytes. `json.load` on one holds
+the whole document, several times its size once parsed. Here the reader walks the
+document with a small incremental parser: the top-level object's members one by
+one, and the `events` array element by element, each decoded with the standard
+`json` decoder and handed out before the next is read. Memory is one read chunk
+plus the largest single event, whatever the batch's length. A syntax error is
+reported where it is found, without reading further, and an event over `max_event`
+characters (default 256 Mi) is an error rather than read into memory whole. `batch_id` (and any
+other top-level member) lands in `reader.header`. A member after `events` is only
+there once iteration ends. A document without `events` is a single Event and is
+read as a batch of one.
+
+The writer is the mirror image: it writes the opening `{"batch_id": ..., "events": [`,
+then one event per line as they come, and closes the array at the end. It writes
+to a temporary file that replaces the target only on a clean `close()`, so an
+interrupted export never leaves half a batch behind. Names ending in `.gz` are
+read and written gzipped.
+
+Events aren't schema-validated here; validate_schemas.py does that.
+
+Usage:
+    python scripts/event_batch.py to-ndjson export.json -o events.ndjson.gz
+    python scripts/event_batch.py to-batch events.ndjson -o batch.json --batch-id run1
+    python scripts/event_batch.py split export.json.gz --events 100000 -o parts/
+    python scripts/event_batch.py merge parts/*.json -o export.json --batch-id run1
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+READ_CHUNK = 1 << 20  # characters per read
+MAX_EVENT_CHARS = 1 << 28  # a single value larger than this is an error, not read on
+TRUNCATION_SLACK = 16  # an error this close to the buffer's end may just be a cut value
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9eE.+-]*")  # what could still follow a number's digits
+_DECODER = json.JSONDecoder()
+
+
+class BatchError(ValueError):
+    """A document isn't a well-formed Event / EventBatch; the message says where."""
+
+
+def _open(path: Path, mode: str, *, like: Optional[Path] = None) -> IO[str]:
+    """Text I/O on `path`, gzipped if (`like`, or) `path` ends with .gz."""
+    if (like or path).name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def _is_ndjson(path: Path) -> bool:
+    name = path.name[:-3] if path.name.endswith(".gz") else path.name
+    return name.endswith(NDJSON_SUFFIXES)
+
+
+class _Tokens:
+    """A read-ahead buffer over a text stream, decoding one JSON value at a time."""
+
+    def __init__(self, f: IO[str], where: str, chunk: int, max_value: int = MAX_EVENT_CHARS):
+        self.f, self.where, self.chunk, self.max_value = f, where, chunk, max_value
+        self.buf, self.pos, self.offset, self.done = "", 0, 0, False
+
+    def _more(self) -> bool:
+        if self.done:
+            return False
+        # read at least as much as is still buffered, so a huge value costs O(n) retries
+        data = self.f.read(max(self.chunk, len(self.buf) - self.pos))
+        if not data:
+            self.done = True
+            return False
+        self.offset += self.pos
+        self.buf, self.pos = self.buf[self.pos:] + data, 0
+        return True
+
+    def error(self, message: str) -> BatchError:
+        return BatchError(f"{self.where}: {message} at character {self.offset + self.pos}")
+
+    def peek(self) -> str:
+        """The next non-whitespace character ('' at the end), without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise self.error("expected " + " or ".join(repr(ch) for ch in chars))
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only a value the buffer cuts short is worth reading on for; any other
+                # error is reported here, not after reading the rest of the document.
+                cut = e.pos >= len(self.buf) - TRUNCATION_SLACK \
+                    or e.msg.startswith("Unterminated string")
+                if len(self.buf) - self.pos > self.max_value:
+                    raise self.error(f"a value longer than {self.max_value} characters "
+                                     f"(or not terminated)") from None
+                if not cut or not self._more():
+                    self.pos = e.pos
+                    raise self.error(e.msg) from None
+                continue
+            # a number the buffer ends in, or in its fraction or exponent ("-12.5" of
+            # "-12.5e-3"), may continue past it
+            if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and _NUMBER_TAIL.fullmatch(self.buf, end) and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+class BatchReader:
+    """The events of a JSON Event / EventBatch document, parsed one at a time."""
+
+    def __init__(self, path, *, chunk: int = READ_CHUNK, max_event: int = MAX_EVENT_CHARS):
+        self.path = Path(path)
+        self.chunk, self.max_event = chunk, max_event
+        self.header: Dict[str, Any] = {}  # top-level members other than `events`
+        self.batch = False  # whether the document had an `events` array
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        with _open(self.path, "r") as f:
+            tokens = _Tokens(f, str(self.path), self.chunk, self.max_event)
+            tokens.expect("{")
+            if tokens.peek() == "}":
+                tokens.pos += 1
+            else:
+                while True:
+                    key = tokens.value()
+                    if not isinstance(key, str):
+                        raise tokens.error("expected a member name")
+                    tokens.expect(":")
+                    if key == "events" and tokens.peek() == "[":
+                        tokens.pos += 1
+                        self.batch = True
+                        if tokens.peek() == "]":
+                            tokens.pos += 1
+                        else:
+                            while True:
+                                yield tokens.value()
+                                self.count += 1
+                                if tokens.expect(",]") == "]":
+                                    break
+                    else:
+                        self.header[key] = tokens.value()
+                    if tokens.expect(",}") == "}":
+                        break
+            if tokens.peek():
+                raise tokens.error("unexpected data after the document")
+        if not self.batch:  # a single Event
+            event, self.header = self.header, {}
+            self.count = 1
+            yield event
+
+
+def iter_ndjson(path) -> Iterator[Any]:
+    """The events of an NDJSON stream (blank lines skipped)."""
+    path = Path(path)
+    with _open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise BatchError(f"{path}:{number}: {e}") from None
+
+
+def iter_events(path) -> Iterator[Any]:
+    """The events of an NDJSON stream or a JSON Event / EventBatch, streamed."""
+    path = Path(path)
+    return iter_ndjson(path) if _is_ndjson(path) else iter(BatchReader(path))
+
+
+def _dumps(event: Any) -> str:
+    return json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+
+
+class BatchWriter:
+    """Write an EventBatch one event at a time; the target appears on `close()`."""
+
+    def __init__(self, path, *, batch_id: Optional[str] = None):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._f = _open(self._tmp, "w", like=self.path)
+        head = {"batch_id": batch_id} if batch_id is not None else {}
+        self._f.write(_dumps(head)[:-1] + ("," if head else "") + '"events":[')
+        self.count = 0
+
+    def write(self, event: Union[Dict[str, Any], str]) -> None:
+        """Append one event: a parsed object, or its JSON text (written as given)."""
+        text = event.strip() if isinstance(event, str) else _dumps(event)
+        self._f.write(("\n" if not self.count else ",\n") + text)
+        self.count += 1
+
+    def write_all(self, events: Iterable[Any]) -> int:
+        for event in events:
+            self.write(event)
+        return self.count
+
+    def close(self) -> int:
+        self._f.write("\n]}\n")
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return self.count
+
+    def abort(self) -> None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# --- commands ------------------------------------------------------------------------
+def to_ndjson(source: Path, out: IO[str]) -> int:
+    count = 0
+    for event in iter_events(source):
+        out.write(_dumps(event) + "\n")
+        count += 1
+    return count
+
+
+def merge(sources: Iterable[Path], target: Path, batch_id: Optional[str] = None) -> int:
+    with BatchWriter(target, batch_id=batch_id) as writer:
+        for source in sources:
+            if not _is_ndjson(source):
+                writer.write_all(BatchReader(source))
+                continue
+            with _open(source, "r") as f:  # lines are checked, then copied verbatim
+                for number, line in enumerate(f, 1):
+                    if line.strip():
+                        if not isinstance(_loads(line, source, number), dict):
+                            raise BatchError(f"{source}:{number}: not a JSON object")
+                        writer.write(line)
+    return writer.count
+
+
+def _loads(line: str, source: Path, number: int) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise BatchError(f"{source}:{number}: {e}") from None
+
+
+def _stem(path: Path) -> str:
+    name = path.name[:-3] if path.name.endswith(".gz") else path.name
+    return name.rsplit(".", 1)[0] if "." in name else name
+
+
+def split(source: Path, out_dir: Path, events: int) -> List[Path]:
+    """Cut `source` into batches of at most `events` events; the paths written."""
+    if events < 1:
+        raise BatchError("--events must be at least 1")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = ".json.gz" if source.name.endswith(".gz") else ".json"
+    reader = BatchReader(source) if not _is_ndjson(source) else None
+    stream = iter(reader) if reader is not None else iter_ndjson(source)
+    written: List[Path] = []
+    writer: Optional[BatchWriter] = None
+    try:
+        for event in stream:
+            if writer is None or writer.count == events:
+                if writer is not None:
+                    writer.close()
+                    written.append(writer.path)
+                part = len(written) + 1
+                batch_id = reader.header.get("batch_id") if reader is not None else None
+                writer = BatchWriter(out_dir / f"{_stem(source)}.part{part:04d}{suffix}",
+                                     batch_id=f"{batch_id}.part{part:04d}" if batch_id else None)
+            writer.write(event)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.close()
+        written.append(writer.path)
+    return written
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    n = sub.add_parser("to-ndjson", help="an Event / EventBatch as NDJSON, one event per line")
+    n.add_argument("input", type=Path)
+    n.add_argument("-o", "--output", type=Path, help="(.ndjson[.gz]; default: stdout)")
+    m = sub.add_parser("to-batch", aliases=["merge"],
+                       help="NDJSON streams and/or batches, concatenated into one batch")
+    m.add_argument("inputs", nargs="+", type=Path)
+    m.add_argument("-o", "--output", type=Path, required=True, help="(.json[.gz])")
+    m.add_argument("--batch-id", help="batch_id of the result (default: none)")
+    s = sub.add_parser("split", help="cut a batch (or NDJSON stream) into smaller batches")
+    s.add_argument("input", type=Path)
+    s.add_argument("--events", type=int, required=True, metavar="N",
+                   help="events per batch")
+    s.add_argument("-o", "--output", type=Path, required=True, help="directory")
+    args = ap.parse_args()
+
+    try:
+        started = time.perf_counter()
+        if args.command == "to-ndjson":
+            if args.output:
+                tmp = args.output.with_name(args.output.name + ".tmp")
+                try:
+                    with _open(tmp, "w", like=args.output) as out:
+                        count = to_ndjson(args.input, out)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+                os.replace(tmp, args.output)
+            else:
+                count = to_ndjson(args.input, sys.stdout)
+            print(f"✓ {count} event(s) → {args.output or 'stdout'}", file=sys.stderr)
+        elif args.command in ("to-batch", "merge"):
+            count = merge(args.inputs, args.output, args.batch_id)
+            print(f"✓ {count} event(s) from {len(args.inputs)} file(s) → {args.output}")
+        else:
+            parts = split(args.input, args.output, args.events)
+            print(f"✓ {args.input} → {len(parts)} batch(es) in {args.output}")
+        print(f"  ({time.perf_counter() - started:.2f}s)", file=sys.stderr)
+    except (BatchError, OSError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""A compact in-memory table of Events: struct-of-arrays columns, interned values.
+
+`json.loads` gives every event its own nest of dicts and its own copies of the same
+strings (`bdm:Engine`, the engine's actor id, the verb, the session id), over a
+kilobyte each. `EventTable` keeps a session's events in a few bytes per field:
+
+  shapes    an event's key structure (which keys, in which order, nested how, list
+            lengths) is interned; events with the same shape share one set of columns
+  columns   one typed `array` per leaf of a shape, row by row:
+              t  a `timestamp`-style string, YYYY-MM-DDTHH:MM:SS.mmmZ, as epoch ms
+              d  a float
+              c  anything else (strings, ints, booleans, null) as a 4-byte code into
+                 the table's symbol list, so each distinct value is stored once
+  symbols   seeded with the permissible values of every enum in
+            event/schema.linkml.yaml (VerbEnum, ObjectTypeEnum, ActorTypeEnum), in
+            declaration order. `code("bdm:key_pressed")` is the same in every table
+            built from one schema version. Other values get codes as they turn up.
+
+A column starts as the kind of its first value and falls back to codes if a later
+value doesn't fit (a timestamp in another format, an int among floats). The round
+trip is lossless: `table[i]` rebuilds the event with its keys in their original
+order, and `json.dumps` of it matches `json.dumps` of what went in. Codes are
+in-process only; to store events, write them back out as JSON.
+
+`where(path, value)` finds rows by comparing codes, without rebuilding events, and
+`column(path)` reads one field across all rows.
+
+Usage:
+    python scripts/event_compact.py dumps/2026-06-05.ndjson --compare --check
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+import tracemalloc
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import yaml  # type: ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from event_batch import iter_events  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+EVENT_SCHEMA = ROOT / "event" / "schema.linkml.yaml"
+TYPECODES = {"t": "q", "d": "d", "c": "I"}
+_EPOCH = date(1970, 1, 1).toordinal()
+_DAY_MS = 86_400_000
+_NESTED = (dict, list)
+_TIMESTAMP = re.compile(r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{3})Z\Z")
+
+Path_ = Tuple[Union[str, int], ...]  # keys and list positions from the event's root
+
+
+def enum_values(schema: Path = EVENT_SCHEMA) -> List[str]:
+    """The permissible values of every enum in the LinkML schema, in declaration order."""
+    doc = yaml.safe_load(schema.read_text(encoding="utf-8"))
+    values: List[str] = []
+    for enum in (doc.get("enums") or {}).values():
+        for value in (enum or {}).get("permissible_values") or {}:
+            if value not in values:
+                values.append(value)
+    return values
+
+
+def _ms(value: str) -> Optional[int]:
+    """Epoch milliseconds of a YYYY-MM-DDTHH:MM:SS.mmmZ string; None for any other."""
+    m = _TIMESTAMP.match(value)
+    if not m:
+        return None
+    y, mo, d, h, mi, s, ms = map(int, m.groups())
+    if y < 1000 or h > 23 or mi > 59 or s > 59:
+        return None
+    try:
+        days = date(y, mo, d).toordinal() - _EPOCH
+    except ValueError:
+        return None
+    return days * _DAY_MS + ((h * 60 + mi) * 60 + s) * 1000 + ms
+
+
+def _iso(ms: int) -> str:
+    days, rest = divmod(ms, _DAY_MS)
+    d = date.fromordinal(_EPOCH + days)
+    rest, milli = divmod(rest, 1000)
+    rest, s = divmod(rest, 60)
+    h, mi = divmod(rest, 60)
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}T{h:02d}:{mi:02d}:{s:02d}.{milli:03d}Z"
+
+
+def _shape(value: Any, leaves: List[Any]) -> Any:
+    """The key structure of `value` (None for a leaf); its leaves go to `leaves`."""
+    # leaves.append(v) is None, a leaf's shape; the comprehensions skip a call per leaf
+    if isinstance(value, dict):
+        return ("{",) + tuple([(k, _shape(v, leaves) if isinstance(v, _NESTED)
+                                else leaves.append(v)) for k, v in value.items()])
+    if isinstance(value, list):
+        return ("[",) + tuple([_shape(v, leaves) if isinstance(v, _NESTED)
+                               else leaves.append(v) for v in value])
+    leaves.append(value)
+    return None
+
+
+def _build(shape: Any, leaves: Iterator[Any]) -> Any:
+    if shape is None:
+        return next(leaves)
+    if shape[0] == "{":
+        return {k: _build(s, leaves) for k, s in shape[1:]}
+    return [_build(s, leaves) for s in shape[1:]]
+
+
+def _leaf_paths(shape: Any, prefix: Path_ = ()) -> Iterator[Path_]:
+    if shape is None:
+        yield prefix
+    elif shape[0] == "{":
+        for k, s in shape[1:]:
+            yield from _leaf_paths(s, prefix + (k,))
+    else:
+        for i, s in enumerate(shape[1:]):
+            yield from _leaf_paths(s, prefix + (i,))
+
+
+def _symbol_key(value: Any) -> Tuple[type, Any]:
+    # by type, so 1 / 1.0 / True stay apart; floats by repr, so -0.0 isn't 0.0
+    return (float, repr(value)) if type(value) is float else (type(value), value)
+
+
+def _path(path: Union[str, Path_]) -> Path_:
+    return tuple(path.split(".")) if isinstance(path, str) else tuple(path)
+
+
+class EventTable:
+    """Events held column-wise; `table[i]` is the i-th event as JSON-ready dicts."""
+
+    def __init__(self, events: Iterable[Any] = (), *, symbols: Optional[List[str]] = None):
+        self.symbols: List[Any] = list(enum_values() if symbols is None else symbols)
+        self._codes: Dict[Tuple[type, Any], int] = {
+            _symbol_key(v): i for i, v in enumerate(self.symbols)}
+        self._shapes: List[Any] = []
+        self._shape_ids: Dict[Any, int] = {}
+        self._paths: List[Dict[Path_, int]] = []  # per shape: leaf path -> column
+        self._kinds: List[List[str]] = []
+        self._columns: List[List[array]] = []
+        self._rows: List[array] = []  # per shape: the table rows it holds
+        self._row_shape = array("I")
+        self._row_index = array("I")  # position within its shape's columns
+        self.extend(events)
+
+    # --- codes -------------------------------------------------------------------------
+    def code(self, value: Any) -> Optional[int]:
+        """The code of a value seen (or seeded) in this table, else None."""
+        return self._codes.get(_symbol_key(value))
+
+    def _code(self, value: Any) -> int:
+        key = _symbol_key(value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.symbols)
+            self.symbols.append(value)
+        return code
+
+    def _encode(self, kind: str, value: Any) -> Any:
+        """`value` as stored in a `kind` column, or None if it doesn't fit there."""
+        if kind == "c":
+            return self._code(value)
+        if kind == "d":
+            return value if type(value) is float else None
+        return _ms(value) if type(value) is str else None
+
+    def _decode(self, kind: str, stored: Any) -> Any:
+        if kind == "c":
+            return self.symbols[stored]
+        return stored if kind == "d" else _iso(stored)
+
+    # --- building ----------------------------------------------------------------------
+    def append(self, event: Any) -> None:
+        leaves: List[Any] = []
+        shape = _shape(event, leaves)
+        sid = self._shape_ids.get(shape)
+        if sid is None:
+            sid = self._shape_ids[shape] = len(self._shapes)
+            self._shapes.append(shape)
+            self._paths.append({p: j for j, p in enumerate(_leaf_paths(shape))})
+            kinds = ["d" if type(v) is float else "t" if type(v) is str and _ms(v) is not None
+                     else "c" for v in leaves]
+            self._kinds.append(kinds)
+            self._columns.append([array(TYPECODES[k]) for k in kinds])
+            self._rows.append(array("I"))
+        kinds, columns, codes = self._kinds[sid], self._columns[sid], self._codes
+        for j, value in enumerate(leaves):
+            kind = kinds[j]
+            if kind == "c":  # the common case, inlined
+                stored = codes.get(_symbol_key(value))
+                if stored is None:
+                    stored = self._code(value)
+            else:
+                stored = self._encode(kind, value)
+            if stored is None:  # doesn't fit the column's kind: re-code the column
+                old = [self._decode(kinds[j], s) for s in columns[j]]
+                kinds[j], columns[j] = "c", array("I", [self._code(v) for v in old])
+                stored = self._code(value)
+            columns[j].append(stored)
+        rows = self._rows[sid]
+        self._row_shape.append(sid)
+        self._row_index.append(len(rows))
+        rows.append(len(self._row_shape) - 1)
+
+    def extend(self, events: Iterable[Any]) -> None:
+        for event in events:
+            self.append(event)
+
+    # --- reading -----------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._row_shape)
+
+    def __getitem__(self, i: int) -> Any:
+        sid, r = self._row_shape[i], self._row_index[i]
+        kinds, columns = self._kinds[sid], self._columns[sid]
+        return _build(self._shapes[sid],
+                      (self._decode(kinds[j], columns[j][r]) for j in range(len(kinds))))
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, path: Union[str, Path_]) -> List[Any]:
+        """The value at `path` (e.g. "verb", ("context", "extensions", "bdm:session_id"))
+        in every row, None where the row has no such leaf."""
+        path, out = _path(path), [None] * len(self)
+        for sid, paths in enumerate(self._paths):
+            j = paths.get(path)
+            if j is not None:
+                kind = self._kinds[sid][j]
+                for row, stored in zip(self._rows[sid], self._columns[sid][j]):
+                    out[row] = self._decode(kind, stored)
+        return out
+
+    def where(self, path: Union[str, Path_], value: Any) -> List[int]:
+        """Rows whose leaf at `path` equals `value` (same JSON type), in order."""
+        path, found = _path(path), []
+        for sid, paths in enumerate(self._paths):
+            j = paths.get(path)
+            if j is None:
+                continue
+            kind, column = self._kinds[sid][j], self._columns[sid][j]
+            want = self.code(value) if kind == "c" else self._encode(kind, value)
+            if want is not None:
+                rows = self._rows[sid]
+                found.extend(rows[r] for r, stored in enumerate(column) if stored == want)
+        return sorted(found)
+
+    def nbytes(self) -> Dict[str, int]:
+        """Approximate memory by part: columns, row index, symbols (shapes not counted)."""
+        columns = sum(c.itemsize * len(c) for cs in self._columns for c in cs)
+        rows = sum(a.itemsize * len(a)
+                   for a in (self._row_shape, self._row_index, *self._rows))
+        symbols = sum(sys.getsizeof(v) for v in self.symbols) + 8 * len(self.symbols)
+        return {"columns": columns, "rows": rows, "symbols": symbols}
+
+
+def _measure(build) -> Tuple[Any, int, float]:
+    """(result, bytes it holds, seconds) of `build()`."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held, seconds
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", type=Path, help="NDJSON stream or JSON Event / EventBatch")
+    ap.add_argument("--compare", action="store_true",
+                    help="also load the events as dicts and compare memory")
+    ap.add_argument("--check", action="store_true",
+                    help="verify every event round-trips to identical JSON")
+    args = ap.parse_args()
+
+    try:
+        table, held, seconds = _measure(lambda: EventTable(iter_events(args.input)))
+        n = len(table)
+        print(f"✓ {n} event(s) in {len(table._shapes)} shape(s), {len(table.symbols)} "
+              f"symbol(s): {held / 2 ** 20:.1f} MiB ({held / max(n, 1):.0f} B/event, "
+              f"{seconds:.1f}s)")
+        if args.compare:
+            del table
+            dicts, dict_held, _ = _measure(lambda: list(iter_events(args.input)))
+            del dicts
+            print(f"  as dicts: {dict_held / 2 ** 20:.1f} MiB ({dict_held / max(n, 1):.0f} "
+                  f"B/event), {dict_held / max(held, 1):.1f}× the table")
+            table = EventTable(iter_events(args.input))
+        if args.check:
+            for i, event in enumerate(iter_events(args.input)):
+                if json.dumps(table[i]) != json.dumps(event):
+                    print(f"✗ event {i} doesn't round-trip", file=sys.stderr)
+                    return 1
+            print(f"✓ all {n} event(s) round-trip to identical JSON")
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
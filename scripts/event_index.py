@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""A random-access index for NDJSON event files: seek to a session, trial or verb.
+
+Pulling one trial out of a big event dump otherwise means reading all of it. One
+streaming pass here cuts the file into blocks of about `block_bytes` of whole lines
+and records, per block:
+
+  where it starts     byte offset (for .gz: the offset of the gzip member the block
+                      starts in, plus how many decompressed bytes into the member)
+  first line, lines   line number of its first line and how many it holds
+  tmin, tmax          earliest and latest `timestamp` in it (epoch seconds)
+
+  trials              a small Bloom filter of the (session, `bdm:trial_index`) pairs and
+                      trial indexes in it, so its size follows the file, not the
+                      number of trials
+
+and, per `bdm:session_id` and per verb, the blocks that contain one. A lookup
+intersects those postings, drops blocks whose filter rules the trial out or whose
+time range misses, and reads only the blocks left, checking each line exactly. The
+candidates are a superset, never a miss.
+
+The index is a sidecar next to the file, `<file>.idx.json.gz` (gzipped JSON; block ids
+delta-encoded), about 150 bytes per block. It also records where indexing stopped
+(the start of the first line without a newline), with fingerprints of the file's
+first bytes and of the bytes just before that point. `build` on an indexed file that
+has only grown since, which it checks by those fingerprints, indexes just the new
+part. Anything else (truncated, rewritten) rebuilds from scratch. A last line with
+no newline yet is indexed as its own block and re-read on the next build, so an
+event being written is picked up once it's complete.
+
+A .gz file is random-access only if it's made of many gzip members, as `bgzip` writes,
+or as appending `gzip -c` output to a file does. In a single-member file every block
+starts in member 0, so reading one decompresses from the top. `build` reports how
+many members the blocks start in.
+
+Usage:
+    python scripts/event_index.py build dumps/2026-06-05.ndjson       # or .ndjson.gz
+    python scripts/event_index.py query dumps/2026-06-05.ndjson --session S1 --trial 47
+    python scripts/event_index.py query dumps/2026-06-05.ndjson --verb bdm:key_pressed \\
+        --since 2026-06-05T14:00:00Z --until 2026-06-05T15:00:00Z -o keys.ndjson
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+FORMAT = "behaverse-ndjson-index"
+VERSION = 1
+SUFFIX = ".idx.json.gz"
+DEFAULT_BLOCK_BYTES = 1 << 16  # decompressed bytes of whole lines per block
+READ_CHUNK = 1 << 20
+FINGERPRINT_BYTES = 4096
+POSTINGS = ("sessions", "verbs")
+TRIAL_BITS = 1024  # per block; ~100 keys (a 64 KiB block's trials) give <1% false positives
+TRIAL_HASHES = 4
+
+Locator = Tuple[int, int]  # (byte offset, or gzip member offset; decompressed bytes to skip)
+
+
+class EventIndexError(ValueError):
+    """The index can't be built or used; the message says why."""
+
+
+def sidecar(path) -> Path:
+    return Path(str(path) + SUFFIX)
+
+
+def _compressed(path: Path) -> bool:
+    return path.suffix == ".gz"
+
+
+def _epoch(value: Any) -> Optional[float]:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _trial_key(session: Any, trial: Any) -> str:
+    return f"{session}\t{trial}"
+
+
+def _trial_bits(keys) -> int:
+    bits = 0
+    for key in keys:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * TRIAL_HASHES).digest()
+        for i in range(0, len(digest), 4):
+            bits |= 1 << (int.from_bytes(digest[i:i + 4], "little") % TRIAL_BITS)
+    return bits
+
+
+def _maybe_has(block_bits: str, key: str) -> bool:
+    want = _trial_bits([key])
+    return int(block_bits or "0", 16) & want == want
+
+
+def _keys(line: bytes) -> Optional[Tuple[Optional[str], Optional[str], Optional[str],
+                                          Optional[float]]]:
+    """(session, trial key, verb, epoch) of an NDJSON line; None if it isn't an object."""
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    context = event.get("context")
+    extensions = context.get("extensions") if isinstance(context, dict) else None
+    if not isinstance(extensions, dict):
+        extensions = {}
+    session, trial = extensions.get("bdm:session_id"), extensions.get("bdm:trial_index")
+    verb = event.get("verb")
+    return (None if session is None else str(session),
+            None if session is None or trial is None else _trial_key(session, trial),
+            verb if isinstance(verb, str) else None,
+            _epoch(event.get("timestamp")))
+
+
+# --- reading lines with their locations ----------------------------------------------
+def _plain_lines(f, start: Locator) -> Iterator[Tuple[Locator, bytes]]:
+    offset = start[0] + start[1]
+    f.seek(offset)
+    for line in f:  # a binary file iterates complete lines (the last may lack b"\n")
+        yield (offset, 0), line
+        offset += len(line)
+
+
+def _gzip_lines(f, start: Locator) -> Iterator[Tuple[Locator, bytes]]:
+    """Lines of a (multi-member) gzip file from `start`, each with its member and skip."""
+    member, discard = start  # decompressed bytes before `start` in its member
+    f.seek(member)
+    pos = 0  # decompressed bytes of the current member before `out`
+    carry: List[bytes] = []
+    carry_at: Locator = start
+    d = zlib.decompressobj(31)
+    consumed = member
+    while data := f.read(READ_CHUNK):
+        while data:
+            out = d.decompress(data)
+            rest = d.unused_data if d.eof else b""
+            consumed += len(data) - len(rest)
+            if discard:
+                cut = min(discard, len(out))
+                out, discard, pos = out[cut:], discard - cut, pos + cut
+            begin = 0
+            while (nl := out.find(b"\n", begin)) != -1:
+                if carry:
+                    yield carry_at, b"".join(carry) + out[begin:nl + 1]
+                    carry = []
+                else:
+                    yield (member, pos + begin), out[begin:nl + 1]
+                begin = nl + 1
+            if begin < len(out):
+                if not carry:
+                    carry_at = (member, pos + begin)
+                carry.append(out[begin:])
+            pos += len(out)
+            if d.eof:  # the next member (if any) starts here, after any zero padding
+                padding = len(rest) - len(rest.lstrip(b"\0"))
+                consumed += padding
+                member, pos, d = consumed, 0, zlib.decompressobj(31)
+                rest = rest[padding:]
+            data = rest
+    if carry:
+        yield carry_at, b"".join(carry)  # no newline: the caller treats it as partial
+
+
+def _lines(path: Path, f, start: Locator) -> Iterator[Tuple[Locator, bytes]]:
+    return _gzip_lines(f, start) if _compressed(path) else _plain_lines(f, start)
+
+
+def _fingerprint(f, end: int) -> Dict[str, str]:
+    """sha256 of the file's first bytes and of the bytes just before `end`."""
+    f.seek(0)
+    head = f.read(min(FINGERPRINT_BYTES, end))
+    f.seek(max(0, end - FINGERPRINT_BYTES))
+    tail = f.read(end - max(0, end - FINGERPRINT_BYTES))
+    return {"head": hashlib.sha256(head).hexdigest(), "tail": hashlib.sha256(tail).hexdigest()}
+
+
+# --- the index --------------------------------------------------------------------------
+class EventIndex:
+    """Blocks of an NDJSON file and the postings that point into them."""
+
+    def __init__(self, path, data: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.data = data or self._empty()
+        self._postings: Dict[str, Dict[str, List[int]]] = {
+            name: {key: _undelta(ids) for key, ids in self.data[name].items()}
+            for name in POSTINGS}
+
+    @staticmethod
+    def _empty(block_bytes: int = DEFAULT_BLOCK_BYTES) -> Dict[str, Any]:
+        return {"format": FORMAT, "version": VERSION, "block_bytes": block_bytes,
+                "resume": [0, 0], "lines": 0, "fingerprint": None,
+                "blocks": {"base": [], "skip": [], "line": [], "lines": [], "tmin": [],
+                           "tmax": [], "trials": [], "partial": []},
+                "sessions": {}, "verbs": {}}
+
+    # --- persistence -------------------------------------------------------------------
+    @classmethod
+    def load(cls, path) -> "EventIndex":
+        path = Path(path)
+        try:
+            with gzip.open(sidecar(path), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise EventIndexError(f"{path}: no index (run `event_index.py build {path}`)") from None
+        if data.get("format") != FORMAT or data.get("version") != VERSION:
+            raise EventIndexError(f"{sidecar(path)}: not a version-{VERSION} {FORMAT} file")
+        return cls(path, data)
+
+    def save(self) -> None:
+        for name in POSTINGS:
+            self.data[name] = {key: _delta(ids) for key, ids in self._postings[name].items()}
+        target = sidecar(self.path)
+        tmp = target.with_name(target.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(tmp, target)
+
+    # --- building ----------------------------------------------------------------------
+    @classmethod
+    def build(cls, path, *, block_bytes: int = DEFAULT_BLOCK_BYTES,
+              full: bool = False) -> Tuple["EventIndex", int]:
+        """(index, lines indexed by this call), updating the sidecar incrementally if
+        the file only grew since it was written (or from scratch with `full`)."""
+        path = Path(path)
+        index = None
+        if not full and sidecar(path).exists():
+            try:
+                index = cls.load(path)
+            except (EventIndexError, ValueError, OSError):
+                index = None
+        with open(path, "rb") as f:
+            if index is not None and not index._extends(f, block_bytes):
+                index = None
+            if index is None:
+                index = cls(path, cls._empty(block_bytes))
+            added = index._scan(f)
+        index.save()
+        return index, added
+
+    def _extends(self, f, block_bytes: int) -> bool:
+        """Whether the file is the indexed one plus appended bytes."""
+        resume = self.data["resume"][0]
+        size = os.fstat(f.fileno()).st_size
+        return (self.data["block_bytes"] == block_bytes and size >= resume
+                and self.data["fingerprint"] == _fingerprint(f, resume))
+
+    def _scan(self, f) -> int:
+        blocks = self.data["blocks"]
+        if blocks["partial"] and blocks["partial"][-1]:
+            self._drop_last_block()  # its line was incomplete; it's re-read below
+        block_bytes = self.data["block_bytes"]
+        start: Locator = tuple(self.data["resume"])  # type: ignore[assignment]
+        resume, complete_lines = start, self.data["lines"]
+        current: Optional[Dict[str, Any]] = None
+
+        def close(partial: bool = False) -> None:
+            nonlocal current
+            block_id = len(blocks["base"])
+            for key in ("base", "skip", "line", "lines", "tmin", "tmax"):
+                blocks[key].append(current[key])
+            bits = _trial_bits(current["trials"])
+            blocks["trials"].append(f"{bits:x}" if bits else "")
+            blocks["partial"].append(partial)
+            for name in POSTINGS:
+                for key in current[name]:
+                    self._postings[name].setdefault(key, []).append(block_id)
+            current = None
+
+        for at, line in _lines(self.path, f, start):
+            complete = line.endswith(b"\n")
+            if not complete and current is not None:
+                close()  # a trailing partial line gets a block of its own
+            if current is None:
+                current = {"base": at[0], "skip": at[1], "line": complete_lines + 1,
+                           "lines": 0, "tmin": None, "tmax": None, "bytes": 0,
+                           "sessions": set(), "trials": set(), "verbs": set()}
+            current["lines"] += 1
+            current["bytes"] += len(line)
+            keys = _keys(line)
+            if keys is not None:
+                session, trial, verb, epoch = keys
+                for name, key in (("sessions", session), ("verbs", verb)):
+                    if key is not None:
+                        current[name].add(key)
+                if trial is not None:
+                    current["trials"].update((trial, "\t" + trial.split("\t", 1)[1]))
+                if epoch is not None:
+                    if current["tmin"] is None or epoch < current["tmin"]:
+                        current["tmin"] = epoch
+                    if current["tmax"] is None or epoch > current["tmax"]:
+                        current["tmax"] = epoch
+            if not complete:
+                close(partial=True)
+                break
+            complete_lines += 1
+            resume = _after(at, line, self.path)
+            if current["bytes"] >= block_bytes:
+                close()
+        if current is not None:
+            close()
+        added = complete_lines - self.data["lines"]
+        self.data.update(resume=list(resume), lines=complete_lines,
+                         fingerprint=_fingerprint(f, resume[0]))
+        return added
+
+    def _drop_last_block(self) -> None:
+        blocks = self.data["blocks"]
+        block_id = len(blocks["base"]) - 1
+        for key in blocks:
+            blocks[key].pop()
+        for name in POSTINGS:
+            for key in [k for k, ids in self._postings[name].items() if ids[-1] == block_id]:
+                self._postings[name][key].pop()
+                if not self._postings[name][key]:
+                    del self._postings[name][key]
+
+    # --- lookups -----------------------------------------------------------------------
+    def candidates(self, *, session: Optional[str] = None, trial: Optional[str] = None,
+                   verb: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None) -> List[int]:
+        """Ids of the blocks that can hold a matching event, in file order."""
+        sets: List[Set[int]] = []
+        if session is not None:
+            sets.append(set(self._postings["sessions"].get(str(session), ())))
+        if verb is not None:
+            sets.append(set(self._postings["verbs"].get(verb, ())))
+        blocks = self.data["blocks"]
+        ids = set.intersection(*sets) if sets else set(range(len(blocks["base"])))
+        if trial is not None:
+            key = _trial_key("" if session is None else session, trial)
+            ids = {b for b in ids if _maybe_has(blocks["trials"][b], key)}
+        low, high = _epoch(since) if since else None, _epoch(until) if until else None
+        if (since and low is None) or (until and high is None):
+            raise EventIndexError("--since/--until must be ISO 8601 date-times")
+        if low is not None or high is not None:
+            ids = {b for b in ids
+                   if blocks["tmax"][b] is None  # no timestamps: can't rule it out
+                   or ((low is None or blocks["tmax"][b] >= low)
+                       and (high is None or blocks["tmin"][b] < high))}
+        return sorted(ids)
+
+    def events(self, **where) -> Iterator[Tuple[int, bytes]]:
+        """(line number, raw line) of every event matching `where` (see candidates)."""
+        match = _matcher(**where)
+        blocks = self.data["blocks"]
+        with open(self.path, "rb") as f:
+            for b in self.candidates(**where):
+                number = blocks["line"][b]
+                lines = _lines(self.path, f, (blocks["base"][b], blocks["skip"][b]))
+                for _, line in islice(lines, blocks["lines"][b]):
+                    if match(line):
+                        yield number, line
+                    number += 1
+
+
+def _after(at: Locator, line: bytes, path: Path) -> Locator:
+    """The location just past `line`."""
+    return (at[0] + len(line), 0) if not _compressed(path) else (at[0], at[1] + len(line))
+
+
+def _delta(ids: List[int]) -> List[int]:
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def _undelta(deltas: List[int]) -> List[int]:
+    out, total = [], 0
+    for d in deltas:
+        total += d
+        out.append(total)
+    return out
+
+
+def _matcher(*, session=None, trial=None, verb=None, since=None, until=None):
+    low, high = _epoch(since) if since else None, _epoch(until) if until else None
+
+    def match(line: bytes) -> bool:
+        keys = _keys(line) if line.strip() else None
+        if keys is None:
+            return False
+        s, t, v, epoch = keys
+        if session is not None and s != str(session):
+            return False
+        if trial is not None and (t is None or t.split("\t", 1)[1] != str(trial)):
+            return False
+        if verb is not None and v != verb:
+            return False
+        if low is not None and (epoch is None or epoch < low):
+            return False
+        if high is not None and (epoch is None or epoch >= high):
+            return False
+        return True
+
+    return match
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="index a file (incrementally, if it only grew)")
+    b.add_argument("file", type=Path, help=".ndjson or .ndjson.gz")
+    b.add_argument("--block-bytes", type=int, default=DEFAULT_BLOCK_BYTES, metavar="N",
+                   help=f"bytes of lines per block (default: {DEFAULT_BLOCK_BYTES})")
+    b.add_argument("--full", action="store_true", help="rebuild from scratch")
+    q = sub.add_parser("query", help="print or extract matching events")
+    q.add_argument("file", type=Path)
+    q.add_argument("--session", help="bdm:session_id")
+    q.add_argument("--trial", help="bdm:trial_index (within --session, if given)")
+    q.add_argument("--verb", help="e.g. bdm:key_pressed")
+    q.add_argument("--since", help="events at or after this date-time")
+    q.add_argument("--until", help="events before this date-time")
+    q.add_argument("-o", "--output", type=Path, help="write matching lines here (NDJSON)")
+    args = ap.parse_args()
+
+    try:
+        started = time.perf_counter()
+        if args.command == "build":
+            index, added = EventIndex.build(args.file, block_bytes=args.block_bytes,
+                                            full=args.full)
+            blocks = len(index.data["blocks"]["base"])
+            print(f"✓ {sidecar(args.file)}: +{added} line(s), {index.data['lines']} in "
+                  f"{blocks} block(s)"
+                  + (f", starting in {len(set(index.data['blocks']['base']))} gzip "
+                     f"member(s)" if _compressed(args.file) else "")
+                  + f" ({time.perf_counter() - started:.2f}s)")
+            return 0
+        index = EventIndex.load(args.file)
+        where = {k: getattr(args, k) for k in ("session", "trial", "verb", "since", "until")}
+        blocks = index.candidates(**where)
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            found = 0
+            for _, line in index.events(**where):
+                out.write(line if line.endswith(b"\n") else line + b"\n")
+                found += 1
+        finally:
+            if args.output:
+                out.close()
+        print(f"✓ {found} event(s) from {len(blocks)} of {len(index.data['blocks']['base'])} "
+              f"block(s) ({(time.perf_counter() - started) * 1000:.0f} ms)", file=sys.stderr)
+    except (EventIndexError, OSError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
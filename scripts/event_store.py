@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""A columnar event store: NDJSON events as Parquet, partitioned by session and verb.
+
+Every query over raw NDJSON re-parses the whole dump. This converts events once into
+typed columns, laid out so a query reads only what it selects:
+
+  STORE/_store.json                             manifest: column types, verbs, counts,
+                                                and the committed part files
+  STORE/session_id=<id>/verb=<verb>/part-*.parquet
+
+Partition values are URI-escaped (`verb=bdm%3Akey_pressed`) and read back by pyarrow's
+hive partitioning. A query for one session and verb ("all key_pressed in session X")
+opens only that directory's files. Each row group's rows are sorted by timestamp, so
+a time-range filter also skips row groups, within those files, by their min/max
+statistics. Events without a `bdm:session_id` land in pyarrow's null partition.
+
+The Event envelope is flattened into columns:
+
+  timestamp, stored, updated      timestamp[us, UTC] (offsets normalized to UTC)
+  actor_type, object_type, verb   dictionary<int32, string> over event/schema.json's
+                                  ActorTypeEnum / ObjectTypeEnum / VerbEnum (in schema
+                                  order, so the codes are the same in every file; values
+                                  outside the enum come after it); verb is the partition
+                                  column
+  actor_id, actor_name, object_id, object_name, version     string
+  context.<name>, result.<name>   one column per `bdm:<name>` extension, typed from
+                                  its values: bool, int64, float64 (ints and floats
+                                  mixed), string; anything else as JSON text
+  context.extensions, result.extensions, attachments, authority
+                                  JSON text of the rest (non-bdm extensions), if any
+
+A column's type can differ between files; the manifest keeps the widest type seen
+(int64 + float64 is float64, any other mix string), and reads cast each file to it.
+
+`append` adds events in new files, never rewriting old ones, so a new batch is one
+more call. Events are buffered per partition and written `row_group_rows` at a time,
+a row group per flush, to one file per partition for the whole append. A flush whose
+columns don't fit that file's (a new column, another type) starts the next file, as
+does a partition written again after `MAX_OPEN_WRITERS` others. When more than
+`max_buffered` events are held, the biggest partitions are flushed first, so memory
+doesn't grow with the input. The manifest lists the part files of every
+completed append and is replaced last, so it is the commit point: reads open only the
+files it lists. An append that fails removes the files it wrote, and any it couldn't
+(the process was killed) stay invisible, so retrying it doesn't duplicate events.
+
+pyarrow is optional (`pip install pyarrow`), as for bcsv_arrow.py. The events aren't
+schema-validated here; run validate_schemas.py on the stream first.
+
+Usage:
+    python scripts/event_store.py append store/ dumps/2026-06-05.ndjson.gz
+    python scripts/event_store.py query store/ --session S1 --verb bdm:key_pressed -o keys.parquet
+    python scripts/event_store.py query store/ --since 2026-06-05T14:00:00Z --columns verb,actor_id
+    python scripts/event_store.py info store/
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import operator
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from derive_trials import iter_events  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+EVENT_SCHEMA = ROOT / "event" / "schema.json"
+MANIFEST = "_store.json"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"  # what pyarrow reads back as null
+DEFAULT_ROW_GROUP_ROWS = 1 << 16
+DEFAULT_MAX_BUFFERED = 1 << 17  # events held across all partitions before flushing
+MAX_OPEN_WRITERS = 64  # partitions with a file open during an append
+
+TIMESTAMPS = ("timestamp", "stored", "updated")
+STRINGS = ("actor_id", "actor_name", "object_id", "object_name", "version")
+JSON_FIELDS = ("attachments", "authority")
+ENUMS = {"actor_type": "ActorTypeEnum", "object_type": "ObjectTypeEnum", "verb": "VerbEnum"}
+
+
+class StoreError(ValueError):
+    """The store can't be written or read; the message says where and why."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise StoreError("pyarrow is not installed (pip install pyarrow); it is "
+                         "optional and only needed for the event store") from None
+    return pyarrow
+
+
+def _arrow_errors() -> Tuple[type, ...]:
+    """pyarrow's exception base as a 1-tuple, or () without pyarrow (for `main`)."""
+    try:
+        import pyarrow
+    except ImportError:
+        return ()
+    return (pyarrow.ArrowException,)
+
+
+def _vocabularies() -> Dict[str, List[str]]:
+    defs = json.loads(EVENT_SCHEMA.read_text(encoding="utf-8"))["$defs"]
+    return {column: list(defs[enum]["enum"]) for column, enum in ENUMS.items()}
+
+
+def _timestamp(value: Any, where: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise StoreError(f"{where}: not an ISO 8601 date-time: {value!r}") from None
+    # A date-time without an offset is taken as UTC.
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None \
+        else parsed.astimezone(timezone.utc)
+
+
+def _json(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False,
+                                                 separators=(",", ":"))
+
+
+def flatten(event: Dict[str, Any], where: str = "event") -> Tuple[Optional[str], Dict[str, Any]]:
+    """(session id, {column: value}) for one Event; absent (null) values are left out."""
+    actor, obj = event.get("actor") or {}, event.get("object") or {}
+    row: Dict[str, Any] = {}
+    for column, value in (("actor_type", actor.get("objectType")), ("actor_id", actor.get("id")),
+                          ("actor_name", actor.get("name")), ("verb", event.get("verb")),
+                          ("object_type", obj.get("objectType")), ("object_id", obj.get("id")),
+                          ("object_name", obj.get("name")), ("version", event.get("version"))):
+        if value is not None:
+            row[column] = value
+    for key in TIMESTAMPS:
+        if event.get(key) is not None:
+            row[key] = _timestamp(event[key], f"{where}: {key}")
+    for key in JSON_FIELDS:
+        if event.get(key) is not None:
+            row[key] = _json(event[key])
+    session = None
+    for part in ("context", "result"):
+        rest = {}
+        for key, value in ((event.get(part) or {}).get("extensions") or {}).items():
+            if key == "bdm:session_id" and part == "context":
+                session = None if value is None else str(value)
+            elif key.startswith("bdm:"):
+                if value is not None:
+                    row[f"{part}.{key[4:]}"] = value
+            else:
+                rest[key] = value
+        if rest:
+            row[f"{part}.extensions"] = _json(rest)
+    return session, row
+
+
+def _kind(values: Sequence[Any]) -> str:
+    """The Arrow type name for a column of extension values (see the module docstring)."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return "null"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int}:
+        return "int64"
+    if kinds <= {int, float}:
+        return "float64"
+    return "string"
+
+
+def _wider(a: Optional[str], b: str) -> str:
+    if a is None or a == b:
+        return b
+    if {a, b} == {"int64", "float64"}:
+        return "float64"
+    return "string"
+
+
+def _conform(pa, table, schema):
+    """`table` with `schema`'s columns (nulls where it has none), or None if it has a
+    column `schema` lacks or one of another type."""
+    if any(schema.get_field_index(name) < 0 for name in table.column_names):
+        return None
+    arrays = []
+    for field in schema:
+        if field.name not in table.column_names:
+            arrays.append(pa.nulls(len(table), field.type))
+        elif table.schema.field(field.name).type != field.type:
+            return None
+        else:
+            arrays.append(table.column(field.name))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _arrow_type(pa, name: str):
+    if name == "dictionary":
+        return pa.dictionary(pa.int32(), pa.string())
+    if name == "timestamp":
+        return pa.timestamp("us", tz="UTC")
+    return {"bool": pa.bool_, "int64": pa.int64, "float64": pa.float64,
+            "string": pa.string}[name]()
+
+
+class EventStore:
+    """A directory of partitioned Parquet files plus its manifest."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST
+        if self.path.exists():
+            self.manifest = json.loads(self.path.read_text(encoding="utf-8"))
+            if "parts" not in self.manifest:  # written before parts were listed: all on disk
+                self.manifest["parts"] = sorted(
+                    p.relative_to(self.root).as_posix() for p in self.root.glob("*/*/*.parquet"))
+        else:
+            self.manifest = {"events": 0, "files": 0, "columns": {}, "verbs": [], "parts": []}
+        self._vocabularies = _vocabularies()
+
+    # --- writing ----------------------------------------------------------------------
+    def append(self, events: Iterable[Any], *, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+               max_buffered: int = DEFAULT_MAX_BUFFERED,
+               compression: Optional[str] = "zstd") -> int:
+        """Add events (dicts, or NDJSON lines as bytes/str); returns how many were added."""
+        pa = _pyarrow()
+        import pyarrow.parquet as pq
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        run = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        buffers: Dict[Tuple[Optional[str], str], List[Dict[str, Any]]] = {}
+        held = added = 0
+        columns: Dict[str, str] = dict(self.manifest["columns"])
+        verbs = list(self.manifest["verbs"])
+        parts: List[str] = []  # written by this run, relative to the root
+        writers: Dict[Tuple[Optional[str], str], Any] = {}  # open, least recently used first
+
+        def flush(key) -> None:
+            nonlocal held
+            rows = buffers.pop(key)
+            held -= len(rows)
+            rows.sort(key=lambda r: (r.get("timestamp") is None, r.get("timestamp") or 0))
+            table, kinds = self._table(pa, rows)
+            for name, kind in kinds.items():
+                columns[name] = _wider(columns.get(name), kind)
+            writer = writers.pop(key, None)
+            if writer is not None:
+                conformed = _conform(pa, table, writer.schema)
+                if conformed is None:
+                    writer.close()
+                    writer = None
+                else:
+                    table = conformed
+            if writer is None:
+                if len(writers) >= MAX_OPEN_WRITERS:
+                    writers.pop(next(iter(writers))).close()
+                session, verb = key
+                part = f"session_id={quote(session or NULL_PARTITION, safe='')}/" \
+                       f"verb={quote(verb, safe='')}/part-{run}-{len(parts):05d}.parquet"
+                (self.root / part).parent.mkdir(parents=True, exist_ok=True)
+                parts.append(part)
+                writer = pq.ParquetWriter(self.root / part, table.schema,
+                                          compression=compression)
+            writers[key] = writer
+            writer.write_table(table, row_group_size=row_group_rows)
+
+        try:
+            for n, item in enumerate(events, 1):
+                where = f"event {n}"
+                if isinstance(item, (bytes, str)):
+                    if not item.strip():
+                        continue
+                    try:
+                        item = json.loads(item)
+                    except ValueError as e:
+                        raise StoreError(f"{where}: not JSON: {e}") from None
+                if not isinstance(item, dict):
+                    raise StoreError(f"{where}: not a JSON object")
+                session, row = flatten(item, where)
+                verb = row.pop("verb", None)
+                if not isinstance(verb, str):
+                    raise StoreError(f"{where}: no verb")
+                if verb not in verbs:
+                    verbs.append(verb)
+                key = (session, verb)
+                buffers.setdefault(key, []).append(row)
+                held += 1
+                added += 1
+                if len(buffers[key]) >= row_group_rows:
+                    flush(key)
+                elif held > max_buffered:
+                    for biggest in sorted(buffers, key=lambda k: -len(buffers[k])):
+                        flush(biggest)
+                        if held <= max_buffered // 2:
+                            break
+            for key in list(buffers):
+                flush(key)
+            while writers:
+                writers.pop(next(iter(writers))).close()
+        except BaseException:
+            for writer in writers.values():
+                try:
+                    writer.close()
+                except Exception:  # noqa: BLE001 — its file is removed below either way
+                    pass
+            for part in parts:  # not committed: the manifest doesn't list them
+                (self.root / part).unlink(missing_ok=True)
+            raise
+
+        self.manifest.update(events=self.manifest["events"] + added,
+                             files=self.manifest["files"] + len(parts), columns=columns,
+                             verbs=sorted(verbs, key=self._verb_order),
+                             parts=self.manifest["parts"] + parts)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+        return added
+
+    def _verb_order(self, verb: str) -> Tuple[int, str]:
+        vocabulary = self._vocabularies["verb"]
+        return (vocabulary.index(verb), "") if verb in vocabulary else (len(vocabulary), verb)
+
+    def _table(self, pa, rows: List[Dict[str, Any]]):
+        names: Dict[str, None] = {"timestamp": None}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        arrays, fields, kinds = [], [], {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            if name in TIMESTAMPS:
+                kind = "timestamp"
+                array = pa.array(values, type=_arrow_type(pa, kind))
+            elif name in ENUMS:
+                kind = "dictionary"
+                array = self._dictionary(pa, name, values)
+            elif name in STRINGS or name.endswith(".extensions") or name in JSON_FIELDS:
+                kind = "string"
+                array = pa.array(values, type=pa.string())
+            else:
+                kind = _kind(values)
+                if kind == "null":
+                    continue
+                if kind == "string":
+                    values = [v if v is None or isinstance(v, str) else _json(v) for v in values]
+                try:
+                    array = pa.array(values, type=_arrow_type(pa, kind))
+                except OverflowError:  # an integer past int64
+                    kind = "string"
+                    array = pa.array([None if v is None else str(v) for v in values])
+            if array.null_count == len(array) and name != "timestamp":
+                continue  # nothing to store; the column reads back as null
+            arrays.append(array)
+            fields.append(pa.field(name, array.type))
+            kinds[name] = kind
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields)), kinds
+
+    def _dictionary(self, pa, name: str, values: List[Any]):
+        vocabulary = list(self._vocabularies[name])
+        codes = {v: i for i, v in enumerate(vocabulary)}
+        indices = []
+        for v in values:
+            if v is not None and v not in codes:  # outside the enum: appended after it
+                codes[v] = len(vocabulary)
+                vocabulary.append(str(v))
+            indices.append(None if v is None else codes[v])
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(vocabulary, type=pa.string()))
+
+    # --- reading ----------------------------------------------------------------------
+    def dataset(self):
+        """The store's committed files as a pyarrow Dataset, read with the manifest's types."""
+        pa = _pyarrow()
+        import pyarrow.dataset as ds
+
+        if not self.path.exists():
+            raise StoreError(f"{self.root}: not an event store (no {MANIFEST})")
+        dictionary = _arrow_type(pa, "dictionary")
+        verbs = pa.array(self.manifest["verbs"] or [""], type=pa.string())
+        partitioning = ds.partitioning(pa.schema([("session_id", pa.string()),
+                                                  ("verb", dictionary)]),
+                                       flavor="hive", dictionaries={"verb": verbs})
+        fields = [pa.field(name, _arrow_type(pa, kind))
+                  for name, kind in self.manifest["columns"].items()]
+        fields += [pa.field("session_id", pa.string()), pa.field("verb", dictionary)]
+        # the committed files only; anything else under the root is a failed append's
+        return ds.dataset([str(self.root / part) for part in self.manifest["parts"]],
+                          format="parquet", partitioning=partitioning,
+                          partition_base_dir=str(self.root), schema=pa.schema(fields))
+
+    def query(self, *, session: Optional[str] = None, verb: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              columns: Optional[List[str]] = None):
+        """(matching events as a pyarrow Table, {"files": n, "row_groups": n} read).
+
+        `since` is inclusive, `until` exclusive; both are ISO 8601 date-times.
+        """
+        import pyarrow.dataset as ds
+
+        dataset = self.dataset()
+        where = in_time = None
+        for field, op, value in (("session_id", operator.eq, session),
+                                 ("verb", operator.eq, verb),
+                                 ("timestamp", operator.ge, _timestamp(since, "since")),
+                                 ("timestamp", operator.lt, _timestamp(until, "until"))):
+            if value is None:
+                continue
+            condition = op(ds.field(field), value)
+            where = condition if where is None else where & condition
+            if field == "timestamp":
+                in_time = condition if in_time is None else in_time & condition
+        # Directories are pruned by the partition fields; row groups, within the files
+        # left, by their timestamp statistics.
+        pieces = [piece for fragment in dataset.get_fragments(filter=where)
+                  for piece in (fragment.split_by_row_group(filter=in_time)
+                                if in_time is not None else fragment.split_by_row_group())]
+        read = {"files": len({p.path for p in pieces}), "row_groups": len(pieces)}
+        return dataset.to_table(columns=columns, filter=where), read
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("append", help="add events to a store (creating it)")
+    add.add_argument("store", type=Path)
+    add.add_argument("inputs", nargs="+", type=Path,
+                     help="NDJSON (.ndjson[.gz]) streams or Event/EventBatch JSON files")
+    add.add_argument("--row-group-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS, metavar="N",
+                     help=f"events per row group (default: {DEFAULT_ROW_GROUP_ROWS})")
+    add.add_argument("--max-buffered", type=int, default=DEFAULT_MAX_BUFFERED, metavar="N",
+                     help=f"events held before flushing (default: {DEFAULT_MAX_BUFFERED})")
+    add.add_argument("--compression", default="zstd",
+                     help="Parquet codec: zstd (default), snappy, gzip, lz4, none")
+    q = sub.add_parser("query", help="select events")
+    q.add_argument("store", type=Path)
+    q.add_argument("--session", help="bdm:session_id")
+    q.add_argument("--verb", help="e.g. bdm:key_pressed")
+    q.add_argument("--since", help="events at or after this date-time")
+    q.add_argument("--until", help="events before this date-time")
+    q.add_argument("--columns", help="comma-separated columns (default: all)")
+    q.add_argument("-o", "--output", type=Path,
+                   help="write the events to this .parquet or .csv (default: print a summary)")
+    info = sub.add_parser("info", help="summarize a store")
+    info.add_argument("store", type=Path)
+    args = ap.parse_args()
+
+    try:
+        store = EventStore(args.store)
+        if args.command == "append":
+            started = time.perf_counter()
+            added = store.append((item for path in args.inputs for item in iter_events(path)),
+                                 row_group_rows=args.row_group_rows,
+                                 max_buffered=args.max_buffered,
+                                 compression=None if args.compression == "none"
+                                 else args.compression)
+            print(f"✓ {args.store}: +{added} event(s), {store.manifest['events']} in "
+                  f"{store.manifest['files']} file(s) "
+                  f"({time.perf_counter() - started:.2f}s)")
+        elif args.command == "query":
+            table, read = store.query(session=args.session, verb=args.verb, since=args.since,
+                                      until=args.until,
+                                      columns=args.columns.split(",") if args.columns else None)
+            if args.output is not None:
+                if args.output.suffix == ".csv":
+                    import pyarrow.csv as pcsv
+
+                    pcsv.write_csv(table, args.output)
+                else:
+                    import pyarrow.parquet as pq
+
+                    pq.write_table(table, args.output)
+            print(f"✓ {table.num_rows} event(s) from {read['row_groups']} row group(s) in "
+                  f"{read['files']} file(s)" + (f" → {args.output}" if args.output else ""))
+            if args.output is None:
+                for row in table.slice(0, 10).to_pylist():
+                    print("  " + json.dumps({k: v for k, v in row.items() if v is not None},
+                                            default=str))
+        else:
+            m = store.manifest
+            if not store.path.exists():
+                raise StoreError(f"{args.store}: not an event store (no {MANIFEST})")
+            print(f"{args.store}: {m['events']} event(s) in {m['files']} file(s), "
+                  f"{len(m['verbs'])} verb(s)")
+            for name, kind in m["columns"].items():
+                print(f"  {name}: {kind}")
+    except (StoreError, OSError) + _arrow_errors() as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,31 +3,68 @@
 
 For each schema directory that has a `schema.linkml.yaml`, this:
 
-  1. runs `gen-json-schema --no-metadata --inline` -> schema.json,
-  2. runs `gen-jsonld-context` -> context.jsonld,
+  1. runs the `gen-json-schema --no-metadata --inline` generator -> schema.json,
+  2. runs the `gen-jsonld-context` generator -> context.jsonld,
   3. applies the JSON-LD / discoverability post-process (scripts/linkml_postprocess.py),
-  4. writes the two files (or, with --check, reports drift without writing).
+  4. builds field-definitions.json for multi-table schemas (scripts/emit_field_definitions.py),
+  5. writes the files (or, with --check, reports drift without writing).
+
+Everything runs in this one interpreter: the LinkML generator classes are called
+directly (with exactly the options their CLIs pass), and one parsed `SchemaView` per
+schema is shared by the post-processors and the field-definitions emitter. Pass
+`--subprocess` to shell out to the `gen-*` CLIs instead (parity check after a LinkML
+upgrade); the output is byte-identical either way.
+
+Rendered artifacts are cached per schema in a local content-addressed build cache
+(scripts/build_cache.py) keyed by the LinkML source, its imports, the generator scripts
+and the LinkML version. On a key match the cached text is compared/written directly and
+generation (including the LinkML import itself) is skipped; the run ends with a report
+of which schemas were served from the cache.
+
+With `--jobs N` the cache misses are rendered on a pool of N worker processes, one task
+per (schema, artifact) step; each worker keeps one SchemaView per schema it touches.
+Results are reported in `SCHEMAS` order, so the drift report and exit code do not
+depend on N.
 
 It is deliberately generic — nothing here is catalog-specific. Schemas without a
 `schema.linkml.yaml` are skipped (dataset/event are migrated later).
 
 Usage:
-    python scripts/generate.py            # regenerate committed artifacts
-    python scripts/generate.py --check    # CI drift guard: exit 1 if any would change
+    python scripts/generate.py                # regenerate committed artifacts
+    python scripts/generate.py --check        # CI drift guard: exit 1 if any would change
+    python scripts/generate.py --subprocess   # use the gen-* CLIs instead of in-process
+    python scripts/generate.py --refresh-cache  # ignore cached entries, regenerate + re-store
+    python scripts/generate.py --no-cache     # neither read nor write the build cache
+    python scripts/generate.py --jobs 4       # render on 4 worker processes (0 = per CPU)
+    python scripts/generate.py --no-cache --profile prof.json [--cprofile-dir prof/]
+                                              # per-stage wall time + peak memory report
+    python scripts/generate.py --watch        # stay running; regenerate schemas as they are edited
 """
 from __future__ import annotations
 
 import argparse
+import difflib
+import functools
 import json
+import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
-
-from linkml_runtime import SchemaView
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from linkml_postprocess import postprocess_context, postprocess_schema  # noqa: E402
+import stage_profile  # noqa: E402
+from build_cache import DEFAULT_CACHE_DIR, BuildCache, source_closure, source_key  # noqa: E402
+from stage_profile import stage  # noqa: E402
+
+if TYPE_CHECKING:
+    from linkml_runtime import SchemaView
+
+# LinkML (and the modules built on it) are imported lazily inside the generate_*
+# functions: importing linkml_runtime alone costs about a second, which a fully cached
+# run never needs to pay.
 
 ROOT = Path(__file__).resolve().parent.parent
 
@@ -58,37 +95,233 @@ def _run(cmd: list[str]) -> str:
     return proc.stdout
 
 
-def generate_schema(src: Path) -> Dict[str, Any]:
+# Keyword arguments the `gen-json-schema` / `gen-jsonld-context` CLIs hand to their
+# generator classes for the flags used here (click defaults included). The in-process
+# path must pass the same set, or the output drifts from the CLI's.
+_COMMON_GEN_KWARGS: Dict[str, Any] = {
+    "useuris": True,
+    "importmap": None,
+    "mergeimports": True,
+    "stacktrace": False,
+}
+_JSON_SCHEMA_GEN_KWARGS: Dict[str, Any] = {
+    **_COMMON_GEN_KWARGS,
+    "format": "json",
+    "metadata": False,  # --no-metadata
+    "inline": True,  # --inline
+    "top_class": None,
+    "not_closed": True,
+    "include_range_class_descendants": False,
+    "indent": 4,
+    "title_from": "name",
+    "include": None,
+}
+_CONTEXT_GEN_KWARGS: Dict[str, Any] = {
+    **_COMMON_GEN_KWARGS,
+    "format": "context",
+    "metadata": True,
+    "base": None,
+    "prefixes": True,
+    "model": True,
+    "flatprefixes": False,
+}
+
+
+def _gen_json_schema(src: Path, in_process: bool = True) -> Dict[str, Any]:
+    """Raw `gen-json-schema --no-metadata --inline` output for a LinkML source."""
+    if not in_process:
+        return json.loads(_run(["gen-json-schema", "--no-metadata", "--inline", str(src)]))
+    from linkml.generators.jsonschemagen import JsonSchemaGenerator
+
+    kwargs = dict(_JSON_SCHEMA_GEN_KWARGS)
+    return json.loads(JsonSchemaGenerator(str(src), **kwargs).serialize(**kwargs))
+
+
+def _gen_jsonld_context(src: Path, in_process: bool = True) -> Dict[str, Any]:
+    """Raw `gen-jsonld-context` output for a LinkML source."""
+    if not in_process:
+        return json.loads(_run(["gen-jsonld-context", str(src)]))
+    from linkml.generators.jsonldcontextgen import ContextGenerator
+
+    kwargs = dict(_CONTEXT_GEN_KWARGS)
+    return json.loads(ContextGenerator(str(src), **kwargs).serialize(**kwargs))
+
+
+def generate_schema(src: Path, sv: Optional[SchemaView] = None,
+                    in_process: bool = True) -> Dict[str, Any]:
     """Return the post-processed schema.json dict for a LinkML source."""
-    schema = json.loads(_run([
-        "gen-json-schema", "--no-metadata", "--inline", str(src)
-    ]))
-    sv = SchemaView(str(src))
-    return postprocess_schema(schema, sv)
+    from linkml_postprocess import postprocess_schema
+    from linkml_runtime import SchemaView
 
+    with stage(src.parent.name, "schema.json/generate"):
+        schema = _gen_json_schema(src, in_process)
+    with stage(src.parent.name, "schema.json/postprocess"):
+        return postprocess_schema(schema, sv or SchemaView(str(src)))
 
-def generate_context(src: Path) -> Dict[str, Any]:
+
+def generate_context(src: Path, sv: Optional[SchemaView] = None,
+                     in_process: bool = True) -> Dict[str, Any]:
     """Return the post-processed context.jsonld dict for a LinkML source."""
-    context = json.loads(_run(["gen-jsonld-context", str(src)]))
-    sv = SchemaView(str(src))
-    return postprocess_context(context, sv)
+    from linkml_postprocess import postprocess_context
+    from linkml_runtime import SchemaView
 
+    with stage(src.parent.name, "context.jsonld/generate"):
+        context = _gen_jsonld_context(src, in_process)
+    with stage(src.parent.name, "context.jsonld/postprocess"):
+        return postprocess_context(context, sv or SchemaView(str(src)))
 
-def _emit_field_definitions(name: str, check: bool) -> bool:
-    """Invoke the field-definitions.json emitter. Returns True on drift (check mode)."""
-    cmd = [sys.executable, str(Path(__file__).resolve().parent / "emit_field_definitions.py"), name]
-    if check:
-        cmd.append("--check")
-    return subprocess.run(cmd).returncode != 0
+
+def generate_field_definitions(sdir: Path, sv: Optional[SchemaView] = None) -> Dict[str, Any]:
+    """Return the field-definitions.json dict for a schema directory (trial/event)."""
+    import emit_field_definitions
+
+    with stage(sdir.name, "field-definitions.json/build"):
+        return emit_field_definitions.build(sdir, sv)
+
+
+def _import_toolchain() -> None:
+    """Import LinkML and the post-processing modules (once per process; profiled as a stage)."""
+    import emit_field_definitions  # noqa: F401
+    import linkml.generators.jsonldcontextgen  # noqa: F401
+    import linkml.generators.jsonschemagen  # noqa: F401
+    import linkml_postprocess  # noqa: F401
+    import linkml_runtime  # noqa: F401
+
+
+def artifact_names(cfg: Dict[str, Any]) -> list[str]:
+    """The artifacts one schema emits, in report order."""
+    # schema.json: every LinkML schema emits one (LinkML gen + post-process).
+    names = ["schema.json"]
+    # context.jsonld: only schemas that publish semantic mappings (trial does not).
+    if cfg["emits_context"]:
+        names.append("context.jsonld")
+    # field-definitions.json: multi-table render artifact (trial/event).
+    if cfg["emits_field_definitions"]:
+        names.append("field-definitions.json")
+    return names
+
+
+def render_artifact(cfg: Dict[str, Any], fname: str, sv: SchemaView,
+                    in_process: bool = True) -> str:
+    """Render one artifact of one schema to the exact text that would be written."""
+    sdir = ROOT / cfg["name"]
+    src = sdir / LINKML_SRC
+    if fname == "schema.json":
+        data = generate_schema(src, sv, in_process)
+    elif fname == "context.jsonld":
+        data = generate_context(src, sv, in_process)
+    elif fname == "field-definitions.json":
+        data = generate_field_definitions(sdir, sv)
+    else:
+        raise ValueError(f"unknown artifact: {fname}")
+    with stage(cfg["name"], f"{fname}/serialize"):
+        return _dumps(data)
+
+
+def render_artifacts(cfg: Dict[str, Any], in_process: bool = True) -> Dict[str, str]:
+    """Render every artifact of one schema to {filename: text}, without touching disk."""
+    with stage(cfg["name"], "import"):
+        _import_toolchain()
+    from linkml_runtime import SchemaView
+
+    # One parsed SchemaView per schema, shared by every post-processor/emitter.
+    with stage(cfg["name"], "schemaview"):
+        sv = SchemaView(str(ROOT / cfg["name"] / LINKML_SRC))
+    return {fname: render_artifact(cfg, fname, sv, in_process) for fname in artifact_names(cfg)}
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_schemaview(name: str) -> SchemaView:
+    with stage(name, "import"):
+        _import_toolchain()
+    from linkml_runtime import SchemaView
+
+    with stage(name, "schemaview"):
+        return SchemaView(str(ROOT / name / LINKML_SRC))
+
+
+def _render_task(cfg: Dict[str, Any], fname: str, in_process: bool, profile: bool = False,
+                 cprofile_dir: Optional[Path] = None) -> tuple[str, list]:
+    """Pool worker: render one artifact, reusing this process's SchemaView of the schema.
+
+    Returns the text plus this task's profile records (empty unless `profile`).
+    """
+    if profile:
+        stage_profile.enable(cprofile_dir)
+    try:
+        text = render_artifact(cfg, fname, _worker_schemaview(cfg["name"]), in_process)
+    finally:
+        records = stage_profile.disable() if profile else []
+    return text, records
+
+
+def render_all(cfgs: list[Dict[str, Any]], jobs: int = 1, in_process: bool = True,
+               profile: bool = False,
+               cprofile_dir: Optional[Path] = None) -> Dict[str, Dict[str, str]]:
+    """Render every artifact of every schema in `cfgs` -> {schema: {filename: text}}.
+
+    With `jobs > 1` each (schema, artifact) step is a separate task on a process pool;
+    the result is assembled in `cfgs` / `artifact_names` order, so callers see exactly
+    what a serial run produces. Worker profile records (with `profile`) are merged into
+    this process's profiler.
+    """
+    if jobs <= 1 or not cfgs:
+        return {cfg["name"]: render_artifacts(cfg, in_process) for cfg in cfgs}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            (cfg["name"], fname): pool.submit(_render_task, cfg, fname, in_process,
+                                              profile, cprofile_dir)
+            for cfg in cfgs for fname in artifact_names(cfg)
+        }
+        out: Dict[str, Dict[str, str]] = {}
+        for cfg in cfgs:
+            for fname in artifact_names(cfg):
+                text, records = futures[(cfg["name"], fname)].result()
+                stage_profile.merge(records)
+                out.setdefault(cfg["name"], {})[fname] = text
+        return out
+
+
+def build_artifacts(cache: Optional[BuildCache], read_cache: bool = True, jobs: int = 1,
+                    in_process: bool = True, profile: bool = False,
+                    cprofile_dir: Optional[Path] = None,
+                    ) -> list[tuple[Dict[str, Any], Dict[str, str], bool]]:
+    """Rendered artifacts of every schema with a LinkML source, in SCHEMAS order.
+
+    Each schema is resolved against the build cache first; the misses are rendered
+    (serially or on a pool — the result is the same for any `jobs`) and stored back.
+    Returns (cfg, {filename: text}, served_from_cache) per schema.
+    """
+    plan: list[tuple[Dict[str, Any], Optional[str], Optional[Dict[str, str]]]] = []
+    for cfg in SCHEMAS:
+        src = ROOT / cfg["name"] / LINKML_SRC
+        if not src.exists():
+            continue
+        with stage(cfg["name"], "cache-lookup"):
+            key = source_key(src, cfg) if cache is not None else None
+            hit = cache.load(cfg["name"], key) if cache is not None and read_cache else None
+        plan.append((cfg, key, hit))
+    rendered = render_all([cfg for cfg, _, hit in plan if hit is None], jobs, in_process,
+                          profile=profile, cprofile_dir=cprofile_dir)
+
+    results = []
+    for cfg, key, hit in plan:
+        if hit is not None:
+            results.append((cfg, hit, True))
+            continue
+        artifacts = rendered[cfg["name"]]
+        if cache is not None:
+            cache.store(cfg["name"], key, artifacts)
+        results.append((cfg, artifacts, False))
+    return results
 
 
 def _dumps(data: Dict[str, Any]) -> str:
     return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
 
 
-def _write_or_check(data: Dict[str, Any], path: Path, check: bool) -> bool:
-    """Write `data` to `path`. In check mode, only report whether it would change."""
-    new = _dumps(data)
+def _write_or_check(new: str, path: Path, check: bool) -> bool:
+    """Write the rendered `new` text to `path`. In check mode, only report whether it would change."""
     if check:
         if not path.exists():
             print(f"  would create: {path.relative_to(ROOT)}")
@@ -102,40 +335,168 @@ def _write_or_check(data: Dict[str, Any], path: Path, check: bool) -> bool:
     return False
 
 
+# Longest drift diff --watch prints per artifact before truncating.
+_WATCH_DIFF_LINES = 80
+
+
+def _print_drift(path: Path, new: str) -> bool:
+    """Print a unified diff of `path` vs the rendered `new` text; return True if they differ."""
+    old = path.read_text() if path.exists() else ""
+    if old == new:
+        return False
+    rel = path.relative_to(ROOT)
+    diff = list(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                     f"a/{rel}", f"b/{rel}"))
+    for line in diff[:_WATCH_DIFF_LINES]:
+        print("    " + line, end="" if line.endswith("\n") else "\n")
+    if len(diff) > _WATCH_DIFF_LINES:
+        print(f"    ... ({len(diff) - _WATCH_DIFF_LINES} more diff lines)")
+    return True
+
+
+def _source_stamp(src: Path) -> Optional[tuple]:
+    """(path, mtime_ns, size) of the source and its local imports; None while one is missing."""
+    try:
+        paths = sorted(source_closure(src))
+    except Exception:  # noqa: BLE001 — unparseable mid-edit YAML: stamp the file itself,
+        paths = [src]  # the re-render reports the error
+    try:
+        return tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+    except OSError:  # mid-save: a file is briefly absent
+        return None
+
+
+def _watch_regenerate(cfg: Dict[str, Any], check: bool, cache: Optional[BuildCache],
+                      in_process: bool) -> None:
+    name = cfg["name"]
+    src = ROOT / name / LINKML_SRC
+    started = time.perf_counter()
+    try:
+        artifacts = render_artifacts(cfg, in_process)
+    except Exception as e:  # noqa: BLE001 — a broken mid-edit source must not end the watch
+        print(f"{name}: generation failed: {type(e).__name__}: {e}")
+        return
+    if cache is not None:
+        cache.store(name, source_key(src, cfg), artifacts)
+    changed = []
+    for fname, text in artifacts.items():
+        path = ROOT / name / fname
+        if _print_drift(path, text):
+            changed.append(fname)
+            if not check:
+                path.write_text(text)
+    verb = "would update" if check else "updated"
+    print(f"{name}: regenerated in {time.perf_counter() - started:.2f}s — "
+          + (f"{verb}: {', '.join(changed)}" if changed else "no changes"))
+
+
+def watch(check: bool, cache: Optional[BuildCache], in_process: bool = True,
+          interval: float = 0.5) -> int:
+    """Poll every LinkML source (and its local imports); regenerate only the touched schema.
+
+    The process stays warm between edits — LinkML, its generators and the metamodel are
+    imported once — so a re-render costs only the touched schema's SchemaView and
+    generation. Edits to the generator scripts themselves need a restart.
+    """
+    cfgs = [cfg for cfg in SCHEMAS if (ROOT / cfg["name"] / LINKML_SRC).exists()]
+    _import_toolchain()
+    stamps = {cfg["name"]: _source_stamp(ROOT / cfg["name"] / LINKML_SRC) for cfg in cfgs}
+    print(f"\nwatching {len(cfgs)} schema(s) every {interval}s "
+          f"({'check only' if check else 'regenerating'}); Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(interval)
+            for cfg in cfgs:
+                stamp = _source_stamp(ROOT / cfg["name"] / LINKML_SRC)
+                if stamp is None or stamp == stamps[cfg["name"]]:
+                    continue
+                stamps[cfg["name"]] = stamp
+                _watch_regenerate(cfg, check, cache, in_process)
+    except KeyboardInterrupt:
+        print("\nwatch stopped")
+        return 0
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description=__doc__)
     ap.add_argument("--check", action="store_true",
                     help="dry run: exit 1 if any committed artifact would change")
+    ap.add_argument("--subprocess", action="store_true",
+                    help="shell out to the gen-* CLIs instead of running the generators in-process")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="neither read nor write the build cache")
+    ap.add_argument("--refresh-cache", action="store_true",
+                    help="invalidate: ignore cached entries, regenerate, and re-store")
+    ap.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                    help=f"build cache location (default: {DEFAULT_CACHE_DIR.relative_to(ROOT)}/)")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="render schemas (and their artifacts) on N worker processes; "
+                         "0 = one per CPU (default: 1, serial)")
+    ap.add_argument("--profile", type=Path, metavar="REPORT.json",
+                    help="record wall time + peak memory per schema and stage; write a JSON "
+                         "report here and print a summary table (combine with --no-cache to "
+                         "profile generation rather than cache hits)")
+    ap.add_argument("--cprofile-dir", type=Path, metavar="DIR",
+                    help="with --profile, also dump one cProfile .prof per (schema, stage)")
+    ap.add_argument("--watch", action="store_true",
+                    help="after the normal run, keep polling the LinkML sources and regenerate "
+                         "(printing the drift diff) whenever one changes; with --check, only "
+                         "print the diff")
+    ap.add_argument("--interval", type=float, default=0.5, metavar="SECONDS",
+                    help="--watch polling interval (default: 0.5)")
     args = ap.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.cprofile_dir and not args.profile:
+        ap.error("--cprofile-dir requires --profile")
+    if args.watch and args.profile:
+        ap.error("--watch cannot be combined with --profile")
+    profile = args.profile is not None
+    if profile:
+        stage_profile.enable(args.cprofile_dir)
+    started = time.perf_counter()
+
+    # --subprocess exists to exercise the real gen-* CLIs, so it never reads the cache.
+    cache = None if args.no_cache else BuildCache(args.cache_dir)
+    read_cache = cache is not None and not (args.refresh_cache or args.subprocess)
+
+    results = build_artifacts(cache, read_cache, jobs, in_process=not args.subprocess,
+                              profile=profile, cprofile_dir=args.cprofile_dir)
 
     drift = False
-    processed = 0
-    for cfg in SCHEMAS:
+    processed = len(results)
+    cached: list[str] = []
+    for cfg, artifacts, from_cache in results:
         name = cfg["name"]
-        sdir = ROOT / name
-        src = sdir / LINKML_SRC
-        if not src.exists():
-            continue
-        processed += 1
-        print(f"{name}:")
-        # schema.json: every LinkML schema emits one (LinkML gen + post-process).
-        drift |= _write_or_check(generate_schema(src), sdir / "schema.json", args.check)
-        # context.jsonld: only schemas that publish semantic mappings (trial does not).
-        if cfg["emits_context"]:
-            drift |= _write_or_check(generate_context(src), sdir / "context.jsonld", args.check)
-        # field-definitions.json: multi-table render artifact (trial/event).
-        if cfg["emits_field_definitions"]:
-            drift |= _emit_field_definitions(name, args.check)
+        if from_cache:
+            cached.append(name)
+        print(f"{name}: (cached)" if from_cache else f"{name}:")
+        for fname, text in artifacts.items():
+            with stage(name, f"{fname}/{'check' if args.check else 'write'}"):
+                drift |= _write_or_check(text, ROOT / name / fname, args.check)
 
     if processed == 0:
         print("no schemas with schema.linkml.yaml found")
+    elif cache is not None:
+        print(f"\nbuild cache: {len(cached)}/{processed} schema(s) served from cache"
+              + (f" ({', '.join(cached)})" if cached else ""))
+
+    if profile:
+        report = stage_profile.build_report(
+            stage_profile.disable(), time.perf_counter() - started,
+            check=args.check, jobs=jobs, cache=cache is not None and read_cache,
+            subprocess=args.subprocess, cached=cached)
+        stage_profile.write_report(report, args.profile)
+        print(f"\nprofile ({args.profile}):\n{stage_profile.format_summary(report)}")
 
     if args.check:
         if drift:
             print("\ndrift detected: committed artifacts differ from regeneration")
-            return 1
-        print("\nup to date: committed artifacts match regeneration")
-    return 0
+        else:
+            print("\nup to date: committed artifacts match regeneration")
+
+    if args.watch:
+        return watch(args.check, cache, in_process=not args.subprocess, interval=args.interval)
+    return 1 if args.check and drift else 0
 
 
 if __name__ == "__main__":
@@ -16,6 +16,9 @@ processors) rely on. This module re-applies those, driven generically from a
 
 The `sdo`-prefix workaround exists only to dodge a `schema:` vs `linkml:types`
 collision at generation time; it must never leak into published artifacts.
+
+Class/slot graph queries (tree_root, concrete descendants, induced slots, annotations)
+go through the memoized per-view index in scripts/schema_index.py.
 """
 from __future__ import annotations
 
@@ -23,6 +26,8 @@ from typing import Any, Dict
 
 from linkml_runtime import SchemaView
 
+from schema_index import schema_index
+
 # The internal prefix label used in the LinkML source to dodge the
 # `schema:` (https) vs linkml:types `schema:` (http) collision, and the
 # published label/URI it must be normalized back to.
@@ -56,7 +61,7 @@ def _slot_uri_published(sv: SchemaView, slot) -> str:
 
 def postprocess_schema(schema: Dict[str, Any], sv: SchemaView) -> Dict[str, Any]:
     """Apply schema.json transforms (a-type-const, f-titles, a-sdo-normalize, g-versioned-$id)."""
-    tree_root = _tree_root_class(sv)
+    tree_root = schema_index(sv).tree_root
 
     # (g) Versioned, self-identifying `$id` (VERSIONING.md: each release bumps `$id`,
     # and snapshots under versions/vYY.MMDD/ must carry their own immutable identifier).
@@ -116,12 +121,7 @@ def _abstract_root_to_oneof(schema: Dict[str, Any], sv: SchemaView, tree_root) -
     preserved; the loose root `properties`/`type`/`required`/`additionalProperties` that
     gen-json-schema emitted for the empty umbrella class are removed.
     """
-    descendants = {tree_root.name, *sv.class_descendants(tree_root.name)}
-    concrete = [
-        cname for cname in sv.all_classes()
-        if cname in descendants and cname != tree_root.name
-        and not sv.get_class(cname).abstract
-    ]
+    concrete = schema_index(sv).concrete_descendants(tree_root.name)
     if not concrete:
         return
     for key in ("properties", "type", "required", "additionalProperties"):
@@ -161,11 +161,8 @@ def postprocess_context(context_doc: Dict[str, Any], sv: SchemaView) -> Dict[str
             elif isinstance(val, dict) and "@id" in val and isinstance(val["@id"], str):
                 val["@id"] = _to_published_curie(val["@id"])
 
-    # Build a name->slot lookup once (induced slots of every class, plus all slots).
-    slots_by_name = {s.name: s for s in sv.all_slots().values()}
-    for cls in sv.all_classes().values():
-        for s in sv.class_induced_slots(cls.name):
-            slots_by_name.setdefault(s.name, s)
+    # name->slot lookup (all slots, plus the induced slots of every class), memoized per view.
+    slots_by_name = schema_index(sv).slots_by_name
 
     for term, val in list(ctx.items()):
         if not isinstance(val, dict):
@@ -215,11 +212,10 @@ def _schema_annotation_json(sv: SchemaView, key: str):
     LinkML may surface the value as a jsonasobj2 `JsonObj`, a plain dict/list, or a
     raw JSON string; all are normalized to plain Python here.
     """
-    anns = sv.schema.annotations or {}
-    a = anns.get(key)
-    if a is None:
+    anns = schema_index(sv).schema_annotations
+    if key not in anns:
         return None
-    val = a.value
+    val = anns[key]
     if isinstance(val, str):
         try:
             import json as _json
@@ -274,13 +270,6 @@ def _add_secondary_mappings(ctx, sv, slots_by_name) -> None:
                 ctx[key] = {"@id": mapping}
 
 
-def _tree_root_class(sv: SchemaView):
-    for cls in sv.all_classes().values():
-        if cls.tree_root:
-            return cls
-    return None
-
-
 def _iter_property_blocks(schema: Dict[str, Any]):
     """Yield every `properties` dict in the schema (root + each $defs class)."""
     if isinstance(schema.get("properties"), dict):
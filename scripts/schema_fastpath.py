@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Compile a JSON Schema definition into a specialized Python validity check.
+
+`jsonschema` interprets a schema: for every instance it walks the keyword tree,
+dispatches each keyword through a table and resolves every `$ref`. For a small, fixed
+envelope like event/schema.json's `Event` that interpretation is nearly all the
+cost. This module generates the Python source of one function per definition and
+per object/array node instead, using direct key checks, frozenset membership for
+enums and additionalProperties, precompiled regexes for patterns, and plain calls
+for `$ref`. It then compiles that source once:
+
+    is_event = compile_definition(json.loads(Path("event/schema.json").read_text()),
+                                  "Event")
+    is_event(event)  # -> bool
+
+The schema compiled is the one scripts/generate.py derives from the LinkML source
+(`Event` / `EventBatch` in event/schema.linkml.yaml). That way the fast path follows
+the same generated artifact jsonschema checks, and the two agree by construction.
+
+Only a yes/no is produced. `FastValidator` pairs the compiled check with a jsonschema
+validator: `is_valid` takes the fast path, and `iter_errors`, which is only needed for
+the rare invalid instance, falls back to jsonschema for its detailed messages and
+paths. A schema that uses a keyword outside the supported subset (listed in
+`SUPPORTED`) raises `UnsupportedSchema` at compile time; FastValidator then uses
+jsonschema for everything.
+
+Type checks follow jsonschema's: booleans are not numbers, and 1.0 is an integer.
+String formats are not checked, as in validate_schemas.py.
+
+Usage:
+    python scripts/schema_fastpath.py event/schema.json Event          # print the source
+    python scripts/schema_fastpath.py event/schema.json EventBatch --benchmark \\
+        event/examples/kitchensink_event_batch.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+SUPPORTED = frozenset({
+    "$ref", "$defs", "$schema", "$id", "type", "enum", "properties", "required",
+    "additionalProperties", "items", "pattern", "minLength", "maxLength", "minimum",
+    "maximum", "minItems", "maxItems", "anyOf", "allOf", "oneOf", "not", "format",
+})
+ANNOTATIONS = frozenset({"title", "description", "examples", "default", "$comment",
+                         "metamodel_version", "version"})
+
+_TYPE_TESTS = {
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool)"
+               " or isinstance({v}, float) and {v}.is_integer())",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+}
+_NUMBER = _TYPE_TESTS["number"]
+
+
+class UnsupportedSchema(ValueError):
+    """The schema uses something the generator doesn't compile."""
+
+
+class _Compiler:
+    def __init__(self, root: Dict[str, Any]):
+        self.defs: Dict[str, Any] = root.get("$defs") or root.get("definitions") or {}
+        self.constants: Dict[str, Any] = {}
+        self.functions: List[str] = []
+        self.named: Dict[str, str] = {}  # definition -> function name
+
+    def constant(self, value: Any) -> str:
+        name = f"_K{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def definition(self, name: str) -> str:
+        if name not in self.named:
+            if name not in self.defs:
+                raise UnsupportedSchema(f"no definition {name!r}")
+            fn = self.named[name] = f"is_{re.sub(r'[^0-9A-Za-z_]', '_', name)}"
+            self.emit(fn, ["    return " + self.test(self.defs[name], "x")])
+        return self.named[name]
+
+    def emit(self, name: str, body: List[str]) -> str:
+        self.functions.append("\n".join([f"def {name}(x):", *body]))
+        return name
+
+    def test(self, schema: Any, v: str) -> str:
+        """A boolean expression: does the value named `v` satisfy `schema`?"""
+        if schema is True or schema == {}:
+            return "True"
+        if schema is False:
+            return "False"
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schema {schema!r}")
+        unknown = set(schema) - SUPPORTED - ANNOTATIONS
+        if unknown:
+            raise UnsupportedSchema(f"keywords {sorted(unknown)}")
+        parts: List[str] = []
+        ref = schema.get("$ref")
+        if ref is not None:
+            if not (isinstance(ref, str) and ref.startswith(("#/$defs/", "#/definitions/"))):
+                raise UnsupportedSchema(f"$ref {ref!r}")
+            parts.append(f"{self.definition(ref.rsplit('/', 1)[1])}({v})")
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else types
+            if set(types) != set(_TYPE_TESTS):
+                parts.append("(" + " or ".join(_TYPE_TESTS[t].format(v=v) for t in types) + ")")
+        if "enum" in schema:
+            members = schema["enum"]
+            if not all(isinstance(m, str) for m in members):
+                raise UnsupportedSchema("enum with non-string members")
+            parts.append(f"(isinstance({v}, str) and {v} in {self.constant(frozenset(members))})")
+        if "pattern" in schema:
+            regex = self.constant(re.compile(schema["pattern"]))
+            parts.append(f"(not isinstance({v}, str) or {regex}.search({v}) is not None)")
+        for key, op in (("minLength", ">="), ("maxLength", "<=")):
+            if key in schema:
+                parts.append(f"(not isinstance({v}, str) or len({v}) {op} {schema[key]!r})")
+        for key, op in (("minimum", ">="), ("maximum", "<=")):
+            if key in schema:
+                parts.append(f"(not {_NUMBER.format(v=v)} or {v} {op} {schema[key]!r})")
+        if any(k in schema for k in ("properties", "required", "additionalProperties")):
+            parts.append(f"{self.object_check(schema)}({v})")
+        if any(k in schema for k in ("items", "minItems", "maxItems")):
+            parts.append(f"{self.array_check(schema)}({v})")
+        for key, joiner in (("anyOf", " or "), ("allOf", " and ")):
+            if key in schema:
+                parts.append("(" + joiner.join(self.test(s, v) for s in schema[key]) + ")")
+        if "oneOf" in schema:
+            parts.append("(sum((" + "".join(f"bool({self.test(s, v)}), "
+                                            for s in schema["oneOf"]) + ")) == 1)")
+        if "not" in schema:
+            parts.append(f"not {self.test(schema['not'], v)}")
+        return " and ".join(parts) or "True"
+
+    def object_check(self, schema: Dict[str, Any]) -> str:
+        properties: Dict[str, Any] = schema.get("properties", {})
+        body = ["    if not isinstance(x, dict):", "        return True"]
+        extra = schema.get("additionalProperties", True)
+        if extra is False:
+            body += [f"    if not {self.constant(frozenset(properties))}.issuperset(x):",
+                     "        return False"]
+        required = schema.get("required", [])
+        if required:
+            body += ["    if not (" + " and ".join(f"{k!r} in x" for k in required) + "):",
+                     "        return False"]
+        for key, sub in properties.items():
+            test = self.test(sub, "v")
+            if test != "True":
+                body += [f"    v = x.get({key!r}, _MISSING)",
+                         f"    if v is not _MISSING and not ({test}):", "        return False"]
+        if extra not in (True, False):
+            known = self.constant(frozenset(properties))
+            body += ["    for k, v in x.items():",
+                     f"        if k not in {known} and not ({self.test(extra, 'v')}):",
+                     "            return False"]
+        return self.emit(f"_object{len(self.functions)}", body + ["    return True"])
+
+    def array_check(self, schema: Dict[str, Any]) -> str:
+        body = ["    if not isinstance(x, list):", "        return True"]
+        if "minItems" in schema:
+            body += [f"    if len(x) < {schema['minItems']!r}:", "        return False"]
+        if "maxItems" in schema:
+            body += [f"    if len(x) > {schema['maxItems']!r}:", "        return False"]
+        items = schema.get("items", True)
+        if isinstance(items, list):
+            raise UnsupportedSchema("tuple-form items")
+        test = self.test(items, "v")
+        if test != "True":
+            body += ["    for v in x:", f"        if not ({test}):", "            return False"]
+        return self.emit(f"_array{len(self.functions)}", body + ["    return True"])
+
+
+def generate(schema: Dict[str, Any], definition: str) -> Tuple[str, Dict[str, Any], str]:
+    """(Python source, the constants it refers to, the entry function's name)."""
+    compiler = _Compiler(schema)
+    entry = compiler.definition(definition)
+    header = [f"# Generated by scripts/schema_fastpath.py from definition {definition!r}.",
+              *(f"# {name} = {_literal(value)}" for name, value in compiler.constants.items())]
+    return "\n\n\n".join(["\n".join(header), *compiler.functions]) + "\n", \
+        compiler.constants, entry
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, frozenset):  # sorted, so the printed source is reproducible
+        return "frozenset({" + ", ".join(map(repr, sorted(value))) + "})"
+    return repr(value)
+
+
+def compile_definition(schema: Dict[str, Any], definition: str) -> Callable[[Any], bool]:
+    """A function telling whether an instance satisfies `definition` of `schema`."""
+    source, constants, entry = generate(schema, definition)
+    namespace: Dict[str, Any] = {"_MISSING": object(), **constants}
+    exec(compile(source, f"<fastpath {definition}>", "exec"), namespace)
+    return namespace[entry]
+
+
+class FastValidator:
+    """is_valid by compiled code; iter_errors by jsonschema (for the messages).
+
+    `validator` is the jsonschema validator for the same definition, so the two
+    answer the same question.
+    """
+
+    def __init__(self, schema: Dict[str, Any], definition: str, validator):
+        self.validator = validator
+        try:
+            self.check: Callable[[Any], bool] = compile_definition(schema, definition)
+            self.compiled = True
+        except UnsupportedSchema:
+            self.check, self.compiled = validator.is_valid, False
+
+    def is_valid(self, instance: Any) -> bool:
+        return self.check(instance)
+
+    def iter_errors(self, instance: Any) -> Iterator[Any]:
+        return self.validator.iter_errors(instance)
+
+
+_PROBES = (None, True, 0, 2.0, 1.5, "", "x", [], {})
+
+
+def mutants(instance: Any) -> Iterator[Any]:
+    """Copies of `instance` with one value replaced, one key dropped or one key added.
+
+    Every node is probed with a value of each JSON type, so the compiled check and
+    jsonschema can be compared on near misses, not only on valid examples.
+    """
+    for probe in _PROBES:
+        yield probe
+    if isinstance(instance, dict):
+        yield {**instance, "__unexpected__": 0}
+        for key, value in instance.items():
+            yield {k: v for k, v in instance.items() if k != key}
+            for variant in mutants(value):
+                yield {**instance, key: variant}
+    elif isinstance(instance, list):
+        for i, value in enumerate(instance):
+            for variant in mutants(value):
+                yield [*instance[:i], variant, *instance[i + 1:]]
+
+
+def _instances(path: Path, definition: str) -> List[Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".ndjson":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    doc = json.loads(text)
+    if definition == "Event" and isinstance(doc, dict) and "events" in doc:
+        return doc["events"]
+    return [doc]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("schema", type=Path, help="a JSON Schema with $defs")
+    ap.add_argument("definition", help="the $defs entry to compile (e.g. Event)")
+    ap.add_argument("--benchmark", nargs="+", type=Path, metavar="INSTANCES",
+                    help="time the compiled check against jsonschema on these JSON/NDJSON "
+                         "files (and check they agree on them and their mutants) instead of printing the source")
+    args = ap.parse_args()
+
+    schema = json.loads(args.schema.read_text(encoding="utf-8"))
+    if not args.benchmark:
+        try:
+            sys.stdout.write(generate(schema, args.definition)[0])
+        except UnsupportedSchema as e:
+            print(f"✗ {args.definition}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from validate_schemas import definition_validator
+
+    reference = definition_validator(schema, args.definition)
+    fast = compile_definition(schema, args.definition)
+    instances = [i for path in args.benchmark for i in _instances(path, args.definition)]
+    disagree = [m for i in instances for m in (i, *mutants(i))
+                if fast(m) != reference.is_valid(m)]
+    rounds = max(1, 20000 // max(1, len(instances)))
+    timings = {}
+    for label, check in (("jsonschema", reference.is_valid), ("compiled", fast)):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for instance in instances:
+                check(instance)
+        timings[label] = (time.perf_counter() - started) / (rounds * len(instances))
+    print(f"{'✗' if disagree else '✓'} {len(instances)} instance(s), "
+          f"{len(disagree)} disagreement(s); per instance: jsonschema "
+          f"{timings['jsonschema'] * 1e6:.1f} µs, compiled {timings['compiled'] * 1e6:.2f} µs "
+          f"({timings['jsonschema'] / timings['compiled']:.0f}×)")
+    return 1 if disagree else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Memoized, per-SchemaView index of the class/slot graph the post-processors walk.
+
+linkml_postprocess.py and emit_field_definitions.py query the same class/slot graph:
+the class list, the tree_root, the concrete descendants of an abstract root, induced
+slots per class (and the name->slot lookup built from them), and annotations.
+SchemaView answers each query from scratch — `all_classes()` copies and re-orders the
+class map on every call (so does every `get_class()`), and `class_induced_slots()`
+re-induces each slot — so this caches the answers once per view.
+
+`schema_index(sv)` returns the index attached to `sv`. It is rebuilt only when the view
+changes: a new SchemaView (i.e. a re-parsed source) or an in-place edit that bumps
+`sv.modifications`. Entries are computed on first use, so a run that never asks for
+induced slots (e.g. trial, which emits no context.jsonld) never pays for them.
+"""
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model.meta import ClassDefinition, SlotDefinition
+
+
+def _annotation_values(element) -> Dict[str, Any]:
+    """{key: value} of an element's annotations (values as SchemaView surfaces them)."""
+    return {k: a.value for k, a in (element.annotations or {}).items()}
+
+
+class SchemaIndex:
+    """Lazily-filled, memoized answers to the class/slot queries of one SchemaView."""
+
+    def __init__(self, sv: SchemaView):
+        self.sv = sv
+        self._induced: Dict[str, List[SlotDefinition]] = {}
+        self._concrete: Dict[str, List[str]] = {}
+        self._class_annotations: Dict[str, Dict[str, Any]] = {}
+
+    @cached_property
+    def classes(self) -> Dict[str, ClassDefinition]:
+        """All classes (imports closure), in definition order."""
+        return dict(self.sv.all_classes())
+
+    @cached_property
+    def tree_root(self) -> Optional[ClassDefinition]:
+        return next((c for c in self.classes.values() if c.tree_root), None)
+
+    def induced_slots(self, class_name: str) -> List[SlotDefinition]:
+        if class_name not in self._induced:
+            self._induced[class_name] = self.sv.class_induced_slots(class_name)
+        return self._induced[class_name]
+
+    @cached_property
+    def slots_by_name(self) -> Dict[str, SlotDefinition]:
+        """name -> slot over all slots, then the induced slots of every class (first wins)."""
+        slots = {s.name: s for s in self.sv.all_slots().values()}
+        for cname in self.classes:
+            for s in self.induced_slots(cname):
+                slots.setdefault(s.name, s)
+        return slots
+
+    def concrete_descendants(self, class_name: str) -> List[str]:
+        """Non-abstract proper descendants of `class_name`, in class definition order."""
+        if class_name not in self._concrete:
+            descendants = set(self.sv.class_descendants(class_name))
+            self._concrete[class_name] = [
+                cname for cname, c in self.classes.items()
+                if cname in descendants and cname != class_name and not c.abstract
+            ]
+        return self._concrete[class_name]
+
+    @cached_property
+    def schema_annotations(self) -> Dict[str, Any]:
+        return _annotation_values(self.sv.schema)
+
+    def class_annotations(self, class_name: str) -> Dict[str, Any]:
+        if class_name not in self._class_annotations:
+            self._class_annotations[class_name] = _annotation_values(self.classes[class_name])
+        return self._class_annotations[class_name]
+
+
+def schema_index(sv: SchemaView) -> SchemaIndex:
+    """The memoized index for `sv`, rebuilt only if the view was modified since."""
+    stamp = (sv.uuid, sv.modifications)
+    cached = getattr(sv, "_schema_index", None)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, SchemaIndex(sv))
+        sv._schema_index = cached
+    return cached[1]
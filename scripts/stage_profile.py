@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Per-schema, per-stage wall-time / peak-memory profiling for scripts/generate.py.
+
+generate.py wraps each pipeline step in `stage(schema, name)`; while no profiler is
+active that is a no-op (`nullcontext`), so normal runs pay nothing. `--profile` enables
+a `Profiler` that records, for every stage:
+
+  seconds     wall time (perf_counter),
+  peak_bytes  peak traced Python allocation during the stage (tracemalloc; absolute,
+              i.e. including whatever was already live when the stage began),
+
+and, with `--cprofile-dir`, dumps one cProfile `.prof` per stage (load with
+`python -m pstats` or snakeviz).
+
+Stages are meant to be flat. A stage opened inside another is still timed, but only the
+outermost one resets the tracemalloc peak and runs cProfile (profilers don't nest).
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: Optional["Profiler"] = None
+
+
+class Profiler:
+    """Collects one record per (schema, stage) run."""
+
+    def __init__(self, cprofile_dir: Optional[Path] = None):
+        self.cprofile_dir = cprofile_dir
+        self.records: List[Dict[str, Any]] = []
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, schema: str, name: str) -> Iterator[None]:
+        outermost = self._depth == 0
+        self._depth += 1
+        prof = None
+        if outermost:
+            tracemalloc.reset_peak()
+            if self.cprofile_dir is not None:
+                prof = cProfile.Profile()
+                prof.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if prof is not None:
+                prof.disable()
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                prof.dump_stats(self.cprofile_dir / f"{schema}.{name.replace('/', '_')}.prof")
+            self._depth -= 1
+            self.records.append({
+                "schema": schema,
+                "stage": name,
+                "seconds": round(seconds, 6),
+                "peak_bytes": tracemalloc.get_traced_memory()[1] if outermost else None,
+            })
+
+
+def enable(cprofile_dir: Optional[Path] = None) -> Profiler:
+    """Start profiling in this process; `stage()` records into the returned Profiler."""
+    global _active
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _active = Profiler(cprofile_dir)
+    return _active
+
+
+def disable() -> List[Dict[str, Any]]:
+    """Stop profiling in this process and return its records."""
+    global _active
+    records = _active.records if _active is not None else []
+    _active = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return records
+
+
+def merge(records: List[Dict[str, Any]]) -> None:
+    """Fold records collected in another process (a --jobs worker) into this one's."""
+    if _active is not None:
+        _active.records.extend(records)
+
+
+def stage(schema: str, name: str):
+    """Context manager timing one pipeline stage (no-op unless profiling is enabled)."""
+    if _active is None:
+        return nullcontext()
+    return _active.stage(schema, name)
+
+
+def build_report(records: List[Dict[str, Any]], total_seconds: float,
+                 **run: Any) -> Dict[str, Any]:
+    """Machine-readable report: environment, run options, per-stage records, per-schema totals."""
+    schemas: Dict[str, Dict[str, Any]] = {}
+    for r in records:
+        s = schemas.setdefault(r["schema"], {"seconds": 0.0, "peak_bytes": 0})
+        s["seconds"] = round(s["seconds"] + r["seconds"], 6)
+        if r["peak_bytes"] is not None:
+            s["peak_bytes"] = max(s["peak_bytes"], r["peak_bytes"])
+    versions = {}
+    for dist in ("linkml", "linkml-runtime"):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return {
+        "python": platform.python_version(),
+        "toolchain": versions,
+        "run": run,
+        "total_seconds": round(total_seconds, 6),
+        "schemas": schemas,
+        "stages": records,
+    }
+
+
+def write_report(report: Dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    """Human summary table: one row per stage, a total row per schema."""
+    def mib(n: Optional[int]) -> str:
+        return "-" if n is None else f"{n / 2**20:.1f}"
+
+    rows = [("schema", "stage", "wall ms", "peak MiB")]
+    for name, totals in report["schemas"].items():
+        for r in report["stages"]:
+            if r["schema"] == name:
+                rows.append((name, r["stage"], f"{r['seconds'] * 1000:.1f}", mib(r["peak_bytes"])))
+        rows.append((name, "(total)", f"{totals['seconds'] * 1000:.1f}", mib(totals["peak_bytes"])))
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = []
+    for i, row in enumerate(rows):
+        lines.append("  ".join([row[0].ljust(widths[0]), row[1].ljust(widths[1]),
+                                row[2].rjust(widths[2]), row[3].rjust(widths[3])]))
+        if i == 0:
+            lines.append("  ".join("-" * w for w in widths))
+    lines.append(f"total wall time: {report['total_seconds']:.3f}s")
+    return "\n".join(lines)
@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+"""Streaming reference implementation of `validate_bcsv`.
+
+Validates a bcsv metadata document and the CSV it describes, producing the
+ValidationResult contract that `bcsv/conformance/` specifies (README §4.4 codes):
+
+  {"valid": bool,
+   "errors":   [{"code": ..., "location": ..., "message": ...}, ...],
+   "warnings": [...]}
+
+Stages, in order (a fatal stage stops the run):
+
+  metadata     FILE_NOT_FOUND (metadata), METADATA_INVALID_JSON                 fatal
+  schema       SCHEMA_VIOLATION per JSON Schema error, at its JSON pointer
+               (check_schema; string formats are not checked — see validate_schemas.py)
+  constraints  LEVELS_REQUIRED / LEVELS_FORBIDDEN per column (check_constraints)
+  dialect      DIALECT_UNSUPPORTED for sub-properties v0 doesn't honor
+  data         FILE_NOT_FOUND (data)                                            fatal
+  header       COLUMN_MISSING_IN_DATA / COLUMN_MISSING_IN_METADATA / COLUMN_ORDER_DIFFERS
+  rows         COERCION_FAILED per cell; with check_constraints also LEVEL_NOT_DECLARED,
+               RANGE_VIOLATION, LENGTH_VIOLATION, REQUIRED_VIOLATION per cell and one
+               PRIMARY_KEY_VIOLATION for the table
+  integrity    HASH_MISMATCH / HASH_ABSENT
+
+With `jobs > 1` the records are instead split into byte ranges at record boundaries
+and checked on a process pool (bcsv_parse.py), while the file is hashed alongside.
+
+The data file is read once, in `chunk_size` blocks: the raw bytes feed SHA-256 (so
+`file_hash` costs no second read; bcsv_integrity.py's digest cache can even skip the
+hashing) on their way into an incremental decoder and the CSV reader. Records are
+checked in batches, a column chunk at a time (bcsv_coerce.py), and dropped. Memory is
+therefore bounded by the chunk and batch sizes, independent of file size; the
+primary-key check keeps compact key digests within `pk_memory` bytes and spills the
+rest to disk (bcsv_keys.py).
+
+Everything that depends on the metadata alone is compiled into a ValidationPlan: the
+metadata-stage issues, the dialect, and one checker per column. Plans are cached (LRU)
+by the content hash of the metadata minus its per-file `url`/`file_hash`, so a run
+over many shards that share a layout interprets that layout once.
+
+Two ways to get an answer sooner on big or badly broken files. `max_errors_per_code`
+keeps the first N row-level issues of each code, in record order, whatever `jobs` is,
+and only counts the rest (`"suppressed": {code: n}` in the result). A column stops
+being checked once every code it can report is capped, and reading stops once no
+column is left (unless the primary key still needs the remaining keys); the counts are
+then lower bounds, marked `"suppressed_exact": false`. `sample=N` checks the header,
+the first and last N records and N records at random byte offsets, and returns a
+provisional result marked `"sampled": true`; it checks neither the primary key nor
+`file_hash`.
+
+Row-level codes are warnings under the default `on_violation="warn"` and errors under
+`on_violation="error"`; every other code has a fixed severity. Messages are for
+humans and not part of the contract. `format` patterns are not interpreted.
+
+Usage:
+    python scripts/validate_bcsv.py path/to/metadata.json           # exit 1 if invalid
+    python scripts/validate_bcsv.py metadata.json --data other.csv --json
+    python scripts/validate_bcsv.py metadata.json --no-schema --on-violation error
+    python scripts/validate_bcsv.py metadata.json --sample 1000 --max-errors-per-code 20
+    python scripts/validate_bcsv.py --conformance                   # run bcsv/conformance/
+"""
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bcsv_coerce import CATEGORICAL, ColumnSpec, coerce_column, violation_message  # noqa: E402
+from bcsv_integrity import DigestCache, HashingReader, file_sha256  # noqa: E402
+from bcsv_keys import DEFAULT_MEMORY as DEFAULT_PK_MEMORY, DuplicateKeyDetector  # noqa: E402
+from bcsv_parse import (  # noqa: E402
+    DEFAULT_CHUNK_BYTES, map_chunks, read_header, record_end, split_records, splittable,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+BCSV_SCHEMA = ROOT / "bcsv" / "schema.json"
+CONFORMANCE_DIR = ROOT / "bcsv" / "conformance"
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # bytes per read of the data file
+DEFAULT_BATCH_ROWS = 8192  # records per column chunk handed to bcsv_coerce
+SAMPLE_BLOCK_BYTES = 1 << 16  # least read per sampled record / for the sampled tail
+SAMPLE_FULL_SCAN_BYTES = 4 << 20  # sampling a file with less left than this reads it all
+
+# Codes whose severity follows `on_violation`; every other code's severity is fixed.
+VIOLATION_CODES = frozenset({
+    "LEVEL_NOT_DECLARED", "RANGE_VIOLATION", "LENGTH_VIOLATION",
+    "REQUIRED_VIOLATION", "COERCION_FAILED", "PRIMARY_KEY_VIOLATION",
+})
+ON_VIOLATION = ("warn", "error")
+
+HONORED_DIALECT_KEYS = frozenset({"delimiter", "encoding"})
+
+# Fields that differ between shards sharing one layout: a plan covers everything else,
+# and these are schema-checked per document.
+PER_FILE_KEYS = ("url", "file_hash")
+PLAN_CACHE_SIZE = 256
+
+
+@dataclass
+class Issue:
+    code: str
+    location: Optional[str]
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "location": self.location, "message": self.message}
+
+
+@dataclass
+class ValidationResult:
+    errors: List[Issue] = field(default_factory=list)
+    warnings: List[Issue] = field(default_factory=list)
+    sampled: bool = False  # provisional: only a sample of the records was checked
+    suppressed: Dict[str, int] = field(default_factory=dict)  # code -> issues past the cap
+    suppressed_exact: bool = True  # False: capped columns went unchecked, counts are minimums
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "valid": self.valid,
+            "errors": [i.to_dict() for i in self.errors],
+            "warnings": [i.to_dict() for i in self.warnings],
+        }
+        if self.sampled:
+            out["sampled"] = True
+        if self.suppressed:
+            out["suppressed"] = dict(sorted(self.suppressed.items()))
+        if not self.suppressed_exact:
+            out["suppressed_exact"] = False
+        return out
+
+
+class _Report:
+    """Routes issues to errors/warnings; row-level codes follow `on_violation`.
+
+    With `max_errors_per_code`, row-level issues past that many of one code are only
+    counted (in `result.suppressed`), as far as they are still looked for.
+    """
+
+    def __init__(self, on_violation: str, max_errors_per_code: Optional[int] = None):
+        if on_violation not in ON_VIOLATION:
+            raise ValueError(f"on_violation must be one of {ON_VIOLATION}, got {on_violation!r}")
+        if max_errors_per_code is not None and max_errors_per_code < 1:
+            raise ValueError(f"max_errors_per_code must be at least 1, got {max_errors_per_code}")
+        self.result = ValidationResult()
+        self._violations = self.result.errors if on_violation == "error" else self.result.warnings
+        self.cap = max_errors_per_code
+        self._counts: Counter = Counter()
+
+    def error(self, code: str, location: Optional[str], message: str) -> None:
+        self.result.errors.append(Issue(code, location, message))
+
+    def warn(self, code: str, location: Optional[str], message: str) -> None:
+        self.result.warnings.append(Issue(code, location, message))
+
+    def violation(self, code: str, location: Optional[str], message: str) -> None:
+        if self.capped(code):
+            self.suppress(code)
+            return
+        self._counts[code] += 1
+        self._violations.append(Issue(code, location, message))
+
+    def capped(self, code: str) -> bool:
+        return self.cap is not None and self._counts[code] >= self.cap
+
+    def room(self, code: str) -> int:
+        """How many more issues of `code` are kept (with a cap set)."""
+        return max(0, self.cap - self._counts[code])  # type: ignore[operator]
+
+    def suppress(self, code: str, n: int = 1) -> None:
+        suppressed = self.result.suppressed
+        suppressed[code] = suppressed.get(code, 0) + n
+
+
+# --- metadata stages -----------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _schema_validator():
+    import jsonschema
+
+    return jsonschema.Draft7Validator(json.loads(BCSV_SCHEMA.read_text()))
+
+
+def _pointer(path) -> str:
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in path)
+
+
+def _check_schema(meta: Any, report: _Report) -> None:
+    errors = sorted(_schema_validator().iter_errors(meta), key=lambda e: list(map(str, e.path)))
+    for err in errors:
+        report.error("SCHEMA_VIOLATION", _pointer(err.absolute_path), err.message)
+
+
+@lru_cache(maxsize=None)
+def _per_file_validator():
+    """The bcsv schema's rules for PER_FILE_KEYS alone."""
+    schema = _schema_validator().schema
+    return type(_schema_validator())({
+        "type": "object",
+        "required": [k for k in schema["required"] if k in PER_FILE_KEYS],
+        "properties": {k: schema["properties"][k] for k in PER_FILE_KEYS},
+    })
+
+
+def _check_per_file_schema(meta: Dict[str, Any], report: _Report) -> None:
+    own = {k: meta[k] for k in PER_FILE_KEYS if k in meta}
+    for err in _per_file_validator().iter_errors(own):
+        report.error("SCHEMA_VIOLATION", _pointer(err.absolute_path), err.message)
+
+
+def _declared_columns(meta: Any) -> Optional[List[Dict[str, Any]]]:
+    """The usable column declarations, or None if there is no column list at all."""
+    table_schema = meta.get("table_schema") if isinstance(meta, dict) else None
+    columns = table_schema.get("columns") if isinstance(table_schema, dict) else None
+    if not isinstance(columns, list):
+        return None
+    return [c for c in columns if isinstance(c, dict) and isinstance(c.get("name"), str)]
+
+
+def _check_constraints(columns: List[Dict[str, Any]], report: _Report) -> None:
+    for col in columns:
+        categorical = col.get("datatype") in CATEGORICAL
+        if categorical and "levels" not in col:
+            report.error("LEVELS_REQUIRED", col["name"],
+                         f"datatype {col['datatype']!r} requires `levels`")
+        elif not categorical and "levels" in col:
+            report.error("LEVELS_FORBIDDEN", col["name"],
+                         f"`levels` is only allowed on categorical/ordered columns, "
+                         f"not {col.get('datatype', 'string')!r}")
+
+
+def resolve_dialect(meta: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+    """(delimiter, Python codec name, what v0 doesn't honor) from `meta`'s `dialect`.
+
+    Unsupported sub-properties fall back to the defaults (",", UTF-8). A UTF-8 BOM is
+    an encoding artifact, not part of the first column name, so UTF-8 reads as
+    "utf-8-sig".
+    """
+    dialect = meta.get("dialect")
+    if not isinstance(dialect, dict):
+        return ",", "utf-8-sig", []
+    unsupported = sorted(k for k in dialect if k not in HONORED_DIALECT_KEYS)
+    delimiter = dialect.get("delimiter", ",")
+    if not (isinstance(delimiter, str) and len(delimiter) == 1):
+        unsupported.append(f"delimiter={delimiter!r}")
+        delimiter = ","
+    encoding = dialect.get("encoding", "utf-8")
+    try:
+        codec = codecs.lookup(encoding).name
+    except (LookupError, TypeError):
+        unsupported.append(f"encoding={encoding!r}")
+        codec = "utf-8"
+    return delimiter, "utf-8-sig" if codec == "utf-8" else codec, unsupported
+
+
+def _dialect(meta: Dict[str, Any], report: _Report) -> Tuple[str, str]:
+    """(delimiter, codec) from `dialect`, warning on what v0 doesn't honor."""
+    delimiter, codec, unsupported = resolve_dialect(meta)
+    if unsupported:
+        report.warn("DIALECT_UNSUPPORTED", "/dialect",
+                    f"not honored by bcsv v0 (ignored): {', '.join(unsupported)}")
+    return delimiter, codec
+
+
+# --- data stages ------------------------------------------------------------------
+
+def _check_header(header: List[str], declared: List[str], report: _Report) -> None:
+    in_data, in_meta = set(header), set(declared)
+    for name in declared:
+        if name not in in_data:
+            report.error("COLUMN_MISSING_IN_DATA", name,
+                         "declared in metadata but absent from the CSV header")
+    for name in header:
+        if name not in in_meta:
+            report.error("COLUMN_MISSING_IN_METADATA", name,
+                         "present in the CSV header but not declared in metadata")
+    if in_data == in_meta and header != declared:
+        report.warn("COLUMN_ORDER_DIFFERS", None,
+                    f"CSV column order {header} differs from metadata order {declared}")
+
+
+def _primary_key(meta: Dict[str, Any]) -> List[str]:
+    pk = meta["table_schema"].get("primary_key")
+    if isinstance(pk, str):
+        return [pk]
+    return [k for k in pk if isinstance(k, str)] if isinstance(pk, list) else []
+
+
+def _checkers(header: List[str], plan: "ValidationPlan") -> List[Tuple[int, ColumnSpec, Callable]]:
+    """(header position, spec, checker) for each plan column the header has."""
+    positions = {name: i for i, name in enumerate(header)}
+    return [(positions[spec.name], spec, check) for spec, check in plan.checkers
+            if spec.name in positions]
+
+
+def _key_positions(header: List[str], plan: "ValidationPlan") -> List[int]:
+    """Header positions of the primary-key columns; [] if there is none to check."""
+    positions = {name: i for i, name in enumerate(header)}
+    if plan.primary_key and all(k in positions for k in plan.primary_key):
+        return [positions[k] for k in plan.primary_key]
+    return []
+
+
+def _columns(batch: List[List[str]], width: int) -> List[Tuple[str, ...]]:
+    if min(map(len, batch)) < width:  # short records: missing cells read as empty
+        batch = [r + [""] * (width - len(r)) if len(r) < width else r for r in batch]
+    return list(zip(*batch))
+
+
+def _violations(cells: List[Tuple[str, ...]], checkers,
+                room: Optional[Callable[[str], int]]) -> Tuple[List[Tuple[int, int, str]], Counter]:
+    """A batch's violations as (record, header position, code), record by record.
+
+    With `room`, at most `room(code)` of each code are returned and the rest only
+    counted (the Counter). Taking them in record order rather than column by column
+    makes what a cap keeps independent of where batches start, so a serial and a
+    parallel scan keep the same issues.
+    """
+    found: List[Tuple[int, int, str]] = []
+    left: Counter = Counter()
+    for i, _, check in checkers:
+        for code, mask in check(cells[i]).masks.items():
+            limit, taken = (room(code) if room is not None else None), 0
+            j = mask.find(1)
+            while j != -1 and (limit is None or taken < limit):
+                found.append((j, i, code))
+                taken += 1
+                j = mask.find(1, j + 1)
+            if limit is not None and j != -1:
+                left[code] += mask.count(1, j)
+    found.sort()
+    if room is None:
+        return found, left
+    kept: List[Tuple[int, int, str]] = []
+    taken_by: Counter = Counter()
+    for violation in found:  # each column kept `room`; the batch as a whole may not
+        code = violation[2]
+        if taken_by[code] < room(code):
+            taken_by[code] += 1
+            kept.append(violation)
+        else:
+            left[code] += 1
+    return kept, left
+
+
+def _drop_capped(checkers, capped: Callable[[str], bool]) -> Tuple[list, bool]:
+    """The checkers that can still report a code that isn't `capped`, and whether one
+    dropped could have reported more (so suppressed counts from here on are minimums).
+    """
+    live, lossy = [], False
+    for checker in checkers:
+        codes = checker[1].codes
+        if not all(map(capped, codes)):
+            live.append(checker)
+        elif codes:
+            lossy = True
+    return live, lossy
+
+
+def _check_batch(batch: List[List[str]], width: int, checkers, report: _Report,
+                 where: Callable[[int], str]) -> List[Tuple[str, ...]]:
+    """Run the checkers over a batch of records; returns its columns.
+
+    `where(j)` names the batch's j-th record in messages (e.g. "row 12").
+    """
+    cells = _columns(batch, width)
+    specs = {i: spec for i, spec, _ in checkers}
+    found, left = _violations(cells, checkers, report.room if report.cap is not None else None)
+    for j, i, code in found:
+        report.violation(code, specs[i].name,
+                         f"{where(j)}: {violation_message(specs[i], code, cells[i][j])}")
+    for code, n in left.items():
+        if n:
+            report.suppress(code, n)
+    return cells
+
+
+def _scan_rows(reader, header: List[str], plan: "ValidationPlan", report: _Report,
+               batch_rows: int = DEFAULT_BATCH_ROWS, pk_memory: int = DEFAULT_PK_MEMORY,
+               check_keys: bool = True) -> None:
+    """Check the data records `batch_rows` at a time, one column chunk per plan checker.
+
+    Under a per-code cap, a column is dropped once every code it can report is capped,
+    and reading stops once no column is left and no primary key is being checked.
+    """
+    checkers = _checkers(header, plan)
+    key_at = _key_positions(header, plan) if check_keys else []
+    keys = DuplicateKeyDetector(pk_memory) if key_at else None
+
+    width = len(header)
+    first_row = 1
+    while batch := list(islice(reader, batch_rows)):
+        if report.cap is not None:
+            checkers, lossy = _drop_capped(checkers, report.capped)
+            if lossy:
+                report.result.suppressed_exact = False
+            if not checkers and keys is None:
+                break
+        cells = _check_batch(batch, width, checkers, report,
+                             lambda j, first=first_row: f"row {first + j}")
+        if keys is not None:
+            keys.add([cells[i] for i in key_at], first_row)
+        first_row += len(batch)
+    _report_duplicates(keys, plan.primary_key, report)
+
+
+def _report_duplicates(keys: Optional[DuplicateKeyDetector], primary_key: List[str],
+                       report: _Report) -> None:
+    duplicates = keys.finish() if keys is not None else None
+    if duplicates and duplicates.count:
+        shown = ", ".join(f"row {r} duplicates row {f}" for r, f in duplicates.examples)
+        more = duplicates.count - len(duplicates.examples)
+        report.violation("PRIMARY_KEY_VIOLATION", None,
+                         f"{duplicates.count} duplicate key(s) under primary_key "
+                         f"{primary_key}: {shown}" + (f" (+{more} more)" if more else ""))
+
+
+def _check_chunk(records, header: List[str], plan: "ValidationPlan", cap: Optional[int],
+                 key_at: List[int]) -> Tuple[int, List[Tuple[str, int, int, str]],
+                                             Dict[str, int], List[List[str]], bool]:
+    """One parallel task (see _scan_parallel): check the records of one byte range.
+
+    Returns (records, violations, suppressed counts, key columns' cells, whether the
+    counts are exact). Violations are (code, header position, 0-based record within
+    the range, cell), at most `cap` per code; row numbers and messages are the
+    parent's, which knows where the range starts. Columns are dropped, and the range
+    left unread, as in _scan_rows but on this range's counts: the first `cap` of a
+    code in the file are among the first `cap` of some range.
+    """
+    checkers = _checkers(header, plan)
+    width = len(header)
+    counts: Counter = Counter()
+    suppressed: Counter = Counter()
+    kept: List[Tuple[str, int, int, str]] = []
+    keys: List[List[str]] = [[] for _ in key_at]
+    rows, exact = 0, True
+    room = (lambda code: cap - counts[code]) if cap is not None else None
+    while batch := list(islice(records, DEFAULT_BATCH_ROWS)):
+        if cap is not None:
+            checkers, lossy = _drop_capped(checkers, lambda code: counts[code] >= cap)
+            exact = exact and not lossy
+            if not checkers and not key_at:
+                break
+        cells = _columns(batch, width)
+        found, left = _violations(cells, checkers, room)
+        kept.extend((code, i, rows + j, cells[i][j]) for j, i, code in found)
+        if cap is not None:
+            counts.update(code for _, _, code in found)
+        suppressed.update(left)
+        for column, at in zip(keys, key_at):
+            column.extend(cells[at])
+        rows += len(batch)
+    return rows, kept, {code: n for code, n in suppressed.items() if n}, keys, exact
+
+
+def _scan_parallel(data_path: Path, header: List[str], data_start: int, plan: "ValidationPlan",
+                   report: _Report, jobs: int, pk_memory: int = DEFAULT_PK_MEMORY,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """_scan_rows on a process pool: byte ranges of the data are checked in parallel
+    (bcsv_parse.py) and merged in file order, so row numbers, the per-code cap and
+    the primary-key check come out as in a serial scan. Once every column is capped
+    and no primary key is checked, the ranges still to come are not read."""
+    checkers = _checkers(header, plan)
+    specs = {i: spec for i, spec, _ in checkers}
+    key_at = _key_positions(header, plan)
+    keys = DuplicateKeyDetector(pk_memory) if key_at else None
+    ranges = split_records(data_path, data_start, DEFAULT_CHUNK_BYTES)
+    results = map_chunks(_check_chunk, data_path, ranges, (header, plan, report.cap, key_at),
+                         delimiter=plan.delimiter, codec=plan.encoding, jobs=jobs,
+                         buffer_size=chunk_size)
+    first_row = 1
+    for done, (rows, kept, suppressed, key_cells, exact) in enumerate(results, 1):
+        for code, i, j, cell in kept:
+            report.violation(code, specs[i].name, f"row {first_row + j}: "
+                             f"{violation_message(specs[i], code, cell)}")
+        for code, n in suppressed.items():
+            report.suppress(code, n)
+        if not exact:
+            report.result.suppressed_exact = False
+        if keys is not None and rows:
+            keys.add(key_cells, first_row)
+        first_row += rows
+        if report.cap is not None and keys is None and done < len(ranges):
+            live, lossy = _drop_capped(checkers, report.capped)
+            if not live:
+                if lossy:
+                    report.result.suppressed_exact = False
+                results.close()  # cancels the ranges not yet started
+                break
+    _report_duplicates(keys, plan.primary_key, report)
+
+
+def _scan_sample(raw, reader, header: List[str], plan: "ValidationPlan", report: _Report,
+                 rows: int, seed: int = 0, pk_memory: int = DEFAULT_PK_MEMORY) -> bool:
+    """Check the first and last `rows` records and `rows` more at random offsets.
+
+    `raw` is the binary file under `reader`. A record in between is the first one
+    that starts after a random byte. Record starts are found as bcsv_parse's splitter
+    finds them, by quote parity counted from the previous known start, so a newline
+    inside a quoted field is never taken for one: the file is read once at bytes.count
+    speed, but only the sampled records are parsed and checked. A sampled record of
+    another width than the header is skipped, not reported (a quote inside an
+    unquoted field throws the parity off, and the misread record would only produce
+    false issues). The primary key, which needs every record, is not checked. A file
+    with little left after its head is checked in full instead (keys too). True if
+    records were skipped, i.e. the result is provisional.
+    """
+    head = list(islice(reader, rows + 1))
+    size = os.fstat(raw.fileno()).st_size
+    head_end = raw.tell()  # past the head and whatever the reader has buffered
+    if len(head) <= rows or size - head_end < SAMPLE_FULL_SCAN_BYTES:
+        _scan_rows(chain(head, reader), header, plan, report, pk_memory=pk_memory)
+        return False
+    _scan_rows(iter(head), header, plan, report, check_keys=False)
+    if not splittable(plan.encoding):  # b"\n" / b'"' may sit inside other characters
+        return True
+
+    codec = "utf-8" if plan.encoding == "utf-8-sig" else plan.encoding  # no BOM mid-file
+    checkers = _checkers(header, plan)
+    width = len(header)
+
+    def records(begin: int, end: int) -> List[List[str]]:
+        raw.seek(begin)
+        text = raw.read(end - begin).decode(codec, errors="replace")
+        found = csv.reader(io.StringIO(text, newline=""), delimiter=plan.delimiter)
+        return [r for r in found if len(r) == width]
+
+    record_bytes = max(1, head_end // len(head))  # an overestimate: head_end includes the buffer
+    tail_start = max(head_end, size - max(SAMPLE_BLOCK_BYTES, 2 * (rows + 1) * record_bytes))
+    known = record_end(raw, 0, 0)  # the first data record's start
+    rng = random.Random(seed)
+    middle: List[Tuple[int, List[str]]] = []
+    for offset in sorted(rng.randrange(head_end, tail_start) for _ in range(rows)) \
+            if tail_start > head_end else []:
+        begin = record_end(raw, known, offset) if offset > known else known
+        if begin >= tail_start:
+            break  # the tail covers it
+        known = record_end(raw, begin, begin)
+        middle += [(begin, r) for r in records(begin, known)]
+    if middle:
+        _check_batch([r for _, r in middle], width, checkers, report,
+                     lambda j: f"record at byte {middle[j][0]}")
+
+    begin = record_end(raw, known, tail_start) if tail_start > known else known
+    tail = records(begin, size)[-rows:]
+    if tail:
+        _check_batch(tail, width, checkers, report,
+                     lambda j: f"record {len(tail) - j} from the end")
+    return True
+
+
+# --- validation plans ---------------------------------------------------------------
+
+@dataclass
+class ValidationPlan:
+    """Everything validate_bcsv derives from a metadata layout, resolved once.
+
+    A plan holds the metadata-stage issues, the dialect, and one checker per physical
+    column: `coerce_column` bound to the column's ColumnSpec, with its NA set and
+    level lookup table already built. Reusing a plan skips all metadata
+    interpretation. Checkers are partials of a module function, so plans pickle, and a
+    parent process can compile them once and hand them to workers (`seed_plans`).
+    """
+
+    key: Optional[str]
+    errors: List[Issue] = field(default_factory=list)
+    warnings: List[Issue] = field(default_factory=list)
+    columns: Optional[List[str]] = None  # physical names in declared order; None: no list
+    checkers: List[Tuple[ColumnSpec, Callable]] = field(default_factory=list)
+    primary_key: List[str] = field(default_factory=list)
+    delimiter: str = ","
+    encoding: str = "utf-8-sig"
+
+
+_PLANS: "OrderedDict[str, ValidationPlan]" = OrderedDict()
+
+
+def plan_key(meta: Dict[str, Any], check_schema: bool, check_constraints: bool) -> str:
+    """Content hash of `meta`'s layout (key order and whitespace don't matter)."""
+    layout = {k: v for k, v in meta.items() if k not in PER_FILE_KEYS}
+    text = json.dumps([layout, check_schema, check_constraints], sort_keys=True,
+                      separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _compile(meta: Any, key: Optional[str], check_schema: bool,
+             check_constraints: bool) -> ValidationPlan:
+    report = _Report("warn")
+    if check_schema:
+        # The per-file fields are checked per document; a placeholder `url` keeps
+        # the layout's own errors free of them.
+        layout = meta if key is None else \
+            {**{k: v for k, v in meta.items() if k not in PER_FILE_KEYS}, "url": ""}
+        _check_schema(layout, report)
+    columns = _declared_columns(meta)
+    if columns is None:
+        if not check_schema:
+            report.error("SCHEMA_VIOLATION", "/table_schema/columns",
+                         "metadata declares no column list")
+        return ValidationPlan(key, report.result.errors, report.result.warnings)
+    if check_constraints:
+        _check_constraints(columns, report)
+    delimiter, encoding = _dialect(meta, report)
+    physical = [c for c in columns if not c.get("virtual")]
+    specs = [ColumnSpec.from_column(c, check_constraints) for c in physical]
+    interned: Dict[str, str] = {}  # one string object per level across all columns
+    for spec in specs:
+        if spec.levels is not None:
+            spec.levels = frozenset(interned.setdefault(lv, lv) for lv in spec.levels)
+    return ValidationPlan(
+        key, report.result.errors, report.result.warnings,
+        columns=[c["name"] for c in physical],
+        checkers=[(spec, partial(coerce_column, spec, values=False)) for spec in specs],
+        primary_key=_primary_key(meta) if check_constraints else [],
+        delimiter=delimiter, encoding=encoding)
+
+
+def compile_plan(meta: Any, check_schema: bool = True,
+                 check_constraints: bool = True) -> ValidationPlan:
+    """The plan for `meta`'s layout, from an LRU cache keyed by its content hash."""
+    if not isinstance(meta, dict):
+        return _compile(meta, None, check_schema, check_constraints)
+    key = plan_key(meta, check_schema, check_constraints)
+    plan = _PLANS.get(key)
+    if plan is not None:
+        _PLANS.move_to_end(key)
+        return plan
+    plan = _PLANS[key] = _compile(meta, key, check_schema, check_constraints)
+    if len(_PLANS) > PLAN_CACHE_SIZE:
+        _PLANS.popitem(last=False)
+    return plan
+
+
+def seed_plans(plans: Iterable[ValidationPlan]) -> None:
+    """Add plans compiled elsewhere (e.g. in a parent process) to this process's cache."""
+    for plan in plans:
+        if plan.key is not None:
+            _PLANS[plan.key] = plan
+    while len(_PLANS) > PLAN_CACHE_SIZE:
+        _PLANS.popitem(last=False)
+
+
+def validate_bcsv(metadata_path, data_path=None, *, check_schema: bool = True,
+                  check_constraints: bool = True, on_violation: str = "warn",
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  digest_cache: Optional[DigestCache] = None,
+                  pk_memory: int = DEFAULT_PK_MEMORY,
+                  max_errors_per_code: Optional[int] = None,
+                  sample: Optional[int] = None, sample_seed: int = 0,
+                  jobs: int = 1) -> ValidationResult:
+    """Validate a bcsv metadata document and its CSV in one streaming pass.
+
+    `data_path` defaults to the metadata's `url`, resolved against the metadata's
+    directory. `check_schema` / `check_constraints` switch off the JSON Schema stage
+    and the constraint checks (metadata rules + levels/range/length/required/primary
+    key) respectively, as conformance fixtures' `validate_with` may ask. A
+    `digest_cache` that already knows the data file's state spares hashing it.
+    `pk_memory` bounds the primary-key check's memory, in bytes.
+
+    `max_errors_per_code` keeps at most that many row-level issues of each code (the
+    rest are counted in `suppressed`), stops checking a column once all its codes are
+    capped and stops reading records once nothing left to check can report anything
+    new; `suppressed_exact` is then False, the counts being minimums. `sample=N`
+    checks only the first and last N records and N at random offsets (seeded by
+    `sample_seed`), skipping the primary-key and hash checks, and marks the result
+    `sampled`: a quick, provisional verdict.
+
+    `jobs > 1` checks the records on that many worker processes, a byte range each
+    (bcsv_parse.py), while this process hashes the file; the result is a serial
+    scan's, except for inexact `suppressed` counts. Encodings that can't be split at
+    byte offsets (UTF-16/32) are scanned serially, as is a sampled check.
+    """
+    report = _Report(on_violation, max_errors_per_code)
+    metadata_path = Path(metadata_path)
+
+    if not metadata_path.is_file():
+        report.error("FILE_NOT_FOUND", str(metadata_path), "metadata file not found")
+        return report.result
+    try:
+        meta = json.loads(metadata_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        report.error("METADATA_INVALID_JSON", str(metadata_path), str(e))
+        return report.result
+
+    plan = compile_plan(meta, check_schema, check_constraints)
+    if check_schema and plan.key is not None:
+        _check_per_file_schema(meta, report)
+    report.result.errors.extend(plan.errors)
+    report.result.warnings.extend(plan.warnings)
+    if plan.columns is None:
+        return report.result
+
+    if data_path is None:
+        url = meta.get("url")
+        if not isinstance(url, str):
+            report.error("FILE_NOT_FOUND", None, "metadata has no `url` and no data path was given")
+            return report.result
+        data_path = metadata_path.parent / url
+    data_path = Path(data_path)
+    if not data_path.is_file():
+        report.error("FILE_NOT_FOUND", str(data_path), "data file not found")
+        return report.result
+
+    declared_hash = meta.get("file_hash")
+    # Hash only if there is something to verify and the cache can't vouch for the file.
+    digest = digest_cache.lookup(data_path) if digest_cache and declared_hash else None
+    if jobs > 1 and sample is None and splittable(plan.encoding):
+        header, data_start = read_header(data_path, plan.delimiter, plan.encoding)
+        _check_header(header, plan.columns, report)
+        with ThreadPoolExecutor(1) as hasher:  # hashlib releases the GIL while it hashes
+            hashed = hasher.submit(file_sha256, data_path, digest_cache) \
+                if declared_hash is not None and digest is None else None
+            _scan_parallel(data_path, header, data_start, plan, report, jobs,
+                           pk_memory=pk_memory, chunk_size=chunk_size)
+            if hashed is not None:
+                digest = hashed.result()
+    else:
+        stamp = digest_cache.stamp(data_path) if digest_cache is not None else None
+        with open(data_path, "rb") as raw:
+            hashing = HashingReader(raw, hash=declared_hash is not None and digest is None)
+            text = io.TextIOWrapper(io.BufferedReader(hashing, buffer_size=chunk_size),
+                                    encoding=plan.encoding, errors="replace", newline="")
+            reader = csv.reader(text, delimiter=plan.delimiter)
+            header = next(reader, [])
+            _check_header(header, plan.columns, report)
+            if sample is None:
+                _scan_rows(reader, header, plan, report, pk_memory=pk_memory)
+            else:
+                report.result.sampled = _scan_sample(raw, reader, header, plan, report, sample,
+                                                     sample_seed, pk_memory=pk_memory)
+            if digest is None and not report.result.sampled:
+                digest = hashing.hexdigest(chunk_size)
+                if digest is not None and digest_cache is not None:
+                    digest_cache.store(data_path, digest, stamp)
+
+    if declared_hash is None:
+        report.warn("HASH_ABSENT", "/file_hash", "no file_hash: data integrity not verified")
+    elif digest is None:
+        pass  # sampled, and the digest cache couldn't vouch for the file: not verified
+    elif not isinstance(declared_hash, str) or declared_hash.lower() != digest:
+        report.error("HASH_MISMATCH", str(data_path),
+                     f"file_hash {declared_hash} does not match sha256(data) {digest}")
+    return report.result
+
+
+# --- conformance -------------------------------------------------------------------
+
+# Codes whose location is a filesystem path; the suite compares the bare filename.
+_PATH_LOCATED = frozenset({"FILE_NOT_FOUND", "METADATA_INVALID_JSON", "HASH_MISMATCH"})
+
+
+def _normalized(issues: List[Dict[str, Any]]) -> Counter:
+    return Counter(
+        (i["code"], Path(i["location"]).name
+         if i["code"] in _PATH_LOCATED and i["location"] else i["location"])
+        for i in issues)
+
+
+def run_conformance(conformance_dir: Path = CONFORMANCE_DIR) -> List[str]:
+    """Run every fixture through validate_bcsv; one failure line per disagreement."""
+    failures: List[str] = []
+    fixtures = sorted(p for kind in ("positive", "negative")
+                      for p in (conformance_dir / kind).iterdir() if p.is_dir())
+    for fixture in fixtures:
+        rel = fixture.relative_to(conformance_dir)
+        expected = json.loads((fixture / "expected.json").read_text())
+        got = validate_bcsv(fixture / "metadata.json",
+                            **expected.get("validate_with", {})).to_dict()
+        if got["valid"] != expected["valid"]:
+            failures.append(f"{rel}: valid={got['valid']}, expected {expected['valid']}")
+        for kind in ("errors", "warnings"):
+            want, have = _normalized(expected[kind]), _normalized(got[kind])
+            if want != have:
+                failures.append(f"{rel}: {kind} {sorted(have.elements(), key=str)}, "
+                                f"expected {sorted(want.elements(), key=str)}")
+    return failures
+
+
+def _print_result(label: str, result: ValidationResult) -> None:
+    status = "✓" if result.valid else "✗"
+    print(f"{status} {label}: {'valid' if result.valid else 'invalid'} "
+          f"({len(result.errors)} error(s), {len(result.warnings)} warning(s))"
+          + (" [sampled: provisional; primary key and file_hash not checked]"
+             if result.sampled else ""))
+    for mark, issues in (("✗", result.errors), ("!", result.warnings)):
+        for i in issues:
+            loc = "" if i.location is None else f" @ {i.location}"
+            print(f"    {mark} {i.code}{loc}: {i.message}")
+    at_least = "" if result.suppressed_exact else "at least "
+    for code, n in sorted(result.suppressed.items()):
+        print(f"    … {code}: {at_least}{n} more not shown (--max-errors-per-code)")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("metadata", nargs="?", type=Path, help="bcsv metadata.json")
+    ap.add_argument("--data", type=Path, help="CSV to validate (default: the metadata's url)")
+    ap.add_argument("--no-schema", action="store_true", help="skip JSON Schema validation")
+    ap.add_argument("--no-constraints", action="store_true",
+                    help="skip constraint checks (levels/range/length/required/primary key)")
+    ap.add_argument("--on-violation", choices=ON_VIOLATION, default="warn",
+                    help="severity of row-level violations (default: warn)")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, metavar="BYTES",
+                    help=f"bytes per read of the data file (default: {DEFAULT_CHUNK_SIZE})")
+    ap.add_argument("--digest-cache", type=Path, metavar="DIGESTS.json",
+                    help="reuse/record verified data-file digests (see bcsv_integrity.py)")
+    ap.add_argument("--pk-memory", type=int, default=DEFAULT_PK_MEMORY >> 20, metavar="MIB",
+                    help="memory for the primary-key check before it spills to disk "
+                         f"(default: {DEFAULT_PK_MEMORY >> 20})")
+    ap.add_argument("--max-errors-per-code", type=int, metavar="N",
+                    help="report at most N row-level issues per code, count the rest as "
+                         "long as they are looked for, and stop reading once nothing new "
+                         "can be reported")
+    ap.add_argument("--sample", type=int, metavar="N",
+                    help="provisional check: the header, the first and last N records and N "
+                         "at random offsets (no primary-key or file_hash check)")
+    ap.add_argument("--seed", type=int, default=0, help="random seed for --sample (default: 0)")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="check the records on N worker processes; 0 = one per CPU "
+                         "(default: 1)")
+    ap.add_argument("--json", action="store_true", help="print the ValidationResult as JSON")
+    ap.add_argument("--conformance", action="store_true",
+                    help="run the bcsv/conformance suite instead of validating a file")
+    args = ap.parse_args()
+
+    if args.conformance:
+        failures = run_conformance()
+        for f in failures:
+            print(f"✗ {f}")
+        if failures:
+            return 1
+        print("✓ validate_bcsv passes the bcsv conformance suite")
+        return 0
+    if args.metadata is None:
+        ap.error("a metadata path is required (or --conformance)")
+    if args.max_errors_per_code is not None and args.max_errors_per_code < 1:
+        ap.error("--max-errors-per-code must be at least 1")
+    if args.sample is not None and args.sample < 1:
+        ap.error("--sample must be at least 1")
+
+    cache = DigestCache(args.digest_cache) if args.digest_cache else None
+    result = validate_bcsv(args.metadata, args.data, check_schema=not args.no_schema,
+                           check_constraints=not args.no_constraints,
+                           on_violation=args.on_violation, chunk_size=args.chunk_size,
+                           digest_cache=cache, pk_memory=args.pk_memory << 20,
+                           max_errors_per_code=args.max_errors_per_code,
+                           sample=args.sample, sample_seed=args.seed,
+                           jobs=args.jobs or os.cpu_count() or 1)
+    if cache is not None:
+        cache.save()
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2, ensure_ascii=False))
+    else:
+        _print_result(str(args.metadata), result)
+    return 0 if result.valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Validate every bcsv CSV/metadata pair under a directory, on a process pool.
+
+Discovery walks the directory for metadata documents:
+
+  - a `*.json` that parses to an object with a `table_schema` is bcsv metadata; its
+    data file is its `url`, resolved against the metadata's directory;
+  - a `*.json` that does not parse is treated as (broken) metadata when its directory
+    holds a CSV, so it is reported as METADATA_INVALID_JSON rather than skipped (and
+    those CSVs count as claimed);
+  - every other JSON (e.g. a conformance fixture's expected.json) is ignored;
+  - a `*.csv` no metadata claims is reported as unpaired.
+
+Each pair is one `validate_bcsv` task (see validate_bcsv.py for the codes). Tasks are
+submitted largest data file first (`--schedule size`, the default), so one big table
+starts early instead of becoming the tail of the run. Per-file results are printed as
+they complete (`--stream-json`: one JSON line each); the combined report (`--report`)
+lists them in discovery order:
+
+  {"ok": false, "root": "release/",
+   "summary": {"files": 212, "valid": 211, "invalid": 1, "errors": 3, "warnings": 40,
+               "unpaired": 0, "sampled": 0, "seconds": 18.2},
+   "files": [{"metadata": "a/b.json", "data": "a/b.csv", "bytes": 123, "seconds": 0.4,
+              "valid": true, "errors": [], "warnings": [...]}, ...],
+   "unpaired": []}
+
+`--max-errors-per-code` and `--sample` apply to every pair as in validate_bcsv.py; a
+sampled file's entry carries `"sampled": true` and the summary counts them.
+
+`ok` is false, and the exit status 1, if any pair has an error or (unless
+`--allow-unpaired`) any CSV is unpaired.
+
+Usage:
+    python scripts/validate_bcsv_batch.py path/to/release --report report.json
+    python scripts/validate_bcsv_batch.py data/ --jobs 8 --digest-cache .bcsv-cache/digests.json
+    python scripts/validate_bcsv_batch.py bcsv/conformance --jobs 1 --stream-json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bcsv_integrity import DigestCache  # noqa: E402
+from validate_bcsv import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE, DEFAULT_PK_MEMORY, ON_VIOLATION, ValidationPlan, compile_plan, seed_plans,
+    validate_bcsv,
+)
+
+SCHEDULES = ("size", "discovery")
+
+
+def discover_pairs(root: Path) -> Tuple[List[Tuple[Path, Optional[Path]]], List[Path]]:
+    """([(metadata, data or None)], [unpaired CSVs]), both sorted by path.
+
+    `data` is None when the metadata names no `url` (or doesn't parse); validate_bcsv
+    then reports that itself.
+    """
+    pairs: List[Tuple[Path, Optional[Path]]] = []
+    csvs = sorted(root.rglob("*.csv"))
+    csv_dirs = {p.parent for p in csvs}
+    broken_dirs = set()
+    for path in sorted(root.rglob("*.json")):
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            if path.parent in csv_dirs:
+                pairs.append((path, None))
+                broken_dirs.add(path.parent)
+            continue
+        if not isinstance(meta, dict) or "table_schema" not in meta:
+            continue
+        url = meta.get("url")
+        pairs.append((path, path.parent / url if isinstance(url, str) else None))
+    claimed = {d.resolve() for _, d in pairs if d is not None}
+    unpaired = [p for p in csvs
+                if p.resolve() not in claimed and p.parent not in broken_dirs]
+    return pairs, unpaired
+
+
+def _size(path: Optional[Path]) -> int:
+    try:
+        return path.stat().st_size if path is not None else 0
+    except OSError:
+        return 0
+
+
+def _validate_task(metadata: Path, data: Optional[Path], options: Dict[str, Any],
+                   cache_path: Optional[Path]) -> Tuple[Dict[str, Any], float, Dict]:
+    """One pair, in a worker: (result dict, seconds, digest-cache entries it added)."""
+    cache = DigestCache(cache_path) if cache_path is not None else None
+    started = time.perf_counter()
+    result = validate_bcsv(metadata, data, digest_cache=cache, **options)
+    return (result.to_dict(), time.perf_counter() - started,
+            cache.new_entries() if cache is not None else {})
+
+
+def _layout_plans(pairs: List[Tuple[Path, Optional[Path]]],
+                  options: Dict[str, Any]) -> List[ValidationPlan]:
+    """One compiled plan per distinct metadata layout, to seed the workers with."""
+    plans: Dict[str, ValidationPlan] = {}
+    for metadata, _ in pairs:
+        try:
+            meta = json.loads(metadata.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        plan = compile_plan(meta, options.get("check_schema", True),
+                            options.get("check_constraints", True))
+        if plan.key is not None:
+            plans[plan.key] = plan
+    return list(plans.values())
+
+
+def _rel(path: Optional[Path], root: Path) -> Optional[str]:
+    if path is None:
+        return None
+    try:
+        return str(path.relative_to(root))
+    except ValueError:
+        return str(path)
+
+
+def validate_tree(root: Path, jobs: int = 1, schedule: str = "size",
+                  options: Optional[Dict[str, Any]] = None,
+                  digest_cache: Optional[DigestCache] = None,
+                  on_result=None, allow_unpaired: bool = False) -> Dict[str, Any]:
+    """Validate every pair under `root`; returns the combined report (module docstring).
+
+    `on_result(entry)` is called with each file's report entry as it completes. The
+    report is `ok` if no pair is invalid and, unless `allow_unpaired`, no CSV is unpaired.
+    """
+    options = options or {}
+    started = time.perf_counter()
+    pairs, unpaired = discover_pairs(root)
+    order = list(range(len(pairs)))
+    if schedule == "size":
+        order.sort(key=lambda i: _size(pairs[i][1]), reverse=True)
+    cache_path = digest_cache.path if digest_cache is not None else None
+    entries: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+
+    def finish(i: int, outcome: Tuple[Dict[str, Any], float, Dict]) -> None:
+        result, seconds, digests = outcome
+        if digest_cache is not None:
+            digest_cache.merge(digests)
+        metadata, data = pairs[i]
+        entries[i] = {"metadata": _rel(metadata, root), "data": _rel(data, root),
+                      "bytes": _size(data), "seconds": round(seconds, 3), **result}
+        if on_result is not None:
+            on_result(entries[i])
+
+    if jobs <= 1 or len(pairs) <= 1:
+        for i in order:
+            finish(i, _validate_task(*pairs[i], options, cache_path))
+    else:
+        # Shards usually share a few layouts: compile each once, not once per worker.
+        with ProcessPoolExecutor(max_workers=jobs, initializer=seed_plans,
+                                 initargs=(_layout_plans(pairs, options),)) as pool:
+            futures = {pool.submit(_validate_task, *pairs[i], options, cache_path): i
+                       for i in order}  # the executor starts tasks in submission order
+            for future in as_completed(futures):
+                finish(futures[future], future.result())
+
+    files = [e for e in entries if e is not None]
+    summary = {
+        "files": len(files),
+        "valid": sum(e["valid"] for e in files),
+        "invalid": sum(not e["valid"] for e in files),
+        "errors": sum(len(e["errors"]) for e in files),
+        "warnings": sum(len(e["warnings"]) for e in files),
+        "unpaired": len(unpaired),
+        "sampled": sum(e.get("sampled", False) for e in files),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    ok = summary["invalid"] == 0 and (allow_unpaired or not unpaired)
+    return {"ok": ok, "root": str(root), "summary": summary,
+            "files": files, "unpaired": [_rel(p, root) for p in unpaired]}
+
+
+def _print_entry(entry: Dict[str, Any]) -> None:
+    codes = Counter(i["code"] for i in entry["errors"] + entry["warnings"])
+    detail = ", ".join(f"{c}×{n}" if n > 1 else c for c, n in sorted(codes.items()))
+    mark = "✓" if entry["valid"] else "✗"
+    sampled = ", sampled" if entry.get("sampled") else ""
+    print(f"{mark} {entry['metadata']} ({entry['seconds']:.2f}s{sampled})"
+          + (f": {detail}" if detail else ""), flush=True)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", type=Path, help="directory to search for bcsv pairs")
+    ap.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                    help="worker processes; 0 = one per CPU (default: 0)")
+    ap.add_argument("--schedule", choices=SCHEDULES, default="size",
+                    help="task order: largest data file first (default) or discovery order")
+    ap.add_argument("--report", type=Path, metavar="REPORT.json",
+                    help="write the combined JSON report")
+    ap.add_argument("--stream-json", action="store_true",
+                    help="print each file's result as one JSON line as it completes")
+    ap.add_argument("--allow-unpaired", action="store_true",
+                    help="don't fail on CSVs that no metadata describes")
+    ap.add_argument("--no-schema", action="store_true", help="skip JSON Schema validation")
+    ap.add_argument("--no-constraints", action="store_true",
+                    help="skip constraint checks (levels/range/length/required/primary key)")
+    ap.add_argument("--on-violation", choices=ON_VIOLATION, default="warn",
+                    help="severity of row-level violations (default: warn)")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, metavar="BYTES",
+                    help=f"bytes per read of each data file (default: {DEFAULT_CHUNK_SIZE})")
+    ap.add_argument("--pk-memory", type=int, default=DEFAULT_PK_MEMORY >> 20, metavar="MIB",
+                    help="per-worker memory for the primary-key check before it spills "
+                         f"to disk (default: {DEFAULT_PK_MEMORY >> 20})")
+    ap.add_argument("--max-errors-per-code", type=int, metavar="N",
+                    help="per file, report at most N row-level issues per code and count the rest")
+    ap.add_argument("--sample", type=int, metavar="N",
+                    help="provisional check of each file: first/last N records and N at random")
+    ap.add_argument("--seed", type=int, default=0, help="random seed for --sample (default: 0)")
+    ap.add_argument("--digest-cache", type=Path, metavar="DIGESTS.json",
+                    help="reuse/record verified data-file digests (see bcsv_integrity.py)")
+    args = ap.parse_args()
+
+    if not args.root.is_dir():
+        ap.error(f"{args.root} is not a directory")
+    if args.max_errors_per_code is not None and args.max_errors_per_code < 1:
+        ap.error("--max-errors-per-code must be at least 1")
+    if args.sample is not None and args.sample < 1:
+        ap.error("--sample must be at least 1")
+    options = {"check_schema": not args.no_schema,
+               "check_constraints": not args.no_constraints,
+               "on_violation": args.on_violation, "chunk_size": args.chunk_size,
+               "pk_memory": args.pk_memory << 20,
+               "max_errors_per_code": args.max_errors_per_code,
+               "sample": args.sample, "sample_seed": args.seed}
+    cache = DigestCache(args.digest_cache) if args.digest_cache else None
+    emit = (lambda e: print(json.dumps(e, ensure_ascii=False), flush=True)) \
+        if args.stream_json else _print_entry
+    report = validate_tree(args.root, jobs=args.jobs or os.cpu_count() or 1,
+                           schedule=args.schedule, options=options, digest_cache=cache,
+                           on_result=emit, allow_unpaired=args.allow_unpaired)
+    if cache is not None:
+        cache.save()
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+    s = report["summary"]
+    failed = not report["ok"]
+    out = sys.stderr if args.stream_json else sys.stdout
+    for rel in report["unpaired"]:
+        print(f"✗ unpaired: {rel} (no metadata describes it)", file=out)
+    print(f"\n{'✗' if failed else '✓'} {s['files']} file(s): {s['valid']} valid, "
+          f"{s['invalid']} invalid, {s['errors']} error(s), {s['warnings']} warning(s), "
+          f"{s['unpaired']} unpaired"
+          + (f", {s['sampled']} sampled (provisional)" if s["sampled"] else "")
+          + f" ({s['seconds']:.2f}s)", file=out)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Validate the JSON-Schema-based schemas and their bundled examples.
 
-Four check families, all run by CI (validate-schemas.yml):
+Seven check families, all run by CI (validate-schemas.yml):
 
 1. Schemas + examples — assert every `schema.json` is a well-formed schema (draft
    chosen from its `$schema`), then validate every `examples/*.json` against it
@@ -19,18 +19,80 @@ Four check families, all run by CI (validate-schemas.yml):
 4. LinkML enum consistency — on every enum-ranged slot in */schema.linkml.yaml, the
    slot's examples and `ifabsent: string(...)` default must be permissible values
    (the metamodel lint does not enforce either).
+5. bcsv reference validator — scripts/validate_bcsv.py, run on every conformance
+   fixture (with its `validate_with` toggles), must produce exactly the (code,
+   location) pairs and `valid` flag in the fixture's expected.json.
+6. Event streams — every line of `event/examples/*.ndjson[.gz]` must validate against
+   the `Event` definition in event/schema.json. Events are checked by code compiled
+   from the definition (scripts/schema_fastpath.py), so that must agree with
+   jsonschema on every event example and on each one-value mutation of it.
+7. Tools — each bcsv/event tool under scripts/ is run on small generated inputs
+   (seeded, so a failure reproduces) and compared with a plain reference:
+   - bcsv_coerce: the column engine (fast path on and off) against the cell-by-cell
+     `coerce_rowwise`, on random chunks of valid and near-valid cells.
+   - validate_bcsv_batch: the conformance fixtures plus an orphan CSV, on a process
+     pool, against validate_bcsv run on each pair directly.
+   - bcsv_arrow (needs pyarrow): the bcsv examples and a random table of every datatype
+     through Parquet and Arrow IPC and back; the result must validate and hold the
+     same typed values, and a column mixing naive and offset datetimes is refused.
+   - bcsv_keys: duplicate primary keys on random tables, single and composite, with
+     budgets small enough to force spills and multi-pass merges, against a dict.
+   - validate_bcsv plans: every fixture under every option combination gives the same
+     result with a cold plan cache, a cache hit, and plans pickled into a fresh cache.
+   - bcsv_parse: byte ranges of a table with quoted multi-line cells, cut anywhere
+     from every byte to 4 KiB, parse (on process and thread pools) into exactly the
+     records one csv.reader gives, in UTF-8 with a BOM and in single-byte encodings.
+   - validate_bcsv jobs: a broken random table keeps the same issues serially and on a
+     pool (byte ranges cut mid-batch), with and without `max_errors_per_code`, whose
+     counts stay within the uncapped ones and which stops reading when it can; and
+     `sample` finds no issue in a valid table full of quoted multi-line cells.
+   - bcsv_profile: the metadata profiled from the random table, the examples and the
+     positive fixtures' data is schema-valid, validates its CSV (also `;`-delimited
+     latin-1), infers the random table's datatypes, and estimates distinct counts.
+   - derive_trials: the cognitive example and a seeded multi-session stream (NDJSON
+     with mixed escaping, and as an EventBatch) give bcsv tables that validate, with
+     the same rows whether derived serially or on two processes.
+   - event_store: that stream plus 150 verbs outside the enum, appended in two runs,
+     answers session / verb / time-range queries as a plain filter of the events does,
+     reading only the queried partition's files (and, for a time range, row groups); a
+     failed or killed append adds nothing.
+   - event_index: plain and multi-member gzip NDJSON, indexed as they grow (a half-written
+     last line included), give the same lookups as a fresh build and a plain filter.
+   - event_batch: EventBatch documents, plain and gzipped, read back event for event
+     at any read chunk size, and survive to-ndjson, split and merge unchanged; a
+     syntax error early in a large batch is reported without reading the rest.
+   - event_compact: an EventTable of that stream, with values that push columns off their
+     first kind, rebuilds every event exactly and answers column / where lookups as
+     plain dicts do.
 
 Exit non-zero listing every problem found. studyflow has no schema.json (LinkML,
-consumed directly) so only checks 4 covers it.
+consumed directly) so only check 4 covers it.
 
-Usage:  python scripts/validate_schemas.py
+Given NDJSON files, only those are checked (check 6), which is how production event
+dumps are validated. A stream is read line by line (`.gz` decompressed on the fly),
+never loaded whole; blocks of `--block-lines` lines go to `--jobs` worker processes
+and come back in order, and each error names its line and the JSON path of the
+offending value. Checking stops after `--max-errors` errors.
+
+Usage:
+    python scripts/validate_schemas.py
+    python scripts/validate_schemas.py dumps/2026-06-05.ndjson.gz --jobs 8 --max-errors 50
 """
 from __future__ import annotations
 
-import hashlib
+import argparse
+import csv
+import gzip
+import io
 import json
+import os
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
 
 import jsonschema
@@ -38,6 +100,9 @@ import jsonschema
 ROOT = Path(__file__).resolve().parent.parent
 SCHEMAS = ["bcsv", "catalog", "dataset", "trial", "event", "timeseries"]
 CONTEXT_SCHEMAS = ["bcsv", "catalog", "dataset", "event"]  # trial ships no context.jsonld
+EVENT_SCHEMA = ROOT / "event" / "schema.json"
+EVENT_BLOCK_LINES = 5000  # lines per task when validating an event stream
+DEFAULT_MAX_ERRORS = 100
 
 
 def _validator_cls(schema: dict):
@@ -52,6 +117,8 @@ def _validator_cls(schema: dict):
 
 def check_bcsv_conformance(failures: list[str]) -> None:
     """Assert the conformance fixtures agree with bcsv/schema.json and their own expected.json."""
+    from bcsv_integrity import file_sha256
+
     schema = json.loads((ROOT / "bcsv" / "schema.json").read_text())
     validator = _validator_cls(schema)(schema)
     conf = ROOT / "bcsv" / "conformance"
@@ -93,7 +160,7 @@ def check_bcsv_conformance(failures: list[str]) -> None:
         # file_hash integrity: must match data.csv unless the fixture tests a mismatch.
         data_path = fixture / "data.csv"
         if "file_hash" in meta and data_path.exists():
-            actual = hashlib.sha256(data_path.read_bytes()).hexdigest()
+            actual = file_sha256(data_path)
             if "HASH_MISMATCH" in codes:
                 if meta["file_hash"] == actual:
                     failures.append(f"{rel}: HASH_MISMATCH fixture's file_hash matches data.csv")
@@ -101,6 +168,950 @@ def check_bcsv_conformance(failures: list[str]) -> None:
                 failures.append(f"{rel}: file_hash does not match sha256(data.csv)")
 
 
+def check_bcsv_validator(failures: list[str]) -> None:
+    """The streaming reference validator reproduces every fixture's expected.json."""
+    from validate_bcsv import run_conformance
+
+    failures.extend(f"bcsv/conformance/{f}" for f in run_conformance())
+
+
+# Cells near each datatype's edge: valid forms first, then ones a careless check accepts.
+_COERCE_CELLS = {
+    "integer": ["0", "-5", "12", "-9223372036854775808", "+5", "9223372036854775808",
+                "99999999999999999999", "1.0", " 1", "0x10", "٣", "x"],
+    "number": ["0", "1.5", "-0.0", ".5", "1e5", "NaN", "-INF", "5.", "+1", "nan", "1e999",
+               "0x10", "x"],
+    "boolean": ["true", "false", "1", "0", "TRUE", "False", "yes", "tRUE"],
+    "date": ["2026-01-31", "2024-02-29", "2000-02-29", "2026-01-01Z", "2026-01-01+05:00",
+             "1900-02-29", "0000-01-01", "2026-13-01", "2026-04-31", "2026-1-01"],
+    "datetime": ["2026-01-01T10:00:00Z", "2024-02-29T00:00:00", "2026-01-01T23:59:59+23:59",
+                 "2026-01-01T10:00:00.1234567", "2026-01-01T10:00:00+05:60",
+                 "2026-01-01T10:00:00+24:00", "2026-01-01T24:00:00", "2026-01-01T10:60:00",
+                 "2023-02-29T00:00:00", "2026-01-01 10:00:00"],
+    "time": ["10:00:00", "23:59:59.999", "10:00:00Z", "10:00:00+05:30", "24:00:00",
+             "10:00:00+24:00", "9:00:00"],
+    "categorical": ["a", "b", "1", "1.0", "c", "B"],
+    "string": ["", "a", "abc", "abcdef", "é"],
+}
+
+
+def _same_values(a, b) -> bool:
+    """Typed value lists are equal, NaN matching NaN and 1, 1.0 and True all distinct."""
+    if a is None or b is None:
+        return a is b
+    return len(a) == len(b) and all(
+        type(x) is type(y) and (x == y or x != x and y != y) for x, y in zip(a, b))
+
+
+def check_bcsv_coerce(failures: list[str], trials: int = 400) -> None:
+    """The column engine (fast path on and off) agrees with `coerce_rowwise` on random chunks."""
+    import random
+
+    import bcsv_coerce
+    from bcsv_coerce import ColumnSpec, coerce_column, coerce_rowwise
+
+    rng = random.Random(0)
+    fast_path = bcsv_coerce.FAST_PATH
+    try:
+        for _ in range(trials):
+            datatype = rng.choice(list(_COERCE_CELLS))
+            col = {"name": "c", "datatype": datatype, "null": rng.choice([[""], ["", "NA"]]),
+                   "required": rng.random() < 0.3}
+            if datatype in ("integer", "number") and rng.random() < 0.6:
+                col["minimum"], col["maximum"] = rng.choice(
+                    [(-1, 100), (0, None), (None, 10**20), (-1e9, 1e9)])
+            elif datatype == "categorical":
+                col["levels"] = ["a", "b", 1]
+            elif datatype == "string":
+                col["min_length"], col["max_length"] = 1, 3
+            spec = ColumnSpec.from_column(col)
+            pool = _COERCE_CELLS[datatype] + ["", "NA"]
+            if rng.random() < 0.6:
+                pool = pool[:4]  # mostly all-valid chunks: the fast path's case
+            cells = [rng.choice(pool) for _ in range(rng.choice([1, 2, 7, 60]))]
+            want = coerce_rowwise(spec, cells)
+            for fast in ((False, True) if fast_path else (False,)):
+                bcsv_coerce.FAST_PATH = fast
+                for values in (True, False):
+                    got = coerce_column(spec, cells, values=values)
+                    if ({k: bytes(v) for k, v in got.masks.items()}
+                            != {k: bytes(v) for k, v in want.masks.items()}
+                            or values and not _same_values(got.values, want.values)):
+                        failures.append(f"bcsv_coerce: coerce_column ({datatype}, fast path "
+                                        f"{'on' if fast else 'off'}) disagrees with "
+                                        f"coerce_rowwise on {cells[:10]}")
+                        return
+    finally:
+        bcsv_coerce.FAST_PATH = fast_path
+
+
+def check_bcsv_batch(failures: list[str]) -> None:
+    """validate_bcsv_batch, on a pool, reports what validate_bcsv does pair by pair."""
+    import shutil
+    import tempfile
+
+    from validate_bcsv import validate_bcsv
+    from validate_bcsv_batch import discover_pairs, validate_tree
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        shutil.copytree(ROOT / "bcsv" / "conformance", root / "conformance")
+        (root / "orphan.csv").write_text("a\n1\n")
+        report = validate_tree(root, jobs=2)
+        pairs, _ = discover_pairs(root)
+        if report["unpaired"] != ["orphan.csv"]:
+            failures.append(f"validate_bcsv_batch: unpaired {report['unpaired']}, "
+                            f"expected ['orphan.csv']")
+        if len(report["files"]) != len(pairs):
+            failures.append(f"validate_bcsv_batch: {len(report['files'])} file(s) reported "
+                            f"for {len(pairs)} pair(s)")
+        for entry, (metadata, data) in zip(report["files"], pairs):
+            want = validate_bcsv(metadata, data).to_dict()
+            got = {k: entry[k] for k in want}
+            if got != want:
+                failures.append(f"validate_bcsv_batch: {entry['metadata']}: {got}, "
+                                f"validate_bcsv gives {want}")
+        if report["ok"]:
+            failures.append("validate_bcsv_batch: ok=true with invalid pairs and an unpaired CSV")
+
+        # only valid pairs: `ok` then turns on the unpaired CSV alone, as the exit status does
+        shutil.rmtree(root / "conformance")
+        for example in (ROOT / "bcsv" / "examples").glob("*.json"):
+            shutil.copy(example, root / example.name)
+            shutil.copy(example.with_suffix(".csv"), root / example.with_suffix(".csv").name)
+        for allow in (False, True):
+            report = validate_tree(root, allow_unpaired=allow)
+            if not all(entry["valid"] for entry in report["files"]) or report["ok"] != allow:
+                failures.append(f"validate_bcsv_batch: ok={report['ok']} for valid pairs and "
+                                f"an unpaired CSV with allow_unpaired={allow}")
+
+
+def _random_table(rng, rows: int) -> tuple[dict, str]:
+    """(metadata without url/file_hash, CSV text) of a table with one column per datatype."""
+    levels = ["low", "mid", "high"]
+    columns = [
+        {"name": "id", "datatype": "integer"},
+        {"name": "text", "datatype": "string", "description": "quoted, multi-line, unicode"},
+        {"name": "x", "datatype": "number", "unit": "ms", "null": ["", "NA"]},
+        {"name": "ok", "datatype": "boolean"},
+        {"name": "day", "datatype": "date"},
+        {"name": "at", "datatype": "datetime"},
+        {"name": "at_utc", "datatype": "datetime"},
+        {"name": "clock", "datatype": "time"},
+        {"name": "group", "datatype": "categorical", "levels": ["a", "b", 7]},
+        {"name": "level", "datatype": "ordered", "levels": levels, "label": "Level"},
+    ]
+
+    def cell(name: str, i: int) -> str:
+        if name != "id" and rng.random() < 0.1:
+            return "NA" if name == "x" and rng.random() < 0.5 else ""
+        day = f"20{rng.randrange(10, 30)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+        clock = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        return {
+            "id": lambda: str(i),
+            "text": lambda: rng.choice(["plain", 'say "hi"', "a,b", "two\nlines", "é ü",
+                                        " padded "]),
+            "x": lambda: rng.choice([str(rng.uniform(-1e6, 1e6)), str(rng.randrange(100)),
+                                     "1e-300", "-0.0", "INF"]),
+            "ok": lambda: rng.choice(["true", "false", "1", "0", "TRUE"]),
+            "day": lambda: day,
+            "at": lambda: f"{day}T{clock}" + rng.choice(["", ".5", ".123456"]),
+            "at_utc": lambda: f"{day}T{clock}" + rng.choice(["Z", "+02:00", "-05:30"]),
+            "clock": lambda: clock,
+            "group": lambda: rng.choice(["a", "b", "7"]),
+            "level": lambda: rng.choice(levels),
+        }[name]()
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow([c["name"] for c in columns])
+    writer.writerows([cell(c["name"], i) for c in columns] for i in range(rows))
+    meta = {"@context": "https://behaverse.org/schemas/bcsv/context.jsonld",
+            "@type": "csvw:Table", "name": "random-table",
+            "description": "Seeded random table covering every bcsv datatype.",
+            "table_schema": {"columns": columns, "primary_key": "id"}}
+    return meta, out.getvalue()
+
+
+def _typed_columns(metadata_path: Path) -> dict:
+    """{column name: typed values} of a bcsv table, read through the coercion engine."""
+    from bcsv_coerce import ColumnSpec, coerce_column
+
+    meta = json.loads(metadata_path.read_text(encoding="utf-8"))
+    with open(metadata_path.parent / meta["url"], newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+    cells = dict(zip(header, zip(*rows))) if rows else {name: () for name in header}
+    return {c["name"]: coerce_column(ColumnSpec.from_column(c), cells[c["name"]]).values
+            for c in meta["table_schema"]["columns"]}
+
+
+def check_bcsv_arrow(failures: list[str]) -> None:
+    """bcsv -> Parquet / Arrow IPC -> bcsv keeps every typed value and validates."""
+    import random
+    import shutil
+    import tempfile
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("  (pyarrow not installed: bcsv_arrow round trips skipped)")
+        return
+    from bcsv_arrow import ConversionError, to_arrow, to_bcsv
+    from bcsv_integrity import file_sha256
+    from validate_bcsv import validate_bcsv
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for example in sorted((ROOT / "bcsv" / "examples").glob("*.json")):
+            shutil.copy(example, tmp / example.name)
+            shutil.copy(example.with_suffix(".csv"), tmp / example.with_suffix(".csv").name)
+        meta, text = _random_table(rng, 200)
+        (tmp / "random.csv").write_text(text, encoding="utf-8")
+        meta.update(url="random.csv", file_hash=file_sha256(tmp / "random.csv"))
+        (tmp / "random.json").write_text(json.dumps(meta))
+
+        for source in sorted(tmp.glob("*.json")):
+            want = _typed_columns(source)
+            for suffix, rows in ((".parquet", 7), (".arrow", 64)):
+                name = f"{source.stem}{suffix}"
+                back = tmp / "back" / f"{source.stem}-{suffix[1:]}.json"
+                back.parent.mkdir(exist_ok=True)
+                try:
+                    to_arrow(source, tmp / name, row_group_rows=rows)
+                    to_bcsv(tmp / name, back, batch_rows=rows)
+                except ConversionError as e:
+                    failures.append(f"bcsv_arrow: {source.name} via {suffix}: {e}")
+                    continue
+                result = validate_bcsv(back)
+                if not result.valid:
+                    failures.append(f"bcsv_arrow: {source.name} via {suffix} no longer "
+                                    f"validates: {[i.code for i in result.errors]}")
+                got = _typed_columns(back)
+                for column, values in want.items():
+                    if not _same_values(got.get(column), values):
+                        failures.append(f"bcsv_arrow: {source.name} via {suffix}: column "
+                                        f"{column!r} changed in the round trip")
+
+        (tmp / "mixed.csv").write_text("at\n2026-01-01T00:00:00Z\n2026-01-01T00:00:00\n")
+        (tmp / "mixed.json").write_text(json.dumps({
+            "url": "mixed.csv", "table_schema": {"columns": [{"name": "at", "datatype": "datetime"}]}}))
+        try:
+            to_arrow(tmp / "mixed.json", tmp / "mixed.parquet")
+            failures.append("bcsv_arrow: converted a column mixing naive and offset datetimes")
+        except ConversionError:
+            pass
+
+
+def check_bcsv_keys(failures: list[str], trials: int = 60) -> None:
+    """DuplicateKeyDetector, in memory and spilled, matches a dict of every key."""
+    import random
+
+    from bcsv_keys import ENTRY_BYTES, DuplicateKeyDetector
+
+    rng = random.Random(0)
+    multipass = 0
+    for trial in range(trials):
+        rows, width = rng.choice([0, 1, 50, 400, 1500]), rng.choice([1, 1, 2, 3])
+        distinct = max(1, int(rows * rng.choice([0.1, 0.7, 1.0, 2.0])))
+        columns = [[str(rng.randrange(distinct)) for _ in range(rows)] for _ in range(width)]
+        # 4..64 entries per run and a fan-in of 2, or everything in memory
+        memory = rng.choice([ENTRY_BYTES * 4, ENTRY_BYTES * 64, 64 << 20])
+
+        first: dict = {}
+        repeats = []
+        for row, key in enumerate(zip(*columns), 1):
+            if first.setdefault(key, row) != row:
+                repeats.append((row, first[key]))
+        want = (len(repeats), sorted(repeats)[:5])
+
+        detector = DuplicateKeyDetector(memory, max_examples=5)
+        row = 1
+        while row <= rows:
+            size = rng.randrange(1, 200)
+            detector.add([c[row - 1:row - 1 + size] for c in columns], row)
+            row += size
+        multipass += len(detector._runs) + bool(detector._seen) > detector.fan_in
+        found = detector.finish()
+        if (found.count, found.examples) != want:
+            failures.append(f"bcsv_keys: trial {trial} ({rows} rows, {width} column(s), "
+                            f"{memory} bytes): {found.count} duplicate(s) {found.examples}, "
+                            f"expected {want[0]} {want[1]}")
+            return
+    if not multipass:
+        failures.append("bcsv_keys: no trial spilled enough runs for a multi-pass merge")
+
+
+def check_validation_plans(failures: list[str]) -> None:
+    """A cached or pickled-and-seeded plan validates exactly like a fresh compile."""
+    import pickle
+
+    import validate_bcsv
+    from validate_bcsv import seed_plans
+
+    conf = ROOT / "bcsv" / "conformance"
+    variants = 0
+    for fixture in sorted(p for kind in ("positive", "negative") for p in (conf / kind).iterdir()
+                          if (p / "metadata.json").exists()):
+        for check_schema in (True, False):
+            for check_constraints in (True, False):
+                run = partial(validate_bcsv.validate_bcsv, fixture / "metadata.json",
+                              check_schema=check_schema, check_constraints=check_constraints)
+                validate_bcsv._PLANS.clear()
+                cold, hit = run().to_dict(), run().to_dict()
+                plans = pickle.loads(pickle.dumps(list(validate_bcsv._PLANS.values())))
+                validate_bcsv._PLANS.clear()
+                seed_plans(plans)
+                seeded = run().to_dict()
+                variants += 1
+                if not cold == hit == seeded:
+                    failures.append(f"validate_bcsv plans: {fixture.relative_to(ROOT)} "
+                                    f"(check_schema={check_schema}, check_constraints="
+                                    f"{check_constraints}) differs between a fresh, a cached "
+                                    f"and a seeded plan")
+    validate_bcsv._PLANS.clear()
+    print(f"✓ validation plans agree fresh, cached and seeded on {variants} variant(s)")
+
+
+def _broken_table(root: Path, rows: int = 3000) -> Path:
+    """A bcsv table (metadata path) with every row-level code, quoted multi-line cells
+    and duplicate keys, seeded."""
+    import random
+
+    rng = random.Random(0)
+    lines = ["id,a,b,note,group"]
+    for _ in range(rows):
+        lines.append(",".join([str(rng.randrange(rows * 5 // 6)), rng.choice(["1", "x", "-2"]),
+                               rng.choice(["1", "y", "300", ""]),
+                               rng.choice(["", "z", '"two,\nlines"', '"say ""hi"""']),
+                               rng.choice(["a", "b", "k"])]))
+    (root / "broken.csv").write_text("\n".join(lines) + "\n")
+    (root / "broken.json").write_text(json.dumps({
+        "@context": "https://behaverse.org/schemas/bcsv/context.jsonld",
+        "@type": "csvw:Table", "name": "broken", "description": "Seeded broken table.",
+        "url": "broken.csv", "table_schema": {"primary_key": "id", "columns": [
+            {"name": "id", "datatype": "integer"},
+            {"name": "a", "datatype": "integer"},
+            {"name": "b", "datatype": "integer", "required": True, "maximum": 100},
+            {"name": "note", "datatype": "string", "max_length": 1},
+            {"name": "group", "datatype": "categorical", "levels": ["a", "b"]}]}}))
+    return root / "broken.json"
+
+
+def check_bcsv_parse(failures: list[str]) -> None:
+    """Records parsed range by range, in parallel, are the records of one serial parse."""
+    import random
+    import tempfile
+
+    from bcsv_parse import map_chunks, read_header, split_records, splittable
+
+    _, text = _random_table(random.Random(3), 300)
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in ("utf-8-sig", "latin-1", "cp1252"):
+            path = Path(tmp) / f"{codec}.csv"
+            path.write_bytes(text.encode(codec, errors="replace"))
+            header, *want = list(csv.reader(io.StringIO(
+                path.read_bytes().decode(codec), newline="")))
+            got_header, data_start = read_header(path, codec=codec)
+            if got_header != header:
+                failures.append(f"bcsv_parse ({codec}): header {got_header}, expected {header}")
+            for chunk_bytes, pool in ((1, "thread"), (97, "process"), (4096, "thread")):
+                ranges = split_records(path, data_start, chunk_bytes)
+                if [a for a, _ in ranges] != [data_start, *(b for _, b in ranges[:-1])] \
+                        or ranges[-1][1] != path.stat().st_size:
+                    failures.append(f"bcsv_parse ({codec}, {chunk_bytes} B): ranges "
+                                    f"don't tile the data")
+                    continue
+                got = [r for records in map_chunks(list, path, ranges, codec=codec, jobs=2,
+                                                   pool=pool) for r in records]
+                if got != want:
+                    failures.append(f"bcsv_parse ({codec}, {chunk_bytes} B, {pool} pool): "
+                                    f"{len(got)} record(s) differ from a serial parse "
+                                    f"({len(want)})")
+    if splittable("utf-16") or not splittable("utf-8-sig"):
+        failures.append("bcsv_parse: splittable() is wrong about utf-16 / utf-8")
+
+
+def check_bcsv_jobs(failures: list[str]) -> None:
+    """validate_bcsv keeps the same issues with jobs=1 and jobs>1, capped or not, and a
+    cap stops the reading early with lower-bound counts."""
+    import itertools
+    import tempfile
+    from collections import Counter
+
+    import validate_bcsv
+
+    def capped(issues, cap):  # the first `cap` of each code, in order
+        kept, seen = [], Counter()
+        for issue in issues:
+            seen[issue.code] += 1
+            if seen[issue.code] <= cap:
+                kept.append(issue)
+        return kept
+
+    chunk_bytes, batch_rows = validate_bcsv.DEFAULT_CHUNK_BYTES, validate_bcsv.DEFAULT_BATCH_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        metadata = _broken_table(Path(tmp))
+        meta = json.loads(metadata.read_text())
+        del meta["table_schema"]["primary_key"]
+        loose = Path(tmp) / "loose.json"  # no key to read to the end for
+        loose.write_text(json.dumps(meta))
+        validate_bcsv.DEFAULT_CHUNK_BYTES = 2000  # ~100 records per range, not per batch
+        validate_bcsv.DEFAULT_BATCH_ROWS = 40  # several batches per range (workers only)
+        try:
+            for table in (metadata, loose):
+                full = validate_bcsv.validate_bcsv(table)
+                if not full.warnings:
+                    failures.append(f"validate_bcsv: {table.name} validated cleanly")
+                totals = Counter(i.code for i in full.warnings)
+                for cap, jobs in itertools.product((1, 7, 500), (1, 2)):
+                    got = validate_bcsv.validate_bcsv(table, max_errors_per_code=cap, jobs=jobs)
+                    where = f"validate_bcsv ({table.name}, cap {cap}, jobs={jobs})"
+                    if got.warnings != capped(full.warnings, cap) or got.errors != full.errors:
+                        failures.append(f"{where}: kept other issues than the first {cap} "
+                                        f"of each code")
+                    past = {code: n - cap for code, n in totals.items() if n > cap}
+                    if got.suppressed_exact and got.suppressed != past or any(
+                            n > past.get(code, 0) for code, n in got.suppressed.items()):
+                        failures.append(f"{where}: suppressed {got.suppressed}, but "
+                                        f"{past} are past the cap"
+                                        + ("" if got.suppressed_exact else " (at most)"))
+                    if table == loose and cap == 1 and jobs > 1 and got.suppressed_exact:
+                        failures.append(f"{where}: capped columns were checked to the end")
+
+            with open(metadata.with_suffix(".csv"), newline="") as f:
+                header, *records = csv.reader(f)
+            report = validate_bcsv._Report("warn", 1)
+            reader = iter(records)
+            validate_bcsv._scan_rows(reader, header, validate_bcsv.compile_plan(meta), report,
+                                     batch_rows=40)
+            if next(reader, None) is None:
+                failures.append("validate_bcsv: a capped scan with nothing left to report "
+                                "read every record")
+        finally:
+            validate_bcsv.DEFAULT_CHUNK_BYTES = chunk_bytes
+            validate_bcsv.DEFAULT_BATCH_ROWS = batch_rows
+
+
+def check_bcsv_sample(failures: list[str]) -> None:
+    """Sampling a valid table resyncs on record starts, never inside quoted newlines."""
+    import random
+    import tempfile
+
+    import validate_bcsv
+
+    full_scan = validate_bcsv.SAMPLE_FULL_SCAN_BYTES
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        meta, text = _random_table(random.Random(1), 3000)
+        (tmp / "random.csv").write_text(text, encoding="utf-8")
+        (tmp / "random.json").write_text(json.dumps({**meta, "url": "random.csv"}))
+        validate_bcsv.SAMPLE_FULL_SCAN_BYTES = 1000  # sample, don't read it all
+        try:
+            for seed in range(5):
+                result = validate_bcsv.validate_bcsv(tmp / "random.json", sample=40,
+                                                     sample_seed=seed)
+                issues = [i for i in result.errors + result.warnings if i.code != "HASH_ABSENT"]
+                if not result.sampled or issues:
+                    failures.append(f"validate_bcsv: sampling a valid table (seed {seed}) "
+                                    f"gave {[i.message for i in issues][:3]}"
+                                    + ("" if result.sampled else ", and read it all"))
+        finally:
+            validate_bcsv.SAMPLE_FULL_SCAN_BYTES = full_scan
+
+
+def check_bcsv_profile(failures: list[str]) -> None:
+    """Profiled metadata is schema-valid, validates its own CSV and gets datatypes right."""
+    import random
+    import shutil
+    import tempfile
+
+    from bcsv_profile import DistinctSketch, metadata_for, profile_csv
+    from validate_bcsv import validate_bcsv
+
+    expected = {"id": "integer", "x": "number", "ok": "boolean", "day": "date",
+                "at": "datetime", "at_utc": "datetime", "clock": "time",
+                "group": "categorical", "level": "categorical"}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _, text = _random_table(random.Random(2), 500)
+        (tmp / "random.csv").write_text(text, encoding="utf-8")
+        (tmp / "latin.csv").write_text(text.replace(",", ";").replace("é", "è"),
+                                       encoding="latin-1")
+        for csv_path in [*sorted((ROOT / "bcsv" / "examples").glob("*.csv")),
+                         *sorted((ROOT / "bcsv" / "conformance" / "positive").glob("*/data.csv"))]:
+            shutil.copy(csv_path, tmp / f"{csv_path.parent.name}-{csv_path.name}")
+        for csv_path in sorted(tmp.glob("*.csv")):
+            latin = csv_path.name == "latin.csv"
+            profile = profile_csv(csv_path, delimiter=";" if latin else ",",
+                                  encoding="latin-1" if latin else "utf-8")
+            metadata = csv_path.with_suffix(".json")
+            meta = metadata_for(profile, csv_path, metadata)
+            metadata.write_text(json.dumps(meta))
+            result = validate_bcsv(metadata)
+            if not result.valid or result.warnings:
+                issues = [f"{i.code}: {i.message}" for i in result.errors + result.warnings]
+                failures.append(f"bcsv_profile: {csv_path.name} doesn't validate against "
+                                f"its profile: {issues[:3]}")
+            if csv_path.stem in ("random", "latin"):
+                got = {c["name"]: c["datatype"] for c in meta["table_schema"]["columns"]}
+                wrong = {k: got.get(k) for k, v in expected.items() if got.get(k) != v}
+                if wrong:
+                    failures.append(f"bcsv_profile: {csv_path.name}: inferred {wrong}, "
+                                    f"expected {({k: expected[k] for k in wrong})}")
+
+    sketch = DistinctSketch()
+    for start in range(0, 20000, 1000):  # 10000 distinct values, each seen twice
+        sketch.update(str(i % 10000) for i in range(start, start + 1000))
+    if not 8000 <= sketch.estimate() <= 12000:
+        failures.append(f"bcsv_profile: DistinctSketch estimates {sketch.estimate()} "
+                        f"distinct values for 10000")
+
+
+def _trial_events(rng, sessions: int = 4, trials: int = 6) -> list[dict]:
+    """Seeded event stream: sessions of trials (start, stimuli, key presses, end),
+    interleaved, plus events outside any trial. Session ids include non-ASCII ones."""
+    names = ["s-1", "séance-2", "日本-3", "s 4", "s\"5"][:sessions]
+    streams = []
+    for s, session in enumerate(names):
+        events, t = [], 0
+        for trial in range(1, trials + 1):
+            context = {"extensions": {"bdm:session_id": session, "bdm:trial_index": str(trial)}}
+
+            def event(verb: str, actor: str, obj: dict, result: dict | None = None) -> None:
+                nonlocal t
+                t += rng.randrange(20, 400)
+                ev = {"timestamp": f"2026-06-0{s + 1}T10:{t // 60000 % 60:02d}:"
+                                   f"{t // 1000 % 60:02d}.{t % 1000:03d}Z",
+                      "actor": {"objectType": actor, "id": "agent_1" if actor == "bdm:Agent"
+                                else "engine"},
+                      "verb": verb, "object": obj, "context": context}
+                if result:
+                    ev["result"] = {"extensions": result}
+                events.append(ev)
+
+            event("bdm:trial_started", "bdm:Engine", {"objectType": "bdm:Trial", "id": "trial"})
+            for k in range(rng.randrange(1, 3)):
+                event("bdm:presented", "bdm:Engine", {"objectType": "bdm:Stimulus", "id": f"stim{k}"})
+            for _ in range(rng.randrange(0, 3)):
+                key = rng.choice("asdf")
+                event("bdm:key_pressed", "bdm:Agent", {"objectType": "bdm:UIComponent", "id": "kb"},
+                      {"bdm:key": key})
+                event("bdm:key_released", "bdm:Agent", {"objectType": "bdm:UIComponent", "id": "kb"},
+                      {"bdm:key": key})
+            event("bdm:trial_ended", "bdm:Engine", {"objectType": "bdm:Trial", "id": "trial"},
+                  {"bdm:response_time": rng.randrange(100, 900) / 1000,
+                   "bdm:correct": rng.random() < 0.7})
+        streams.append(events)
+    merged = []
+    while any(streams):  # interleave sessions, each in its own order
+        merged.append(rng.choice([st for st in streams if st]).pop(0))
+        if rng.random() < 0.02:
+            merged.append({"timestamp": "2026-06-01T09:00:00.000Z",
+                           "actor": {"objectType": "bdm:Engine", "id": "engine"},
+                           "verb": "bdm:navigated",
+                           "object": {"objectType": "bdm:Screen", "id": "home"}})
+    return merged
+
+
+def _write_ndjson(path: Path, events: list[dict], rng) -> None:
+    """NDJSON, escaping non-ASCII on some lines only, as mixed producers would."""
+    with (gzip.open(path, "wt", encoding="utf-8") if path.suffix == ".gz"
+          else open(path, "w", encoding="utf-8")) as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=rng.random() < 0.5) + "\n")
+
+
+def _table_rows(out_dir: Path, table: str) -> list[str]:
+    return sorted((out_dir / f"{table}.csv").read_text(encoding="utf-8").splitlines()[1:])
+
+
+def check_derive_trials(failures: list[str]) -> None:
+    """Derived trial tables validate and don't depend on --jobs or the input format."""
+    import random
+    import tempfile
+
+    from derive_trials import TABLES, derive_trials
+    from validate_bcsv import validate_bcsv
+
+    rng = random.Random(4)
+    events = _trial_events(rng)
+    for i in rng.sample(range(len(events)), 30):  # another session id, ahead of the context's
+        events[i] = {"result": {"extensions": {"bdm:session_id": "decoy"}}, **events[i]}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _write_ndjson(tmp / "events.ndjson.gz", events, rng)
+        (tmp / "batch.json").write_text(json.dumps({"batch_id": "b", "events": events}))
+        runs = {
+            "example": ([ROOT / "event" / "examples" / "cognitive_event_stream.json"], 1),
+            "ndjson": ([tmp / "events.ndjson.gz"], 1),
+            "ndjson, 2 jobs": ([tmp / "events.ndjson.gz"], 2),
+            "batch, 2 jobs": ([tmp / "batch.json"], 2),
+        }
+        for label, (inputs, jobs) in runs.items():
+            out = tmp / label
+            stats = derive_trials(inputs, out, jobs=jobs)
+            if label != "example" and stats["trials"] != 4 * 6:
+                failures.append(f"derive_trials ({label}): {stats['trials']} trial(s), "
+                                f"expected 24")
+            for table in TABLES:
+                result = validate_bcsv(out / f"{table}.json")
+                if not result.valid or result.warnings:
+                    failures.append(f"derive_trials ({label}): {table} doesn't validate: "
+                                    f"{[i.code for i in result.errors + result.warnings]}")
+        for label in ("ndjson, 2 jobs", "batch, 2 jobs"):
+            for table in TABLES:
+                if _table_rows(tmp / label, table) != _table_rows(tmp / "ndjson", table):
+                    failures.append(f"derive_trials ({label}): {table} rows differ from a "
+                                    f"serial run on NDJSON")
+
+
+def check_event_store(failures: list[str]) -> None:
+    """Event store queries match a plain filter over the events they were built from."""
+    import random
+    import tempfile
+    from datetime import datetime, timezone
+    from urllib.parse import quote
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("  (pyarrow not installed: event_store queries skipped)")
+        return
+    from event_store import NULL_PARTITION, EventStore, StoreError
+
+    rng = random.Random(5)
+    events = _trial_events(rng)
+    for n in range(150):  # more distinct verbs than an int8 dictionary index can hold
+        events.insert(rng.randrange(len(events) + 1), {
+            "timestamp": f"2026-06-01T11:{n // 60:02d}:{n % 60:02d}+02:00",
+            "actor": {"objectType": "bdm:Engine", "id": "engine"}, "verb": f"x:verb{n}",
+            "object": {"objectType": "bdm:Screen", "id": "s"},
+            "context": {"extensions": {"bdm:session_id": "s-1"}}})
+
+    def utc(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+    def key(session, verb, timestamp, actor_id, object_id):
+        return (session, verb, timestamp, actor_id, object_id)
+
+    rows = [key((e.get("context") or {}).get("extensions", {}).get("bdm:session_id"),
+                e["verb"], utc(e["timestamp"]), e["actor"]["id"], e["object"]["id"])
+            for e in events]
+    sessions = sorted({r[0] for r in rows}, key=str) + [None]
+    verbs = sorted({r[1] for r in rows})
+    times = sorted(r[2] for r in rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        half = len(events) // 2
+        EventStore(tmp).append(events[:half], row_group_rows=4)
+        EventStore(tmp).append(iter(json.dumps(e) for e in events[half:]), max_buffered=7)
+        store = EventStore(tmp)
+        if store.manifest["events"] != len(events):
+            failures.append(f"event_store: {store.manifest['events']} event(s) stored, "
+                            f"expected {len(events)}")
+        for trial in range(60):
+            session = rng.choice(sessions) if trial % 3 else None
+            verb = rng.choice(verbs) if trial % 2 else None
+            since, until = sorted(rng.sample(times, 2)) if trial % 5 == 0 else (None, None)
+            table, read = store.query(
+                session=session, verb=verb,
+                since=since and since.isoformat(), until=until and until.isoformat())
+            got = sorted((key(*r.values()) for r in table.select(
+                ["session_id", "verb", "timestamp", "actor_id", "object_id"]).to_pylist()),
+                key=repr)
+            expected = sorted((r for r in rows
+                               if (session is None or r[0] == session)
+                               and (verb is None or r[1] == verb)
+                               and (since is None or since <= r[2] < until)), key=repr)
+            where = f"session={session!r} verb={verb!r} since={since} until={until}"
+            if got != expected:
+                failures.append(f"event_store: query {where} gave {len(got)} event(s), "
+                                f"a plain filter {len(expected)}")
+            if session is not None and verb is not None:
+                directory = Path(tmp) / f"session_id={quote(session, safe='')}" \
+                    / f"verb={quote(verb, safe='')}"
+                if read["files"] > len(list(directory.glob("*.parquet"))):
+                    failures.append(f"event_store: query {where} read {read['files']} "
+                                    f"file(s), outside its partition")
+        if not list(Path(tmp).glob(f"session_id={NULL_PARTITION}/*/*.parquet")):
+            failures.append("event_store: events without a session have no partition")
+
+        # One partition, appended in time order: one file, a row group per flush, and a
+        # time range reads only the row groups it overlaps. Out-of-enum actor types turn
+        # up in a different order in each row group, so their dictionaries differ.
+        one = Path(tmp) / "one"
+        stream = [{"timestamp": f"2026-06-09T10:00:{n:02d}.000Z", "verb": "bdm:navigated",
+                   "actor": {"objectType": f"x:actor{(n * 7) % 5}", "id": "a"},
+                   "object": {"objectType": "bdm:Screen", "id": "s"},
+                   "context": {"extensions": {"bdm:session_id": "s-1"}}} for n in range(40)]
+        EventStore(one).append(stream, row_group_rows=4)
+        table, read = EventStore(one).query(since="2026-06-09T10:00:12Z",
+                                            until="2026-06-09T10:00:20Z")
+        if read != {"files": 1, "row_groups": 2}:
+            failures.append(f"event_store: an 8-second range over 40 events in row groups of "
+                            f"4 read {read}, expected 1 file and 2 row groups")
+        if table.column("actor_type").to_pylist() != \
+                [e["actor"]["objectType"] for e in stream[12:20]]:
+            failures.append("event_store: a time range read back the wrong events")
+
+        # A failed append (a bad line after some partitions were flushed, one with a new
+        # verb) and a killed one (a stray file) must leave the store as it was.
+        before = sorted(map(str, store.query()[0].to_pylist()))
+        files = sorted(Path(tmp).rglob("*.parquet"))
+        stray = Path(tmp) / "session_id=s-1" / "verb=x%3Astray" / "part-killed.parquet"
+        stray.parent.mkdir()
+        stray.write_bytes(files[0].read_bytes())
+        bad = [json.dumps({**e, "verb": rng.choice(["bdm:navigated", "x:new"])})
+               for e in events[:30]] + ["{not json"]
+        try:
+            EventStore(tmp).append(bad, row_group_rows=2)
+            failures.append("event_store: an append with a bad line succeeded")
+        except StoreError:
+            pass
+        stray.unlink()
+        if sorted(Path(tmp).rglob("*.parquet")) != files:
+            failures.append("event_store: a failed append left its files behind")
+        stray.write_bytes(files[0].read_bytes())
+        try:
+            after = sorted(map(str, EventStore(tmp).query()[0].to_pylist()))
+            if after != before or EventStore(tmp).manifest != store.manifest:
+                failures.append("event_store: a failed or killed append changed what reads see")
+        except Exception as e:  # noqa: BLE001 — a store that no longer reads at all
+            failures.append(f"event_store: unreadable after a failed append: {e}")
+
+
+def check_event_index(failures: list[str]) -> None:
+    """Incremental event indexes find exactly the events a plain filter does."""
+    import random
+    import tempfile
+
+    from event_index import EventIndex, _epoch
+
+    rng = random.Random(6)
+    events = _trial_events(rng)
+    lines = [json.dumps(e, ensure_ascii=rng.random() < 0.5).encode("utf-8") + b"\n"
+             for e in events]
+    sessions = sorted({e.get("context", {}).get("extensions", {}).get("bdm:session_id")
+                       for e in events} - {None})
+    verbs = sorted({e["verb"] for e in events})
+    times = sorted(e["timestamp"] for e in events)
+
+    def plain(session, trial, verb, since, until):
+        for number, event in enumerate(events, 1):
+            extensions = event.get("context", {}).get("extensions", {})
+            epoch = _epoch(event["timestamp"])
+            if ((session is None or extensions.get("bdm:session_id") == session)
+                    and (trial is None or ("bdm:session_id" in extensions
+                                           and extensions.get("bdm:trial_index") == trial))
+                    and (verb is None or event["verb"] == verb)
+                    and (since is None or epoch >= _epoch(since))
+                    and (until is None or epoch < _epoch(until))):
+                yield number
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("events.ndjson", "events.ndjson.gz"):
+            path = Path(tmp) / name
+            path.write_bytes(b"")
+            cuts = sorted(rng.sample(range(1, len(lines)), 4)) + [len(lines)]
+            done = 0
+            for cut in cuts:
+                data = b"".join(lines[done:cut])
+                # the last chunk before the end stops mid-line; the next one completes it
+                split = len(data) - rng.randrange(1, 20) if cut != len(lines) else len(data)
+                for piece in (data[:split], data[split:]):
+                    if not piece:
+                        continue
+                    with open(path, "ab") as f:
+                        f.write(gzip.compress(piece) if name.endswith(".gz") else piece)
+                    index, _ = EventIndex.build(path, block_bytes=700)
+                done = cut
+            fresh, _ = EventIndex.build(Path(tmp) / name, block_bytes=700, full=True)
+            if index.data["lines"] != len(lines) or fresh.data["lines"] != len(lines):
+                failures.append(f"event_index ({name}): {index.data['lines']} line(s) indexed "
+                                f"incrementally, {fresh.data['lines']} fresh, expected "
+                                f"{len(lines)}")
+            for trial in range(80):
+                where = {"session": rng.choice(sessions) if trial % 2 else None,
+                         "trial": str(rng.randrange(1, 8)) if trial % 3 == 0 else None,
+                         "verb": rng.choice(verbs) if trial % 4 == 1 else None,
+                         "since": None, "until": None}
+                if trial % 5 == 0:
+                    where["since"], where["until"] = sorted(rng.sample(times, 2))
+                expected = list(plain(**where))
+                for label, built in (("incremental", index), ("fresh", fresh)):
+                    got = [number for number, _ in built.events(**where)]
+                    if got != expected:
+                        failures.append(f"event_index ({name}, {label}): {where} found "
+                                        f"{len(got)} line(s), a plain filter {len(expected)}")
+            if len(fresh.candidates(session=sessions[0], trial="1")) \
+                    >= len(fresh.data["blocks"]["base"]):
+                failures.append(f"event_index ({name}): a trial lookup reads every block")
+            head = b"".join(lines[:10])  # rewritten: rebuilt, not extended
+            path.write_bytes(gzip.compress(head) if name.endswith(".gz") else head)
+            index, added = EventIndex.build(path, block_bytes=700)
+            if added != 10 or index.data["lines"] != 10:
+                failures.append(f"event_index ({name}): a rewritten file kept its old index")
+
+
+def check_event_batch(failures: list[str]) -> None:
+    """Streamed EventBatch reads, writes, split and merge keep every event as it was."""
+    import random
+    import tempfile
+    import tracemalloc
+
+    from event_batch import (BatchError, BatchReader, BatchWriter, iter_events, iter_ndjson,
+                             merge, split, to_ndjson)
+
+    rng = random.Random(7)
+    events = _trial_events(rng, sessions=3, trials=4)
+    events[3] = {**events[3], "result": {"extensions": {  # JSON syntax inside values
+        "bdm:note": 'a]},"events":[{\n\\"', "bdm:big": 12345678901234567890123,
+        "bdm:small": -1.5e-300, "bdm:list": [[], {}, [None, True, "ü"]]}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for name in ("batch.json", "batch.json.gz"):
+            path = tmp / name
+            with BatchWriter(path, batch_id="run 1") as writer:
+                writer.write_all(events[:5])
+                writer.write(json.dumps(events[5]))  # JSON text, written as given
+                writer.write_all(events[6:])
+            for chunk in (1, 7, 4096):
+                reader = BatchReader(path, chunk=chunk)
+                if list(reader) != events or reader.header != {"batch_id": "run 1"}:
+                    failures.append(f"event_batch: {name} read back differently "
+                                    f"(chunk {chunk})")
+            with open(tmp / "events.ndjson", "w", encoding="utf-8") as out:
+                to_ndjson(path, out)
+            if list(iter_ndjson(tmp / "events.ndjson")) != events:
+                failures.append(f"event_batch: {name} to-ndjson changed the events")
+            for size in (1, 5, len(events)):
+                parts = split(path, tmp / f"parts{size}-{name}", size)
+                if len(parts) != -(-len(events) // size):
+                    failures.append(f"event_batch: split {name} by {size} gave "
+                                    f"{len(parts)} part(s)")
+                if [e for part in parts for e in iter_events(part)] != events:
+                    failures.append(f"event_batch: split {name} by {size} changed the events")
+                merged = tmp / f"merged{size}.json"
+                merge(parts + [tmp / "events.ndjson"], merged, "m")
+                reader = BatchReader(merged)
+                if list(reader) != events + events or reader.header != {"batch_id": "m"}:
+                    failures.append(f"event_batch: merging {name}'s parts changed the events")
+        (tmp / "hand.json").write_text(  # written by hand: other members, numbers, spacing
+            ' { "scale": -12.5e-3, "batch_id" : 1234567 ,\t"events":\n[ '
+            + " ,\n ".join(map(json.dumps, events)) + ' ] , "count" : 98765.25 }\n',
+            encoding="utf-8")
+        for chunk in [*range(1, 41), 4096]:  # a read boundary inside every number
+            reader = BatchReader(tmp / "hand.json", chunk=chunk)
+            try:
+                detail = "" if list(reader) == events and reader.header == {
+                    "scale": -12.5e-3, "batch_id": 1234567, "count": 98765.25} else "differently"
+            except BatchError as e:
+                detail = f"with an error: {e}"
+            if detail:
+                failures.append(f"event_batch: a hand-written batch read back {detail} "
+                                f"(chunk {chunk})")
+        (tmp / "one.json").write_text(json.dumps(events[0]))
+        if list(iter_events(tmp / "one.json")) != [events[0]]:
+            failures.append("event_batch: a single Event isn't read as a batch of one")
+        text = (tmp / "merged1.json").read_text(encoding="utf-8")
+        for label, broken in (("truncated", text[:len(text) // 2]),
+                              ("trailing data", text + "{}"), ("no comma", text.replace(
+                                  "},\n{", "}\n{", 1))):
+            (tmp / "broken.json").write_text(broken, encoding="utf-8")
+            try:
+                list(BatchReader(tmp / "broken.json", chunk=64))
+                failures.append(f"event_batch: a {label} batch was read without an error")
+            except BatchError:
+                pass
+        # A syntax error early in a large batch is reported without reading the rest,
+        # and an event over max_event characters is an error, not read whole.
+        big = tmp / "big.json"
+        lines = [json.dumps(events[i % len(events)]) for i in range(20000)]
+        lines[10] = lines[10].replace('"verb":', '"verb"', 1)
+        big.write_text('{"events":[\n' + ",\n".join(lines) + "\n]}\n", encoding="utf-8")
+        tracemalloc.start()
+        try:
+            list(BatchReader(big, chunk=4096))
+            failures.append("event_batch: a batch with a syntax error was read without one")
+        except BatchError:
+            pass
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if peak > big.stat().st_size // 20:
+            failures.append(f"event_batch: reporting a syntax error near the start of a "
+                            f"{big.stat().st_size:,}-byte batch took {peak:,} bytes")
+        try:
+            list(BatchReader(tmp / "merged1.json", chunk=64, max_event=100))
+            failures.append("event_batch: an event over max_event characters was read")
+        except BatchError:
+            pass
+        try:
+            with BatchWriter(tmp / "aborted.json") as writer:
+                writer.write(events[0])
+                raise BatchError("interrupted")
+        except BatchError:
+            pass
+        if list(tmp.glob("aborted.json*")):
+            failures.append("event_batch: an interrupted write left a file behind")
+
+
+def check_event_compact(failures: list[str]) -> None:
+    """EventTable round trips are lossless; column / where match plain dict lookups."""
+    import copy
+    import random
+
+    from event_compact import EventTable
+
+    rng = random.Random(8)
+    events = _trial_events(rng)
+    odd = ["2026-06-01T10:00:00Z", "2026-13-01T10:00:00.000Z", "2026-06-01T24:00:00.000Z",
+           7, 7.0, -0.0, 0.0, True, 1,
+           None, "", "bdm:key_pressed", 2 ** 70, 1e-300, "ü\u0000"]
+    for i in rng.sample(range(len(events)), 40):  # same shapes, other leaf types
+        event = events[i] = copy.deepcopy(events[i])
+        if rng.random() < 0.5:
+            event["timestamp"] = rng.choice(odd)
+        for key in (event.get("result") or {}).get("extensions", {}):
+            event["result"]["extensions"][key] = rng.choice(odd)
+    events += [{}, {"verb": []}, {"verb": {}}, {"a": [[1, 2.5], {"b": None}]}, {"a": [[1]]}]
+    events += [{"timestamp": t, "n": 0.5} for t in odd[:3] + ["2026-06-01T10:00:00.000Z"]
+               for _ in range(2)][::-1]  # a timestamp column, then values that don't fit
+
+    def leaves(value, prefix=()):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                yield from leaves(v, prefix + (k,))
+        elif isinstance(value, list):
+            for i, v in enumerate(value):
+                yield from leaves(v, prefix + (i,))
+        else:
+            yield prefix, value
+
+    flat = [dict(leaves(e)) for e in events]
+    table = EventTable(events[:50])
+    table.extend(iter(events[50:]))
+    if len(table) != len(events) or [json.dumps(e) for e in table] != \
+            [json.dumps(e) for e in events]:
+        failures.append("event_compact: an EventTable doesn't rebuild its events exactly")
+    if table.code("bdm:key_pressed") != EventTable().code("bdm:key_pressed"):
+        failures.append("event_compact: enum codes differ between tables")
+    paths = sorted({path for row in flat for path in row}, key=repr)
+    for path in paths:
+        expected = [row.get(path) for row in flat]
+        if [json.dumps(v) for v in table.column(path)] != [json.dumps(v) for v in expected]:
+            failures.append(f"event_compact: column {path} differs from the events'")
+        for value in {json.dumps(v): v for v in expected + odd[:3]}.values():
+            want = [i for i, row in enumerate(flat)
+                    if path in row and json.dumps(row[path]) == json.dumps(value)]
+            if table.where(path, value) != want:
+                failures.append(f"event_compact: where {path} == {value!r} found "
+                                f"{len(table.where(path, value))} row(s), expected {len(want)}")
+    if table.column("context.extensions.bdm:session_id") != \
+            table.column(("context", "extensions", "bdm:session_id")):
+        failures.append("event_compact: dotted and tuple paths disagree")
+
+
 def check_jsonld_contexts(failures: list[str]) -> None:
     """Expand every JSON-LD context (and each example against it) with pyld; no network."""
     from pyld import jsonld
@@ -142,15 +1153,18 @@ def check_jsonld_contexts(failures: list[str]) -> None:
         failures.append(f"vocabulary/terms.jsonld: JSON-LD expansion failed: {e}")
 
 
-def check_linkml_enum_consistency(failures: list[str]) -> None:
-    """Enum-ranged slots: examples and ifabsent defaults must be permissible values."""
+def check_linkml_enum_consistency(failures: list[str], paths: list[Path] | None = None) -> None:
+    """Enum-ranged slots: examples and ifabsent defaults must be permissible values.
+
+    Checks every `*/schema.linkml.yaml` unless `paths` names specific sources.
+    """
     from linkml_runtime.utils.schemaview import SchemaView
 
     ifabsent_re = re.compile(r"^string\((.+)\)$")
-    for path in sorted(ROOT.glob("*/schema.linkml.yaml")):
+    for path in paths if paths is not None else sorted(ROOT.glob("*/schema.linkml.yaml")):
         sv = SchemaView(str(path))
         enums = sv.all_enums()
-        rel = path.relative_to(ROOT)
+        rel = path.relative_to(ROOT) if path.is_relative_to(ROOT) else path
         for slot in sv.all_slots().values():
             if slot.range not in enums:
                 continue
@@ -167,9 +1181,8 @@ def check_linkml_enum_consistency(failures: list[str]) -> None:
                                     f"permissible value of enum {slot.range}")
 
 
-def main() -> int:
-    failures: list[str] = []
-
+def validate_examples(failures: list[str]) -> None:
+    """Every schema.json is well-formed and every `examples/*.json` validates against it."""
     for name in SCHEMAS:
         sdir = ROOT / name
         schema_path = sdir / "schema.json"
@@ -198,25 +1211,239 @@ def main() -> int:
             else:
                 print(f"✓ {rel} validates")
 
+
+_ANNOTATIONS = frozenset({"title", "description", "examples", "default", "$comment"})
+
+
+def _inline_refs(node, defs: dict, inside: tuple = ()):
+    """`node` with every local `#/$defs/<name>` reference replaced by the definition.
+
+    jsonschema resolves a `$ref` through its registry on every instance, which is
+    about half the cost of validating an event; an inlined schema does the same
+    checks without it. A recursive definition keeps its `$ref`.
+    """
+    if isinstance(node, list):
+        return [_inline_refs(v, defs, inside) for v in node]
+    if not isinstance(node, dict):
+        return node
+    ref = node.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/$defs/") and ref[8:] in defs \
+            and ref[8:] not in inside:
+        target = _inline_refs(defs[ref[8:]], defs, inside + (ref[8:],))
+        rest = {k: _inline_refs(v, defs, inside) for k, v in node.items()
+                if k != "$ref" and k not in _ANNOTATIONS}
+        return {"allOf": [target], **rest} if rest else target
+    return {k: _inline_refs(v, defs, inside) for k, v in node.items()}
+
+
+def definition_validator(schema: dict, name: str):
+    """jsonschema validator for one `$defs` entry of `schema`, its refs inlined."""
+    target = _inline_refs(schema["$defs"][name], schema["$defs"], (name,))
+    target.update({"$schema": schema["$schema"], "$defs": schema["$defs"]})
+    return _validator_cls(schema)(target)
+
+
+@lru_cache(maxsize=None)
+def _event_validator(name: str = "Event"):
+    """Validator for a single `Event` (event/schema.json's root is Event | EventBatch).
+
+    `is_valid` runs code compiled from the definition by schema_fastpath.py;
+    `iter_errors` is jsonschema's, for the messages of the events that fail.
+    """
+    from schema_fastpath import FastValidator
+
+    schema = json.loads(EVENT_SCHEMA.read_text())
+    return FastValidator(schema, name, definition_validator(schema, name))
+
+
+def _check_event_lines(first_line: int, lines: list[bytes],
+                       max_errors: int) -> tuple[int, list[tuple[int, str, str]]]:
+    """(events checked, [(line number, JSON path, message)]) for one block of NDJSON."""
+    validator = _event_validator()
+    events, errors = 0, []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue  # blank lines (a trailing newline, padding) carry no event
+        events += 1
+        try:
+            event = json.loads(line)
+        except ValueError as e:  # JSONDecodeError, or bytes that aren't UTF-8
+            errors.append((number, "$", f"not JSON: {e}"))
+        else:
+            if validator.is_valid(event):  # the common case: skip collecting errors
+                continue
+            for err in sorted(validator.iter_errors(event), key=lambda e: e.json_path):
+                errors.append((number, err.json_path, err.message))
+        if len(errors) >= max_errors:
+            break
+    return events, errors
+
+
+def _open_stream(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def validate_event_stream(path: Path, jobs: int = 1, max_errors: int = DEFAULT_MAX_ERRORS,
+                          block_lines: int = EVENT_BLOCK_LINES) -> tuple[int, list[tuple[int, str, str]]]:
+    """Validate each line of an NDJSON (or .ndjson.gz) stream as an `Event`, streaming.
+
+    Returns (events checked, errors as (line, JSON path, message)), stopping once
+    `max_errors` errors are found. With `jobs > 1`, blocks of `block_lines` lines are
+    validated on a process pool, at most 2 * jobs blocks in flight.
+    """
+    events, errors = 0, []
+    with _open_stream(path) as stream:
+        blocks = _line_blocks(stream, block_lines)
+        if jobs <= 1:
+            results = (_check_event_lines(first, lines, max_errors) for first, lines in blocks)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(jobs)
+            results = _in_order(pool, blocks, max_errors, 2 * jobs)
+        try:
+            for checked, found in results:
+                events += checked
+                errors.extend(found[:max_errors - len(errors)])
+                if len(errors) >= max_errors:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    return events, errors
+
+
+def _line_blocks(stream, block_lines: int):
+    first = 1
+    while lines := list(islice(stream, block_lines)):
+        yield first, lines
+        first += len(lines)
+
+
+def _in_order(pool, blocks, max_errors: int, ahead: int):
+    pending: deque = deque()
+    for first, lines in blocks:
+        pending.append(pool.submit(_check_event_lines, first, lines, max_errors))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def check_event_streams(failures: list[str], paths: list[Path] | None = None, jobs: int = 1,
+                        max_errors: int = DEFAULT_MAX_ERRORS) -> None:
+    """Every line of each NDJSON event stream (default: the event examples) is an Event."""
+    if paths is None:
+        paths = sorted(p for p in (ROOT / "event" / "examples").iterdir()
+                       if p.name.endswith((".ndjson", ".ndjson.gz")))
+    for path in paths:
+        rel = path.relative_to(ROOT) if path.is_relative_to(ROOT) else path
+        started = time.perf_counter()
+        events, errors = validate_event_stream(path, jobs=jobs, max_errors=max_errors)
+        seconds = time.perf_counter() - started
+        for line, where, message in errors:
+            failures.append(f"{rel}:{line}: {where}: {message}")
+        if len(errors) >= max_errors:
+            failures.append(f"{rel}: stopped after {max_errors} error(s) (--max-errors)")
+        elif not errors:
+            print(f"✓ {rel}: {events} event(s) validate ({seconds:.2f}s, "
+                  f"{events / seconds if seconds else 0:,.0f} events/s)")
+
+
+def check_event_fastpath(failures: list[str]) -> None:
+    """The compiled Event/EventBatch checks agree with jsonschema on the examples and their mutants.
+
+    Events are compared one by one; batches with their events cut to the first, as
+    the compiled batch check calls the event check for each element anyway.
+    """
+    from schema_fastpath import mutants
+
+    events, batches = [], []
+    for path in sorted((ROOT / "event" / "examples").iterdir()):
+        if path.suffix == ".ndjson":
+            events += [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+        elif path.suffix == ".json":
+            doc = json.loads(path.read_text())
+            if isinstance(doc.get("events"), list):
+                events += doc["events"]
+                batches.append({**doc, "events": doc["events"][:1]})
+            else:
+                events.append(doc)
+    for name, instances in (("Event", events), ("EventBatch", batches)):
+        validator = _event_validator(name)
+        if not validator.compiled:
+            continue  # uses jsonschema throughout; nothing to compare
+        checked = 0
+        for instance in instances:
+            for variant in (instance, *mutants(instance)):
+                checked += 1
+                if validator.is_valid(variant) != validator.validator.is_valid(variant):
+                    failures.append(f"schema_fastpath {name}: disagrees with jsonschema on "
+                                    f"{json.dumps(variant)[:200]}")
+                    return
+        print(f"✓ compiled {name} check agrees with jsonschema on {checked} instance(s)")
+
+
+def _report(failures: list[str], success: str) -> int:
+    if failures:
+        print("\n✗ validation failed:", file=sys.stderr)
+        for f in failures:
+            print(f"  - {f}", file=sys.stderr)
+        return 1
+    print(success)
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("streams", nargs="*", type=Path,
+                    help="NDJSON (.ndjson / .ndjson.gz) event streams to validate instead")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="worker processes for event streams; 0 = one per CPU (default: 1)")
+    ap.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS, metavar="N",
+                    help=f"stop a stream after N errors (default: {DEFAULT_MAX_ERRORS})")
+    args = ap.parse_args()
+    if args.max_errors < 1:
+        ap.error("--max-errors must be at least 1")
+
+    failures: list[str] = []
+    if args.streams:
+        check_event_streams(failures, args.streams, jobs=args.jobs or os.cpu_count() or 1,
+                            max_errors=args.max_errors)
+        return _report(failures, "\n✓ every event validates")
+
+    validate_examples(failures)
+
     for check, label in [
         (check_bcsv_conformance, "bcsv conformance fixtures agree with schema.json + expected.json"),
+        (check_bcsv_validator, "scripts/validate_bcsv.py passes the bcsv conformance suite"),
+        (check_bcsv_coerce, "bcsv_coerce column engine agrees with the cell-by-cell reference"),
+        (check_bcsv_batch, "validate_bcsv_batch matches validate_bcsv pair by pair"),
+        (check_bcsv_arrow, "bcsv_arrow round trips keep every value"),
+        (check_bcsv_keys, "bcsv_keys finds the same duplicates as a dict, spilled or not"),
+        (check_validation_plans, "cached validate_bcsv plans match fresh ones"),
+        (check_bcsv_parse, "bcsv_parse ranges parse into the records of a serial parse"),
+        (check_bcsv_jobs, "validate_bcsv gives the same result serially and in parallel"),
+        (check_bcsv_sample, "validate_bcsv samples resync on record starts"),
+        (check_bcsv_profile, "bcsv_profile metadata validates the CSV it was profiled from"),
+        (check_derive_trials, "derive_trials tables validate, serially and in parallel"),
+        (check_event_store, "event_store queries match a plain filter"),
+        (check_event_index, "event_index lookups match a plain filter"),
+        (check_event_batch, "event_batch streams round-trip"),
+        (check_event_compact, "event_compact tables round-trip"),
         (check_jsonld_contexts, "JSON-LD contexts expand"),
         (check_linkml_enum_consistency, "LinkML enum examples/defaults are permissible values"),
+        (check_event_streams, "event streams validate line by line"),
+        (check_event_fastpath, "compiled event checks agree with jsonschema"),
     ]:
         before = len(failures)
         check(failures)
         if len(failures) == before:
             print(f"✓ {label}")
 
-    if failures:
-        print("\n✗ validation failed:", file=sys.stderr)
-        for f in failures:
-            print(f"  - {f}", file=sys.stderr)
-        return 1
-
-    print("\n✓ all schemas well-formed; examples, conformance fixtures, JSON-LD contexts, "
-          "and LinkML enum usage all valid")
-    return 0
+    return _report(failures, "\n✓ all schemas well-formed; examples, event streams, conformance "
+                             "fixtures (and the reference validator), JSON-LD contexts, and "
+                             "LinkML enum usage all valid")
 
 
 if __name__ == "__main__":
@@ -74,11 +74,16 @@ def build(src: dict) -> dict:
     }
 
 
+def render(src: dict) -> str:
+    """terms.jsonld text exactly as written to disk."""
+    return json.dumps(build(src), indent=2, ensure_ascii=False) + "\n"
+
+
 def main() -> int:
     check = "--check" in sys.argv
     src = yaml.safe_load((VOCAB_DIR / "terms.yaml").read_text())
     out_path = VOCAB_DIR / "terms.jsonld"
-    rendered = json.dumps(build(src), indent=2, ensure_ascii=False) + "\n"
+    rendered = render(src)
 
     if check:
         if not out_path.exists() or out_path.read_text() != rendered: